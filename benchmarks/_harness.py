@@ -0,0 +1,165 @@
+import asyncio
+import statistics
+import timeit
+from typing import Any, Awaitable, Callable, Dict, List
+
+Results = Dict[str, Dict[str, Any]]
+
+
+# The calibration of the last `time_call()` or `time_async()` measurement, attached
+# to the `result()`s built from it.
+_last_calibration = 0.0
+
+TIMED_UNITS = {"ns", "req/s", "conn/s", "ops/s"}
+
+
+def result(value: float, unit: str) -> Dict[str, Any]:
+    """
+    A benchmark result. Timings also carry the `calibration` measured with them, so
+    runs made while the machine ran at different speeds can be compared.
+    """
+    document: Dict[str, Any] = {"value": round(value, 2), "unit": unit}
+    if unit in TIMED_UNITS and _last_calibration:
+        document["calibration"] = round(_last_calibration, 2)
+    return document
+
+
+def _reference() -> None:
+    items = {}
+    for index in range(100):
+        items[index] = str(index)
+
+
+_REFERENCE = timeit.Timer(_reference)
+_REFERENCE_NUMBER = 500
+
+
+def _time_reference() -> float:
+    return _REFERENCE.timeit(_REFERENCE_NUMBER) / _REFERENCE_NUMBER * 1e9
+
+
+def time_call(func: Callable[[], Any], repeat: int = 7, target: float = 0.05) -> float:
+    """
+    Best-of-`repeat` nanoseconds per call of `func`, each run lasting about `target`
+    seconds.
+
+    Machine speed drifts by tens of percent within seconds (frequency scaling, noisy
+    neighbours), so every run is followed by a short run of a fixed reference
+    workload. The calibration of the measurement is chosen so that the result divided
+    by it is the median ratio of a run to the reference run next to it.
+    """
+    global _last_calibration
+
+    timer = timeit.Timer(func)
+    number = 1000
+    elapsed = timer.timeit(number)
+    if elapsed:
+        number = max(1, int(number * target / elapsed))
+    times = []
+    ratios = []
+    for _ in range(repeat):
+        elapsed = timer.timeit(number) / number * 1e9
+        times.append(elapsed)
+        ratios.append(elapsed / _time_reference())
+    best = min(times)
+    _last_calibration = best / statistics.median(ratios)
+    return best
+
+
+def time_async(
+    func: Callable[[], Awaitable[Any]], number: int = 2000, repeat: int = 7
+) -> float:
+    """
+    Best-of-`repeat` nanoseconds per awaited call of `func`, on one event loop,
+    calibrated like `time_call()`.
+    """
+
+    async def run() -> float:
+        global _last_calibration
+
+        loop = asyncio.get_running_loop()
+        times = []
+        ratios = []
+        for _ in range(repeat):
+            start = loop.time()
+            for _ in range(number):
+                await func()
+            elapsed = (loop.time() - start) / number * 1e9
+            times.append(elapsed)
+            ratios.append(elapsed / _time_reference())
+        best = min(times)
+        _last_calibration = best / statistics.median(ratios)
+        return best
+
+    return asyncio.run(run())
+
+
+class ASGIHarness:
+    """Drives an ASGI app with a fixed HTTP request, without any network or HTTP client."""
+
+    def __init__(self, app: Any, path: str = "/", method: str = "GET") -> None:
+        self.app = app
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 12345),
+            "server": ("testserver", 80),
+        }
+        self.messages: List[Dict[str, Any]] = []
+
+    async def receive(self) -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        self.messages.append(message)
+
+    async def request(self) -> int:
+        self.messages.clear()
+        await self.app(dict(self.scope), self.receive, self.send)
+        return self.messages[0]["status"]
+
+
+class WebSocketHarness:
+    """Drives an ASGI app with a WebSocket connection that disconnects right away."""
+
+    def __init__(self, app: Any, path: str = "/") -> None:
+        self.app = app
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "scheme": "ws",
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 12345),
+            "server": ("testserver", 80),
+            "subprotocols": [],
+        }
+        self.messages: List[Dict[str, Any]] = []
+        self._connected = False
+
+    async def receive(self) -> Dict[str, Any]:
+        if not self._connected:
+            self._connected = True
+            return {"type": "websocket.connect"}
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        self.messages.append(message)
+
+    async def connect(self) -> str:
+        self.messages.clear()
+        self._connected = False
+        await self.app(dict(self.scope), self.receive, self.send)
+        return self.messages[0]["type"]
@@ -0,0 +1,65 @@
+"""
+End-to-end error response latency through a Starlette app, driven by a raw ASGI
+harness so no HTTP client or network is involved.
+
+The `default_response` and `as_response` cases return the error response from the
+endpoint instead of raising, compared with raising to `CachedHTTPExceptionHandler`.
+"""
+
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.routing import Route
+
+from _harness import ASGIHarness, Results, result, time_async
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.handlers import CachedHTTPExceptionHandler
+
+
+async def starlette_not_found(request):
+    raise HTTPException(404)
+
+
+async def package_not_found(request):
+    raise NotFoundException()
+
+
+async def package_not_found_detail(request):
+    raise NotFoundException(detail="item 42 not found")
+
+
+async def returned_not_found(request):
+    return NotFoundException.default_response()
+
+
+async def returned_not_found_detail(request):
+    return NotFoundException(detail="item 42 not found").as_response()
+
+
+def _app(endpoint, **kwargs) -> Starlette:
+    return Starlette(routes=[Route("/", endpoint)], **kwargs)
+
+
+APPS = {
+    "app.starlette.HTTPException": _app(starlette_not_found),
+    "app.NotFoundException": _app(package_not_found),
+    "app.NotFoundException.cached_handler": _app(
+        package_not_found,
+        exception_handlers={HTTPException: CachedHTTPExceptionHandler()},
+    ),
+    "app.NotFoundException.default_response": _app(returned_not_found),
+    "app.NotFoundException.detail.cached_handler": _app(
+        package_not_found_detail,
+        exception_handlers={HTTPException: CachedHTTPExceptionHandler()},
+    ),
+    "app.NotFoundException.detail.as_response": _app(returned_not_found_detail),
+}
+
+
+def run() -> Results:
+    results: Results = {}
+    for name, app in APPS.items():
+        harness = ASGIHarness(app)
+        latency = time_async(harness.request)
+        results[name] = result(latency, "ns")
+        results[f"{name}.throughput"] = result(1e9 / latency, "req/s")
+    return results
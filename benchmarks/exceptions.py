@@ -0,0 +1,70 @@
+"""
+Instantiation cost of every exception class and raise+catch cost of a representative
+HTTP and WebSocket class, next to the plain Starlette exceptions they derive from.
+"""
+
+import inspect
+from typing import Callable, Iterator, Tuple, Type
+
+from starlette import exceptions as starlette_exceptions
+
+from _harness import Results, result, time_call
+from starlette_http_exceptions import http_exceptions, ws_exceptions
+
+
+def _classes(module: object, base: type) -> Iterator[Tuple[str, Type[Exception]]]:
+    for name, cls in vars(module).items():
+        if (
+            inspect.isclass(cls)
+            and issubclass(cls, base)
+            and cls.__module__ == module.__name__  # type: ignore[attr-defined]
+            and not name.startswith("_")
+        ):
+            yield name, cls
+
+
+def _factories() -> Iterator[Tuple[str, Callable[[], Exception]]]:
+    yield (
+        "starlette.HTTPException",
+        lambda: starlette_exceptions.HTTPException(404),
+    )
+    yield (
+        "starlette.WebSocketException",
+        lambda: starlette_exceptions.WebSocketException(1008),
+    )
+    for name, cls in _classes(http_exceptions, starlette_exceptions.HTTPException):
+        yield name, cls
+    for name, cls in _classes(ws_exceptions, starlette_exceptions.WebSocketException):
+        if name == "WebSocketException":
+            yield name, lambda cls=cls: cls(1008)
+        else:
+            yield name, cls
+
+
+def _raise_and_catch(factory: Callable[[], Exception]) -> Callable[[], None]:
+    def run() -> None:
+        try:
+            raise factory()
+        except Exception:
+            pass
+
+    return run
+
+
+RAISED = {
+    "starlette.HTTPException",
+    "starlette.WebSocketException",
+    "NotFoundException",
+    "WSPolicyViolation",
+}
+
+
+def run() -> Results:
+    results: Results = {}
+    for name, factory in _factories():
+        results[f"instantiate.{name}"] = result(time_call(factory), "ns")
+        if name in RAISED:
+            results[f"raise.{name}"] = result(
+                time_call(_raise_and_catch(factory)), "ns"
+            )
+    return results
@@ -0,0 +1,107 @@
+"""
+Per-instance memory of the exception classes, measured with `tracemalloc`.
+
+Each slotted class is compared with an equivalent class without `__slots__`, which
+is how the classes in this package were laid out before. The memory the WebSocket
+rate limiter adds to every open connection is measured the same way.
+
+    python benchmarks/memory.py
+"""
+
+import asyncio
+import gc
+import tracemalloc
+from typing import Any, Callable, List
+
+from starlette.exceptions import HTTPException, WebSocketException
+
+from _harness import Results, result
+from starlette_http_exceptions import NotFoundException, WSPolicyViolation
+from starlette_http_exceptions.middleware import WebSocketRateLimitMiddleware
+
+INSTANCES = 10_000
+
+
+class UnslottedNotFoundException(HTTPException):
+    def __init__(self, detail=None, headers=None):
+        super().__init__(status_code=404, detail=detail, headers=headers)
+
+
+class UnslottedWSPolicyViolation(WebSocketException):
+    def __init__(self, reason=None):
+        super().__init__(code=1008, reason=reason)
+
+
+def bytes_per_instance(factory: Callable[[], object], count: int = INSTANCES) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances: List[object] = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del instances
+    return allocated / count
+
+
+async def idle_websocket(scope: Any, receive: Any, send: Any) -> None:
+    await receive()
+
+
+def bytes_per_connection(app: Any, count: int = INSTANCES) -> float:
+    """Memory held by `count` open WebSocket connections to `app`, per connection."""
+
+    async def measure() -> float:
+        closed = asyncio.Event()
+
+        async def receive() -> Any:
+            await closed.wait()
+            return {"type": "websocket.disconnect", "code": 1000}
+
+        async def send(message: Any) -> None:
+            pass
+
+        scope = {"type": "websocket", "path": "/"}
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tasks = [asyncio.create_task(app(scope, receive, send)) for _ in range(count)]
+        await asyncio.sleep(0)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        closed.set()
+        await asyncio.gather(*tasks)
+        stats = after.compare_to(before, "filename")
+        return sum(stat.size_diff for stat in stats) / count
+
+    return asyncio.run(measure())
+
+
+CASES = {
+    "memory.http.unslotted": lambda: UnslottedNotFoundException(detail="missing"),
+    "memory.http.slotted": lambda: NotFoundException(detail="missing"),
+    "memory.ws.unslotted": lambda: UnslottedWSPolicyViolation(reason="policy"),
+    "memory.ws.slotted": lambda: WSPolicyViolation(reason="policy"),
+}
+
+
+def run() -> Results:
+    results = {
+        name: result(bytes_per_instance(factory), "bytes")
+        for name, factory in CASES.items()
+    }
+    bare = bytes_per_connection(idle_websocket)
+    limited = bytes_per_connection(
+        WebSocketRateLimitMiddleware(idle_websocket, rate=10, burst=10)
+    )
+    results["memory.ws_rate_limit.connection"] = result(limited - bare, "bytes")
+    return results
+
+
+def main() -> None:
+    for name, measured in run().items():
+        print(f"{name:<32} {measured['value']:8.1f} bytes/instance")
+
+
+if __name__ == "__main__":
+    main()
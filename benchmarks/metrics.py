@@ -0,0 +1,48 @@
+"""
+Overhead of counting exceptions with `starlette_http_exceptions.metrics`.
+"""
+
+import os
+import tempfile
+
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.routing import Route
+
+from _harness import ASGIHarness, Results, result, time_async, time_call
+from starlette_http_exceptions import TooManyRequestsException
+from starlette_http_exceptions.handlers import CachedHTTPExceptionHandler
+from starlette_http_exceptions.metrics import ErrorCounters, instrument
+
+
+async def too_many_requests(request):
+    raise TooManyRequestsException()
+
+
+def run() -> Results:
+    results: Results = {}
+
+    in_memory = ErrorCounters()
+    results["metrics.record.memory"] = result(
+        time_call(lambda: in_memory.record(429, "/items/{id}")), "ns"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        mapped = ErrorCounters(path=os.path.join(directory, "bench.counters"))
+        results["metrics.record.mmap"] = result(
+            time_call(lambda: mapped.record(429, "/items/{id}")), "ns"
+        )
+        mapped.close()
+
+    handler = CachedHTTPExceptionHandler()
+    apps = {
+        "metrics.app.disabled": handler,
+        "metrics.app.enabled": instrument(handler, ErrorCounters()),
+    }
+    for name, exception_handler in apps.items():
+        app = Starlette(
+            routes=[Route("/items/{id}", too_many_requests)],
+            exception_handlers={HTTPException: exception_handler},
+        )
+        harness = ASGIHarness(app, path="/items/1")
+        results[name] = result(time_async(harness.request), "ns")
+    return results
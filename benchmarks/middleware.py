@@ -0,0 +1,89 @@
+"""
+Cost of the rejection paths of the middleware in `starlette_http_exceptions.middleware`.
+"""
+
+from starlette.responses import PlainTextResponse
+
+from _harness import (
+    ASGIHarness,
+    Results,
+    WebSocketHarness,
+    result,
+    time_async,
+    time_call,
+)
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.middleware import (
+    HTTPExceptionMiddleware,
+    IdempotencyMiddleware,
+    LoadSheddingMiddleware,
+    NegativeCacheMiddleware,
+    RequestSizeLimitMiddleware,
+    TimeoutMiddleware,
+    TokenBuckets,
+    WebSocketAdmissionMiddleware,
+)
+
+ok = PlainTextResponse("ok")
+
+
+async def not_found(scope, receive, send):  # type: ignore[no-untyped-def]
+    raise NotFoundException()
+
+
+async def accept(scope, receive, send):  # type: ignore[no-untyped-def]
+    await receive()
+    await send({"type": "websocket.accept"})
+    await receive()
+
+
+def run() -> Results:
+    results: Results = {}
+    apps = {
+        "middleware.load_shedding.admitted": LoadSheddingMiddleware(
+            ok, max_concurrency=1_000_000
+        ),
+        "middleware.load_shedding.rejected": LoadSheddingMiddleware(
+            ok, max_concurrency=0
+        ),
+        "middleware.request_size.admitted": RequestSizeLimitMiddleware(
+            ok, max_body_size=1024, max_url_length=1024, max_header_bytes=1024
+        ),
+        "middleware.request_size.rejected": RequestSizeLimitMiddleware(
+            ok, max_url_length=0
+        ),
+        "middleware.negative_cache.uncached": HTTPExceptionMiddleware(not_found),
+        "middleware.negative_cache.hit": NegativeCacheMiddleware(
+            HTTPExceptionMiddleware(not_found)
+        ),
+        "middleware.timeout.admitted": TimeoutMiddleware(ok, timeout=60),
+    }
+    for name, app in apps.items():
+        latency = time_async(ASGIHarness(app).request)
+        results[name] = result(latency, "ns")
+        results[f"{name}.throughput"] = result(1e9 / latency, "req/s")
+    replaying = ASGIHarness(IdempotencyMiddleware(ok), method="POST")
+    replaying.scope["headers"] = [(b"idempotency-key", b"bench")]
+    latency = time_async(replaying.request)
+    results["middleware.idempotency.replayed"] = result(latency, "ns")
+    results["middleware.idempotency.replayed.throughput"] = result(
+        1e9 / latency, "req/s"
+    )
+    websocket_apps = {
+        "middleware.ws_admission.admitted": WebSocketAdmissionMiddleware(
+            accept, max_connections=1_000_000, max_per_client=1_000_000
+        ),
+        "middleware.ws_admission.rejected": WebSocketAdmissionMiddleware(
+            accept, max_connections=0
+        ),
+    }
+    for name, app in websocket_apps.items():
+        latency = time_async(WebSocketHarness(app).connect)
+        results[name] = result(latency, "ns")
+        results[f"{name}.throughput"] = result(1e9 / latency, "conn/s")
+    buckets = TokenBuckets(rate=1e9, burst=1e9)
+    slot = buckets.allocate()
+    results["middleware.ws_rate_limit.take"] = result(
+        time_call(lambda: buckets.take(slot)), "ns"
+    )
+    return results
@@ -0,0 +1,43 @@
+"""
+Cost of `starlette_http_exceptions.ratelimit` with few and with many distinct keys.
+"""
+
+import itertools
+
+from starlette.responses import PlainTextResponse
+
+from _harness import ASGIHarness, Results, result, time_async, time_call
+from starlette_http_exceptions.middleware import RateLimitMiddleware
+from starlette_http_exceptions.ratelimit import MemoryBackend, Rate, RateLimiter
+
+KEYS = 1_000_000
+
+
+def run() -> Results:
+    results: Results = {}
+    rate = Rate(1_000_000_000, period=1)
+
+    backend = MemoryBackend()
+    results["ratelimit.hit.one_key"] = result(
+        time_call(lambda: backend.hit_nowait("client", rate)), "ns"
+    )
+
+    # Cycles through a million keys, so the store stays at full size and keeps
+    # expiring and evicting.
+    backend = MemoryBackend(maxsize=KEYS)
+    keys = itertools.cycle(range(KEYS))
+    for key in range(KEYS):
+        backend.hit_nowait(key, rate)
+    results["ratelimit.hit.many_keys"] = result(
+        time_call(lambda: backend.hit_nowait(next(keys), rate)), "ns"
+    )
+    results["ratelimit.hit.many_keys.throughput"] = result(
+        1e9 / results["ratelimit.hit.many_keys"]["value"], "ops/s"
+    )
+
+    exhausted = RateLimiter(Rate(1, period=3600))
+    app = RateLimitMiddleware(PlainTextResponse("ok"), exhausted)
+    latency = time_async(ASGIHarness(app).request)
+    results["ratelimit.middleware.rejected"] = result(latency, "ns")
+    results["ratelimit.middleware.rejected.throughput"] = result(1e9 / latency, "req/s")
+    return results
@@ -0,0 +1,119 @@
+"""
+Run the benchmark suite, write the results as JSON and compare them with a baseline.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json
+
+Only the standard library, Starlette and this package are needed. The exit status is
+1 when a benchmark regressed by more than `--threshold` (a fraction) against the
+baseline.
+
+Machine speed drifts between runs, and within one, by more than the threshold, so
+timings that carry a `calibration` (see `_harness.time_call()`) are compared relative
+to it: a benchmark regresses when it got slower than the reference workload timed
+alongside it. Calibrated, back-to-back runs of an unchanged tree still differ by up
+to about 30% on a shared machine, hence the default threshold of 0.4.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+from typing import Any, Dict, List, Optional
+
+from _harness import Results
+
+SUITES = ["exceptions", "app", "memory", "metrics", "middleware", "ratelimit"]
+
+HIGHER_IS_BETTER = {"req/s", "conn/s", "ops/s"}
+
+
+def run_suites(names: List[str]) -> Results:
+    results: Results = {}
+    for name in names:
+        print(f"running {name}...", file=sys.stderr)
+        results.update(importlib.import_module(name).run())
+    return results
+
+
+def _normalized(result: Dict[str, Any], calibrated: bool) -> float:
+    if not calibrated:
+        return result["value"]
+    if result["unit"] in HIGHER_IS_BETTER:
+        return result["value"] * result["calibration"]
+    return result["value"] / result["calibration"]
+
+
+def regressions(
+    results: Results, baseline: Results, threshold: float
+) -> List[Dict[str, Any]]:
+    found = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if (
+            previous is None
+            or previous["unit"] != current["unit"]
+            or not previous["value"]
+        ):
+            continue
+        calibrated = "calibration" in current and "calibration" in previous
+        change = _normalized(current, calibrated) / _normalized(previous, calibrated) - 1
+        if current["unit"] in HIGHER_IS_BETTER:
+            change = -change
+        if change > threshold:
+            found.append(
+                {
+                    "name": name,
+                    "baseline": previous["value"],
+                    "current": current["value"],
+                    "unit": current["unit"],
+                    "change": round(change, 4),
+                }
+            )
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=SUITES)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file written by a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.4,
+        help="allowed slowdown as a fraction of the baseline (default: 0.4)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.suite or SUITES)
+    document = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+    else:
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        found = regressions(results, baseline, args.threshold)
+        for regression in found:
+            print(
+                "REGRESSION {name}: {baseline} -> {current} {unit} "
+                "({change:+.1%})".format(**regression),
+                file=sys.stderr,
+            )
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,61 @@
-from .http_exceptions import (
-    HTTPException,
-    BadRequestException,
-    UnauthorizedException,
-    ForbiddenException,
-    NotFoundException,
-    MethodNotAllowedException,
-    NotAcceptableException,
-    ProxyAuthenticationRequiredException,
-    RequestTimeoutException,
-    ConflictException,
-    GoneException,
-    LengthRequiredException,
-    PreconditionFailedException,
-    RequestEntityTooLargeException,
-    RequestUriTooLongException,
-    UnsupportedMediaTypeException,
-    RequestedRangeNotSatisfiableException,
-    ExpectationFailedException,
-    ImATeapotException,
-    MisdirectedRequestException,
-    UnprocessableEntityException,
-    LockedException,
-    FailedDependencyException,
-    UpgradeRequiredException,
-    PreconditionRequiredException,
-    TooManyRequestsException,
-    RequestHeaderFieldsTooLargeException,
-    UnavailableForLegalReasonsException,
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-from .ws_exceptions import (
-    WebSocketException,
-    WSProtocolError,
-    WSUnsupportedData,
-    WSNoStatusReceived,
-    WSAbnormalClosure,
-    WSBadGateway,
-    WSInternalError,
-    WSMessageTooBig,
-    WSInvalidFramePayloadData,
-    WSServiceRestart,
-    WSMandatoryExt,
-    WSPolicyViolation,
-    WSTLSHandshake,
-    WSTryAgainLater,
-)
+from . import status
+
+if TYPE_CHECKING:
+    from .http_exceptions import (
+        HTTPException,
+        BadRequestException,
+        UnauthorizedException,
+        ForbiddenException,
+        NotFoundException,
+        MethodNotAllowedException,
+        NotAcceptableException,
+        ProxyAuthenticationRequiredException,
+        RequestTimeoutException,
+        ConflictException,
+        GoneException,
+        LengthRequiredException,
+        PreconditionFailedException,
+        RequestEntityTooLargeException,
+        RequestUriTooLongException,
+        UnsupportedMediaTypeException,
+        RequestedRangeNotSatisfiableException,
+        ExpectationFailedException,
+        ImATeapotException,
+        MisdirectedRequestException,
+        UnprocessableEntityException,
+        LockedException,
+        FailedDependencyException,
+        UpgradeRequiredException,
+        PreconditionRequiredException,
+        TooManyRequestsException,
+        RequestHeaderFieldsTooLargeException,
+        UnavailableForLegalReasonsException,
+        BadGatewayException,
+        ServiceUnavailableException,
+        GatewayTimeoutException,
+    )
+
+    from .ws_exceptions import (
+        WebSocketException,
+        WSProtocolError,
+        WSUnsupportedData,
+        WSNoStatusReceived,
+        WSAbnormalClosure,
+        WSBadGateway,
+        WSInternalError,
+        WSMessageTooBig,
+        WSInvalidFramePayloadData,
+        WSServiceRestart,
+        WSMandatoryExt,
+        WSPolicyViolation,
+        WSTLSHandshake,
+        WSTryAgainLater,
+    )
+
+    from .registry import exception_for_status, raise_for_status
 
 __all__ = [
     "HTTPException",
@@ -75,6 +86,9 @@ __all__ = [
     "TooManyRequestsException",
     "RequestHeaderFieldsTooLargeException",
     "UnavailableForLegalReasonsException",
+    "BadGatewayException",
+    "ServiceUnavailableException",
+    "GatewayTimeoutException",
     "WebSocketException",
     "WSProtocolError",
     "WSUnsupportedData",
@@ -89,4 +103,70 @@ __all__ = [
     "WSPolicyViolation",
     "WSTLSHandshake",
     "WSTryAgainLater",
+    "exception_for_status",
+    "raise_for_status",
 ]
+
+_LAZY_IMPORTS = {
+    "HTTPException": ".http_exceptions",
+    "BadRequestException": ".http_exceptions",
+    "UnauthorizedException": ".http_exceptions",
+    "ForbiddenException": ".http_exceptions",
+    "NotFoundException": ".http_exceptions",
+    "MethodNotAllowedException": ".http_exceptions",
+    "NotAcceptableException": ".http_exceptions",
+    "ProxyAuthenticationRequiredException": ".http_exceptions",
+    "RequestTimeoutException": ".http_exceptions",
+    "ConflictException": ".http_exceptions",
+    "GoneException": ".http_exceptions",
+    "LengthRequiredException": ".http_exceptions",
+    "PreconditionFailedException": ".http_exceptions",
+    "RequestEntityTooLargeException": ".http_exceptions",
+    "RequestUriTooLongException": ".http_exceptions",
+    "UnsupportedMediaTypeException": ".http_exceptions",
+    "RequestedRangeNotSatisfiableException": ".http_exceptions",
+    "ExpectationFailedException": ".http_exceptions",
+    "ImATeapotException": ".http_exceptions",
+    "MisdirectedRequestException": ".http_exceptions",
+    "UnprocessableEntityException": ".http_exceptions",
+    "LockedException": ".http_exceptions",
+    "FailedDependencyException": ".http_exceptions",
+    "UpgradeRequiredException": ".http_exceptions",
+    "PreconditionRequiredException": ".http_exceptions",
+    "TooManyRequestsException": ".http_exceptions",
+    "RequestHeaderFieldsTooLargeException": ".http_exceptions",
+    "UnavailableForLegalReasonsException": ".http_exceptions",
+    "BadGatewayException": ".http_exceptions",
+    "ServiceUnavailableException": ".http_exceptions",
+    "GatewayTimeoutException": ".http_exceptions",
+    "WebSocketException": ".ws_exceptions",
+    "WSProtocolError": ".ws_exceptions",
+    "WSUnsupportedData": ".ws_exceptions",
+    "WSNoStatusReceived": ".ws_exceptions",
+    "WSAbnormalClosure": ".ws_exceptions",
+    "WSBadGateway": ".ws_exceptions",
+    "WSInternalError": ".ws_exceptions",
+    "WSMessageTooBig": ".ws_exceptions",
+    "WSInvalidFramePayloadData": ".ws_exceptions",
+    "WSServiceRestart": ".ws_exceptions",
+    "WSMandatoryExt": ".ws_exceptions",
+    "WSPolicyViolation": ".ws_exceptions",
+    "WSTLSHandshake": ".ws_exceptions",
+    "WSTryAgainLater": ".ws_exceptions",
+    "exception_for_status": ".registry",
+    "raise_for_status": ".registry",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(__all__)
@@ -0,0 +1,74 @@
+"""
+The JSON encoder used to render error documents.
+
+`orjson` or `msgspec` is used when installed, the standard library otherwise. All
+backends produce compact UTF-8 output, like `starlette.responses.JSONResponse`.
+
+The backends disagree on some values: `orjson` and `msgspec` write NaN and Infinity
+as `null` where `json` refuses them, reject or convert non-`str` dict keys
+differently, and format some floats differently (`1e16` against `1e+16`). So the
+fast backend only encodes content made of `str` keys and `str`, `bool`, `None` and
+64-bit `int` values, in dicts and lists; anything else goes to `json`. The output,
+and the errors raised, are then the same whichever extra is installed.
+"""
+
+import json
+from typing import Any, Callable
+
+_INT_MIN = -(2**63)
+_INT_MAX = 2**64 - 1
+
+
+def stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _is_plain(content: Any) -> bool:
+    """Whether every backend encodes `content` exactly like `stdlib_dumps()`."""
+    cls = content.__class__
+    if cls is str or cls is bool or content is None:
+        return True
+    if cls is int:
+        return _INT_MIN <= content <= _INT_MAX
+    if cls is dict:
+        return all(
+            key.__class__ is str and _is_plain(value) for key, value in content.items()
+        )
+    if cls is list or cls is tuple:
+        return all(_is_plain(item) for item in content)
+    return False
+
+
+def consistent(encode: Callable[[Any], bytes]) -> Callable[[Any], bytes]:
+    """Use `encode` for plain content and `stdlib_dumps()` for everything else."""
+
+    def dumps(content: Any) -> bytes:
+        if _is_plain(content):
+            return encode(content)
+        return stdlib_dumps(content)
+
+    return dumps
+
+
+dumps: Callable[[Any], bytes]
+
+try:
+    import orjson
+except ImportError:
+    try:
+        import msgspec
+    except ImportError:
+        BACKEND = "json"
+        dumps = stdlib_dumps
+    else:
+        BACKEND = "msgspec"
+        dumps = consistent(msgspec.json.Encoder().encode)
+else:
+    BACKEND = "orjson"
+    dumps = consistent(orjson.dumps)
@@ -0,0 +1,36 @@
+"""
+Reason phrases for every HTTP constant in `status.py`, computed once at import.
+
+`PHRASES` is the default `detail` of the exceptions, the same text Starlette would
+produce, and `JSON_DETAILS` holds the `{"detail": ...}` document for that default
+already encoded.
+"""
+
+import http
+from typing import Dict
+
+from . import status
+from ._json import stdlib_dumps
+
+
+def phrase_from_constant(constant_name: str) -> str:
+    """`HTTP_425_TOO_EARLY` -> `Too Early`, for codes the stdlib does not know."""
+    return " ".join(word.capitalize() for word in constant_name.split("_")[2:])
+
+
+def _build_phrases() -> Dict[int, str]:
+    phrases = {}
+    for name, code in vars(status).items():
+        if name.startswith("HTTP_"):
+            try:
+                phrases[code] = http.HTTPStatus(code).phrase
+            except ValueError:
+                phrases[code] = phrase_from_constant(name)
+    return phrases
+
+
+PHRASES: Dict[int, str] = _build_phrases()
+
+JSON_DETAILS: Dict[int, bytes] = {
+    code: stdlib_dumps({"detail": phrase}) for code, phrase in PHRASES.items()
+}
@@ -0,0 +1,29 @@
+"""
+A runtime stand-in for `typing_extensions.Doc` (PEP 727).
+
+The exception signatures document their parameters with `Annotated[..., Doc(...)]`.
+Type checkers see `typing_extensions.Doc`, but at runtime this class is used instead,
+so `typing.get_type_hints()` can resolve the annotations without importing
+`typing_extensions`, which is not a dependency and takes longer to import than the
+whole package.
+"""
+
+
+class Doc:
+    """Documentation for the annotated parameter, like `typing_extensions.Doc`."""
+
+    __slots__ = ("documentation",)
+
+    def __init__(self, documentation: str, /) -> None:
+        self.documentation = documentation
+
+    def __repr__(self) -> str:
+        return f"Doc({self.documentation!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.documentation)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Doc):
+            return NotImplemented
+        return self.documentation == other.documentation
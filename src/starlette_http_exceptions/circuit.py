@@ -0,0 +1,192 @@
+"""
+Circuit breakers for calls to downstream dependencies.
+
+A `CircuitBreaker` counts consecutive failures of one dependency. Once there are
+`failure_threshold` of them the circuit opens, and for `recovery_timeout` seconds
+every call fails immediately with `ServiceUnavailableException` (503) instead of
+waiting on the dependency. After that, the circuit is half-open: up to
+`half_open_max_calls` calls go through as probes, and the first outcome closes the
+circuit again or reopens it. A probe that has not finished within `probe_timeout`
+seconds counts as failed, so a hung probe reopens the circuit instead of keeping it
+half-open forever.
+
+Failures of the dependency itself surface as `GatewayTimeoutException` (504) when it
+timed out and `BadGatewayException` (502) otherwise, chained to the original error:
+
+```python
+payments = CircuitBreaker("payments", failure_threshold=5, recovery_timeout=30, timeout=2)
+
+
+@payments
+async def charge(order: Order) -> Receipt:
+    ...
+
+
+async def refund(order: Order) -> None:
+    async with payments:
+        ...
+```
+
+State lives in plain attributes and is only read and written between `await`s, so
+breakers need no lock as long as they are used from a single event loop.
+"""
+
+import asyncio
+import functools
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+import anyio
+from starlette.exceptions import HTTPException
+
+from .http_exceptions import (
+    BadGatewayException,
+    GatewayTimeoutException,
+    ServiceUnavailableException,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+T = TypeVar("T")
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for the dependency called `name`, usable as a decorator of async
+    functions and as an async context manager.
+
+    `failure_exceptions` are the errors that count as failures; an `HTTPException`
+    raised inside the breaker is passed through and counts as neither a failure nor a
+    success. `timeout` bounds the calls made through the decorator (or `call()`).
+
+    `probe_timeout` bounds how long the half-open probes may hold their slots in both
+    forms, including `async with`; it defaults to `timeout`, or `recovery_timeout`
+    when there is none.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        timeout: Optional[float] = None,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        clock: Callable[[], float] = time.monotonic,
+        probe_timeout: Optional[float] = None,
+    ) -> None:
+        if failure_threshold < 1 or half_open_max_calls < 1 or recovery_timeout <= 0:
+            raise ValueError(
+                "failure_threshold and half_open_max_calls must be at least 1 and "
+                "recovery_timeout positive"
+            )
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.timeout = timeout
+        if probe_timeout is None:
+            probe_timeout = timeout if timeout is not None else recovery_timeout
+        self.probe_timeout = probe_timeout
+        self.failure_exceptions = failure_exceptions
+        self._clock = clock
+        self.failures = 0
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probes_deadline = 0.0
+        self._retry_after_headers: Dict[int, Dict[str, str]] = {}
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == STATE_OPEN
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise `ServiceUnavailableException` if a call must not reach the dependency."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if state == STATE_HALF_OPEN:
+            if self._probes < self.half_open_max_calls:
+                if not self._probes:
+                    self._probes_deadline = self._clock() + self.probe_timeout
+                self._probes += 1
+                return
+            if self._clock() >= self._probes_deadline:
+                # The probes are hung: count it as a failed probe.
+                self.record_failure()
+        raise ServiceUnavailableException(headers=dict(self._retry_after()))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = STATE_CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = STATE_OPEN
+            self._opened_at = self._clock()
+
+    def _retry_after(self) -> Dict[str, str]:
+        remaining = self.recovery_timeout - (self._clock() - self._opened_at)
+        seconds = max(math.ceil(remaining), 1)
+        headers = self._retry_after_headers.get(seconds)
+        if headers is None:
+            headers = self._retry_after_headers[seconds] = {"Retry-After": str(seconds)}
+        return headers
+
+    def _convert(self, exc: BaseException) -> HTTPException:
+        # `asyncio.TimeoutError` is only an alias of `TimeoutError` from Python 3.11.
+        if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+            return GatewayTimeoutException()
+        return BadGatewayException()
+
+    async def __aenter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc is None:
+            self.record_success()
+            return
+        if isinstance(exc, HTTPException) or not isinstance(
+            exc, self.failure_exceptions
+        ):
+            # Inconclusive (cancelled, or an error of the caller's own): let another
+            # probe through.
+            if self._state == STATE_HALF_OPEN and self._probes:
+                self._probes -= 1
+            return
+        self.record_failure()
+        raise self._convert(exc) from exc
+
+    async def call(
+        self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """Await `func(*args, **kwargs)` through the breaker, within `timeout`."""
+        async with self:
+            if self.timeout is None:
+                return await func(*args, **kwargs)
+            with anyio.fail_after(self.timeout):
+                return await func(*args, **kwargs)
+
+    def __call__(
+        self, func: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.call(func, *args, **kwargs)
+
+        return wrapper
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r}, state={self.state!r})"
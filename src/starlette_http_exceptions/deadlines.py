@@ -0,0 +1,54 @@
+"""
+Per-request deadlines.
+
+`TimeoutMiddleware` stores the deadline of the current request in a context variable,
+so code further down the call stack can size its own timeouts to the budget that is
+left instead of outliving the request:
+
+```python
+from starlette_http_exceptions.deadlines import remaining_time
+
+
+async def fetch_user(user_id: int) -> User:
+    return await db.fetch_one(query, timeout=remaining_time())
+```
+
+Context variables are copied into `run_in_threadpool()`, so sync endpoints see the
+deadline too. Deadlines are `time.monotonic()` values.
+"""
+
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar(
+    "starlette_http_exceptions.deadline", default=None
+)
+
+
+def get_deadline() -> Optional[float]:
+    """The deadline of the current request, or `None` if it has none."""
+    return _deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left until the deadline of the current request (never negative), or `None`."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def set_deadline(deadline: float) -> "Token[Optional[float]]":
+    """
+    Set the deadline of the current context, keeping an earlier one if there is one.
+    Pass the returned token to `reset_deadline()` to restore the previous deadline.
+    """
+    current = _deadline.get()
+    if current is not None and current < deadline:
+        deadline = current
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token: "Token[Optional[float]]") -> None:
+    _deadline.reset(token)
@@ -0,0 +1,201 @@
+"""
+Sampled, rate limited logging of HTTP and WebSocket exceptions.
+
+During an incident the same error can be raised thousands of times per second, and
+logging each one makes logging the bottleneck. `SampledExceptionLogger` logs the
+first `burst` exceptions per status/close code in every `interval`, then one in
+every `sample_every`, and reports how many were suppressed in between on the next
+record it emits for that code.
+
+Records carry `status_code`, `detail`, `route`, `method`, `path` and `suppressed`
+attributes for structured log formatters. The message itself is only formatted by a
+handler that actually emits the record, and `start_background_logging()` moves that
+work, and the I/O, to a separate thread:
+
+```python
+exception_logger = SampledExceptionLogger(logging.getLogger("app.errors"))
+listener = start_background_logging(exception_logger.logger)
+app = Starlette(
+    routes=routes,
+    exception_handlers={
+        HTTPException: log_exceptions(CachedHTTPExceptionHandler(), exception_logger),
+    },
+)
+# ... and `listener.stop()` at shutdown.
+```
+"""
+
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.websockets import WebSocket
+
+from .handlers import ExceptionHandler, is_async_handler
+
+
+class SampledExceptionLogger:
+    """Logs exceptions to `logger`, sampled per status/close code."""
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        level: int = logging.WARNING,
+        burst: int = 10,
+        sample_every: int = 100,
+        interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if burst < 0 or sample_every < 1 or interval <= 0:
+            raise ValueError("burst must be >= 0, sample_every >= 1 and interval > 0")
+        self.logger = logger or logging.getLogger("starlette_http_exceptions")
+        self.level = level
+        self.burst = burst
+        self.sample_every = sample_every
+        self.interval = interval
+        self._clock = clock
+        # code -> [window start, seen in the window, suppressed since the last record]
+        self._windows: Dict[int, List[Any]] = {}
+
+    def sample(self, code: int) -> Optional[int]:
+        """
+        Count one exception for `code`. Return `None` if it should not be logged,
+        otherwise the number of exceptions suppressed since the last logged one.
+        """
+        now = self._clock()
+        window = self._windows.get(code)
+        if window is None:
+            window = self._windows[code] = [now, 0, 0]
+        elif now - window[0] >= self.interval:
+            window[0] = now
+            window[1] = 0
+        window[1] += 1
+        sampled = window[1] - self.burst
+        if sampled <= 0 or sampled % self.sample_every == 0:
+            suppressed = window[2]
+            window[2] = 0
+            return suppressed
+        window[2] += 1
+        return None
+
+    def log(
+        self, exc: Exception, conn: Optional[Union[Request, WebSocket]] = None
+    ) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        code = getattr(exc, "status_code", None)
+        if code is None:
+            code = getattr(exc, "code", 0)
+        suppressed = self.sample(code)
+        if suppressed is None:
+            return
+        scope = conn.scope if conn is not None else {}
+        route = getattr(scope.get("route"), "path", "")
+        detail = getattr(exc, "detail", None)
+        if detail is None:
+            detail = getattr(exc, "reason", "")
+        self.logger.log(
+            self.level,
+            "%s %s on %s (%d suppressed)",
+            code,
+            detail,
+            route or scope.get("path", ""),
+            suppressed,
+            extra={
+                "status_code": code,
+                "detail": detail,
+                "route": route,
+                "method": scope.get("method", "WEBSOCKET"),
+                "path": scope.get("path", ""),
+                "suppressed": suppressed,
+            },
+        )
+
+
+def log_exceptions(
+    handler: ExceptionHandler, exception_logger: SampledExceptionLogger
+) -> ExceptionHandler:
+    """Wrap an exception handler so every exception it handles goes through `exception_logger`."""
+    is_async = is_async_handler(handler)
+
+    async def logging_handler(conn: Union[Request, WebSocket], exc: Exception) -> Any:
+        exception_logger.log(exc, conn)
+        if is_async:
+            return await handler(conn, exc)
+        return await run_in_threadpool(handler, conn, exc)
+
+    return logging_handler
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # The queue never leaves the process, so records are enqueued as they are
+    # instead of being formatted (and made picklable) in the calling thread.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _BackgroundLogging(QueueListener):
+    # Puts `logger` back the way it was when the listener is stopped.
+    def __init__(
+        self,
+        logger: logging.Logger,
+        queue_handler: logging.Handler,
+        records: "queue.SimpleQueue[logging.LogRecord]",
+        handlers: List[logging.Handler],
+        own_handlers: List[logging.Handler],
+    ) -> None:
+        super().__init__(records, *handlers, respect_handler_level=True)
+        self.logger = logger
+        self._queue_handler = queue_handler
+        self._own_handlers = own_handlers
+        self._propagate = logger.propagate
+
+    def stop(self) -> None:
+        super().stop()
+        logger = self.logger
+        logger.removeHandler(self._queue_handler)
+        for handler in self._own_handlers:
+            logger.addHandler(handler)
+        logger.propagate = self._propagate
+
+
+def _effective_handlers(logger: logging.Logger) -> List[logging.Handler]:
+    # The handlers `Logger.callHandlers()` would call: the logger's own and those of
+    # its ancestors, up to the first one that does not propagate.
+    handlers: List[logging.Handler] = []
+    current: Optional[logging.Logger] = logger
+    while current is not None:
+        handlers.extend(current.handlers)
+        if not current.propagate:
+            break
+        current = current.parent
+    if not handlers and logging.lastResort is not None:
+        handlers.append(logging.lastResort)
+    return handlers
+
+
+def start_background_logging(logger: logging.Logger) -> QueueListener:
+    """
+    Move the handling of the records of `logger` to a background thread.
+
+    The logger is left with a single handler that puts records on a queue, and stops
+    propagating to its ancestors; the handlers that would have handled its records
+    (its own and those of its ancestors, such as the root logger's) format and write
+    them from a `QueueListener` thread instead. Call `stop()` on the returned
+    listener at shutdown to flush the queue and restore the logger.
+    """
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handlers = _effective_handlers(logger)
+    own_handlers = list(logger.handlers)
+    queue_handler = _DeferredQueueHandler(records)
+    listener = _BackgroundLogging(logger, queue_handler, records, handlers, own_handlers)
+    for handler in own_handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    listener.start()
+    return listener
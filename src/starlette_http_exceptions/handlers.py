@@ -0,0 +1,108 @@
+import inspect
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from starlette.exceptions import HTTPException, WebSocketException
+from starlette.requests import Request
+from starlette.websockets import WebSocket
+
+from ._lru import LRUCache
+from .responses import ErrorResponse, headers_key, render_json_error
+from .tracebacks import release_traceback
+
+
+_CACHEABLE_DETAILS = frozenset((str, int, bool, type(None)))
+
+
+def exception_key(exc: HTTPException) -> Optional[Tuple[Hashable, ...]]:
+    """
+    A hashable key for what an `HTTPException` renders to: its status code, detail
+    and headers. `None` unless the detail is a `str`, `int`, `bool` or `None`: equal
+    values of other types can render differently (`1.0` and `1`, `-0.0` and `0.0`,
+    or `(True,)` and `(1,)`), and containers would need every element tagged.
+    """
+    detail: Any = exc.detail
+    if detail.__class__ not in _CACHEABLE_DETAILS:
+        return None
+    try:
+        key = (
+            exc.status_code,
+            detail.__class__,
+            detail,
+            headers_key(exc.headers),
+        )
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class ErrorResponseCache:
+    """
+    A bounded LRU of fully encoded error responses.
+
+    Responses are keyed by status code, detail and headers, so raising the same
+    exception twice only encodes its body and headers once. Exceptions whose
+    `detail` is not a `str`, `int`, `bool` or `None`, or whose headers are not
+    hashable, are rendered every time and never cached.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._cache: LRUCache[ErrorResponse] = LRUCache(maxsize)
+
+    def key(self, exc: HTTPException) -> Optional[Tuple[Hashable, ...]]:
+        return exception_key(exc)
+
+    def get(self, exc: HTTPException) -> ErrorResponse:
+        key = self.key(exc)
+        if key is None:
+            return render_json_error(exc.status_code, exc.detail, exc.headers)
+        response = self._cache.get(key)
+        if response is None:
+            response = render_json_error(exc.status_code, exc.detail, exc.headers)
+            self._cache.set(key, response)
+        return response
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class CachedHTTPExceptionHandler:
+    """
+    An exception handler that renders `HTTPException` as `{"detail": ...}` JSON and
+    reuses the encoded response for repeated errors.
+
+    ```python
+    app = Starlette(
+        routes=routes,
+        exception_handlers={HTTPException: CachedHTTPExceptionHandler()},
+    )
+    ```
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.cache = ErrorResponseCache(maxsize)
+
+    async def __call__(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        response = self.cache.get(exc)
+        release_traceback(exc)
+        return response
+
+
+async def websocket_exception_handler(
+    websocket: WebSocket, exc: WebSocketException
+) -> None:
+    """Close the connection with the exception's code and reason, like Starlette does."""
+    await websocket.close(code=exc.code, reason=exc.reason)
+
+
+ExceptionHandler = Callable[..., Any]
+
+
+def is_async_handler(handler: ExceptionHandler) -> bool:
+    """Whether Starlette awaits `handler` directly rather than running it in a thread."""
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+        getattr(handler, "__call__", None)
+    )
@@ -1,12 +1,129 @@
+from __future__ import annotations
+
 from starlette.exceptions import HTTPException
-from typing import Any, Dict, Optional
-from typing_extensions import Annotated, Doc
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Dict, Optional, Type
 from . import status
+from ._phrases import PHRASES
+
+# `Annotated` and `Doc` are resolvable at runtime, for `typing.get_type_hints()`.
+if TYPE_CHECKING:
+    from typing_extensions import Doc
+
+    from .handlers import ErrorResponseCache
+    from .responses import ErrorResponse
+else:
+    from ._typing import Doc
+
+_RESPONSE_CACHE: Optional[ErrorResponseCache] = None
+_default_error_response: Optional[Callable[[int], ErrorResponse]] = None
+_status_for_exception: Optional[Callable[[Type[HTTPException]], int]] = None
+
+
+def _response_cache() -> ErrorResponseCache:
+    global _RESPONSE_CACHE
+
+    if _RESPONSE_CACHE is None:
+        from .handlers import ErrorResponseCache
+
+        _RESPONSE_CACHE = ErrorResponseCache()
+    return _RESPONSE_CACHE
+
+
+def _default_response(status_code: int) -> ErrorResponse:
+    global _default_error_response
+
+    if _default_error_response is None:
+        # Imported on first use so importing the exceptions does not import
+        # `starlette.responses`, and bound once so later calls skip the import.
+        from .responses import default_error_response
+
+        _default_error_response = default_error_response
+    return _default_error_response(status_code)
+
+
+def _status_code_of(cls: Type[HTTPException]) -> int:
+    global _status_for_exception
+
+    if _status_for_exception is None:
+        from .registry import status_for_exception
 
+        _status_for_exception = status_for_exception
+    return _status_for_exception(cls)
 
-class BadRequestException(HTTPException):
+
+class _BaseHTTPException(HTTPException):
+    """
+    Base class for the exceptions in this module.
+
+    The fields set by `HTTPException.__init__` live in slots, so instances never
+    allocate an instance `__dict__`. When no `detail` is given, the reason phrase
+    comes from a table built at import instead of being looked up on every raise.
+
+    `keep_traceback` overrides the global traceback policy for a class, see
+    `starlette_http_exceptions.tracebacks`.
+    """
+
+    __slots__ = ("status_code", "detail", "headers")
+
+    keep_traceback: Optional[bool] = None
+
+    def __init__(
+        self,
+        status_code: int,
+        detail: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if detail is None:
+            detail = PHRASES.get(status_code)
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
+
+    def __reduce__(self) -> Any:
+        # Reading `self.__dict__` would allocate the dict the slots avoid, but
+        # `BaseException.__reduce__` only includes it when it exists (notes, attributes
+        # of unslotted subclasses).
+        reduced = BaseException.__reduce__(self)
+        state = dict(reduced[2]) if len(reduced) > 2 else {}
+        state.update(
+            (name, getattr(self, name))
+            for cls in self.__class__.__mro__
+            for name in cls.__dict__.get("__slots__", ())
+            if not name.startswith("__") and hasattr(self, name)
+        )
+        return (self.__class__, self.args, state)
+
+    def as_response(self) -> ErrorResponse:
+        """
+        This exception rendered as a `{"detail": ...}` JSON response, to be returned
+        from an endpoint instead of raising the exception. The response is a `copy()`
+        of the one rendered for `default_response()` or, with a custom `detail` or
+        `headers`, of one from a bounded cache like `CachedHTTPExceptionHandler`'s, so
+        it can be changed without affecting other requests.
+        """
+        detail = self.detail
+        if (
+            self.headers is None
+            and detail.__class__ is str
+            and detail == PHRASES.get(self.status_code)
+        ):
+            return _default_response(self.status_code).copy()
+        return _response_cache().get(self).copy()
+
+    @classmethod
+    def default_response(cls) -> ErrorResponse:
+        """
+        The response of this class without `detail` or `headers`. It is a `copy()` of
+        a response rendered once per status code, so only the small response object is
+        allocated per call. The class is not instantiated, so this works for
+        subclasses whose `__init__` takes required arguments.
+        """
+        return _default_response(_status_code_of(cls)).copy()
+
+
+class BadRequestException(_BaseHTTPException):
     """Bad Request (400): The server could not understand the request due to invalid syntax."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -25,9 +142,11 @@ class BadRequestException(HTTPException):
         )
 
 
-class UnauthorizedException(HTTPException):
+class UnauthorizedException(_BaseHTTPException):
     """Unauthorized (401): The client must authenticate itself to get the requested response."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -46,9 +165,11 @@ class UnauthorizedException(HTTPException):
         )
 
 
-class ForbiddenException(HTTPException):
+class ForbiddenException(_BaseHTTPException):
     """Forbidden (403): The client does not have access rights to the content."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -67,9 +188,11 @@ class ForbiddenException(HTTPException):
         )
 
 
-class NotFoundException(HTTPException):
+class NotFoundException(_BaseHTTPException):
     """Not Found (404): The server can not find the requested resource."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -88,9 +211,11 @@ class NotFoundException(HTTPException):
         )
 
 
-class MethodNotAllowedException(HTTPException):
+class MethodNotAllowedException(_BaseHTTPException):
     """Method Not Allowed (405): The method is not allowed for the requested resource."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -111,9 +236,11 @@ class MethodNotAllowedException(HTTPException):
         )
 
 
-class NotAcceptableException(HTTPException):
+class NotAcceptableException(_BaseHTTPException):
     """Not Acceptable (406): The resource is capable of generating only content not acceptable according to the Accept headers sent in the request."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -132,9 +259,11 @@ class NotAcceptableException(HTTPException):
         )
 
 
-class ProxyAuthenticationRequiredException(HTTPException):
+class ProxyAuthenticationRequiredException(_BaseHTTPException):
     """Proxy Authentication Required (407): The client must authenticate itself to use a proxy."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -155,9 +284,11 @@ class ProxyAuthenticationRequiredException(HTTPException):
         )
 
 
-class RequestTimeoutException(HTTPException):
+class RequestTimeoutException(_BaseHTTPException):
     """Request Timeout (408): The server did not receive a complete request in time."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -176,9 +307,11 @@ class RequestTimeoutException(HTTPException):
         )
 
 
-class ConflictException(HTTPException):
+class ConflictException(_BaseHTTPException):
     """Conflict (409): The request could not be completed due to a conflict with the current state of the target resource."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -197,9 +330,11 @@ class ConflictException(HTTPException):
         )
 
 
-class GoneException(HTTPException):
+class GoneException(_BaseHTTPException):
     """Gone (410): The resource requested is no longer available and will not be available again."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -218,9 +353,11 @@ class GoneException(HTTPException):
         )
 
 
-class LengthRequiredException(HTTPException):
+class LengthRequiredException(_BaseHTTPException):
     """Length Required (411): The server refuses to accept the request without a defined content length."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -239,9 +376,11 @@ class LengthRequiredException(HTTPException):
         )
 
 
-class PreconditionFailedException(HTTPException):
+class PreconditionFailedException(_BaseHTTPException):
     """Precondition Failed (412): The server does not meet one of the preconditions specified by the client in the request headers."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -262,9 +401,11 @@ class PreconditionFailedException(HTTPException):
         )
 
 
-class RequestEntityTooLargeException(HTTPException):
+class RequestEntityTooLargeException(_BaseHTTPException):
     """Request Entity Too Large (413): The server is refusing to process a request because the entity is too large."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -285,9 +426,11 @@ class RequestEntityTooLargeException(HTTPException):
         )
 
 
-class RequestUriTooLongException(HTTPException):
+class RequestUriTooLongException(_BaseHTTPException):
     """Request URI Too Long (414): The URI requested by the client is longer than the server is willing to process."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -308,9 +451,11 @@ class RequestUriTooLongException(HTTPException):
         )
 
 
-class UnsupportedMediaTypeException(HTTPException):
+class UnsupportedMediaTypeException(_BaseHTTPException):
     """Unsupported Media Type (415): The server refuses to process the request because the media type is not supported."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -331,9 +476,11 @@ class UnsupportedMediaTypeException(HTTPException):
         )
 
 
-class RequestedRangeNotSatisfiableException(HTTPException):
+class RequestedRangeNotSatisfiableException(_BaseHTTPException):
     """Requested Range Not Satisfiable (416): The range specified by the client in the Range header is invalid."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -354,9 +501,11 @@ class RequestedRangeNotSatisfiableException(HTTPException):
         )
 
 
-class ExpectationFailedException(HTTPException):
+class ExpectationFailedException(_BaseHTTPException):
     """Expectation Failed (417): The server cannot meet the requirements of the Expect header."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -377,9 +526,11 @@ class ExpectationFailedException(HTTPException):
         )
 
 
-class ImATeapotException(HTTPException):
+class ImATeapotException(_BaseHTTPException):
     """I'm a teapot (418): The server is a teapot and cannot brew coffee."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -398,9 +549,11 @@ class ImATeapotException(HTTPException):
         )
 
 
-class MisdirectedRequestException(HTTPException):
+class MisdirectedRequestException(_BaseHTTPException):
     """Misdirected Request (421): The request was directed at the wrong server."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -421,9 +574,11 @@ class MisdirectedRequestException(HTTPException):
         )
 
 
-class UnprocessableEntityException(HTTPException):
+class UnprocessableEntityException(_BaseHTTPException):
     """Unprocessable Entity (422): The server understands the content type of the request entity, but was unable to process the contained instructions."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -444,9 +599,11 @@ class UnprocessableEntityException(HTTPException):
         )
 
 
-class LockedException(HTTPException):
+class LockedException(_BaseHTTPException):
     """Locked (423): The resource that is being accessed is locked."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -465,9 +622,11 @@ class LockedException(HTTPException):
         )
 
 
-class FailedDependencyException(HTTPException):
+class FailedDependencyException(_BaseHTTPException):
     """Failed Dependency (424): The request failed due to failure of a previous request."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -488,9 +647,11 @@ class FailedDependencyException(HTTPException):
         )
 
 
-class UpgradeRequiredException(HTTPException):
+class UpgradeRequiredException(_BaseHTTPException):
     """Upgrade Required (426): The client should switch to a different protocol."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -509,9 +670,11 @@ class UpgradeRequiredException(HTTPException):
         )
 
 
-class PreconditionRequiredException(HTTPException):
+class PreconditionRequiredException(_BaseHTTPException):
     """Precondition Required (428): The server requires the request to be conditional."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -532,9 +695,11 @@ class PreconditionRequiredException(HTTPException):
         )
 
 
-class TooManyRequestsException(HTTPException):
+class TooManyRequestsException(_BaseHTTPException):
     """Too Many Requests (429): The user has sent too many requests in a given amount of time."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -555,9 +720,11 @@ class TooManyRequestsException(HTTPException):
         )
 
 
-class RequestHeaderFieldsTooLargeException(HTTPException):
+class RequestHeaderFieldsTooLargeException(_BaseHTTPException):
     """Request Header Fields Too Large (431): The server refuses to process the request because the header fields are too large."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -578,9 +745,11 @@ class RequestHeaderFieldsTooLargeException(HTTPException):
         )
 
 
-class UnavailableForLegalReasonsException(HTTPException):
+class UnavailableForLegalReasonsException(_BaseHTTPException):
     """Unavailable For Legal Reasons (451): The resource is unavailable for legal reasons."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         detail: Annotated[
@@ -599,3 +768,78 @@ class UnavailableForLegalReasonsException(HTTPException):
             status_code=status.HTTP_451_UNAVAILABLE_FOR_LEGAL_REASONS,
             headers=headers,
         )
+
+
+class BadGatewayException(_BaseHTTPException):
+    """Bad Gateway (502): The server, while acting as a gateway or proxy, received an invalid response from the upstream server."""
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        detail: Annotated[
+            Any,
+            Doc(
+                "Any data to be sent to the client in the `detail` key of the JSON response."
+            ),
+        ] = None,
+        headers: Annotated[
+            Optional[Dict[str, str]],
+            Doc("Any headers to send to the client in the response."),
+        ] = None,
+    ):
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            headers=headers,
+        )
+
+
+class ServiceUnavailableException(_BaseHTTPException):
+    """Service Unavailable (503): The server is not ready to handle the request, usually because it is overloaded or down for maintenance."""
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        detail: Annotated[
+            Any,
+            Doc(
+                "Any data to be sent to the client in the `detail` key of the JSON response."
+            ),
+        ] = None,
+        headers: Annotated[
+            Optional[Dict[str, str]],
+            Doc("Any headers to send to the client in the response."),
+        ] = None,
+    ):
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers=headers,
+        )
+
+
+class GatewayTimeoutException(_BaseHTTPException):
+    """Gateway Timeout (504): The server, while acting as a gateway or proxy, did not get a response in time."""
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        detail: Annotated[
+            Any,
+            Doc(
+                "Any data to be sent to the client in the `detail` key of the JSON response."
+            ),
+        ] = None,
+        headers: Annotated[
+            Optional[Dict[str, str]],
+            Doc("Any headers to send to the client in the response."),
+        ] = None,
+    ):
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            headers=headers,
+        )
@@ -0,0 +1,145 @@
+"""
+Keyed locks that fail fast with `LockedException` (423) instead of queueing.
+
+Waiting behind a contended lock holds a worker and a connection for an unbounded
+time. `LockManager.try_acquire()` returns a `Lease` if the key is free and raises
+`LockedException`, with a `Retry-After` header, if it is not:
+
+```python
+documents = LockManager(lease_ttl=30)
+
+
+async def save_document(request):
+    async with documents.try_acquire(request.path_params["id"]):
+        ...
+```
+
+Leases expire after `lease_ttl` seconds, so a holder that never releases cannot
+block a key forever. A lease holds its key whether or not the `Lease` object is kept,
+so a lock can span requests until it is released or expires. Expired entries are
+dropped when their key is looked up, and by a sweep that runs whenever the number of
+entries has doubled since the last one, so millions of distinct keys do not
+accumulate and the sweep costs O(1) per acquisition, amortized.
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .http_exceptions import LockedException
+
+_MIN_SWEEP_SIZE = 1024
+
+
+class Lease:
+    """A lock on `key`, held until `release()` or until it expires."""
+
+    __slots__ = ("key", "expires", "_manager")
+
+    def __init__(self, manager: "LockManager", key: Hashable, expires: float) -> None:
+        self.key = key
+        self.expires = expires
+        self._manager = manager
+
+    @property
+    def expired(self) -> bool:
+        return self.expires <= self._manager._clock()
+
+    def renew(self, ttl: Optional[float] = None) -> None:
+        """Extend the lease by `ttl` seconds from now (the manager's `lease_ttl` by default)."""
+        if not self._manager.holds(self):
+            raise LockedException(headers=self._manager.retry_after_headers(self.key))
+        self.expires = self._manager._clock() + (
+            ttl if ttl is not None else self._manager.lease_ttl
+        )
+
+    def release(self) -> None:
+        self._manager.release(self)
+
+    async def __aenter__(self) -> "Lease":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.key!r}, expired={self.expired!r})"
+
+
+class LockManager:
+    """
+    Non-blocking locks keyed by any hashable value.
+
+    Everything happens synchronously, between `await`s, so the manager needs no
+    lock of its own when used from a single event loop.
+    """
+
+    def __init__(
+        self, lease_ttl: float = 30.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if lease_ttl <= 0:
+            raise ValueError("lease_ttl must be positive")
+        self.lease_ttl = lease_ttl
+        self._clock = clock
+        self._leases: Dict[Hashable, Lease] = {}
+        self._sweep_at = _MIN_SWEEP_SIZE
+        self._retry_after_headers: Dict[int, Dict[str, str]] = {}
+
+    def try_acquire(self, key: Hashable, ttl: Optional[float] = None) -> Lease:
+        """
+        Lock `key` for `ttl` seconds (`lease_ttl` by default), or raise
+        `LockedException` right away if it is already locked.
+        """
+        now = self._clock()
+        leases = self._leases
+        lease = leases.get(key)
+        if lease is not None and lease.expires > now:
+            raise LockedException(headers=dict(self._headers(lease.expires - now)))
+        lease = Lease(self, key, now + (ttl if ttl is not None else self.lease_ttl))
+        leases[key] = lease
+        if len(leases) >= self._sweep_at:
+            self._sweep(now)
+        return lease
+
+    def _sweep(self, now: float) -> None:
+        leases = self._leases
+        for key in [key for key, lease in leases.items() if lease.expires <= now]:
+            del leases[key]
+        self._sweep_at = max(2 * len(leases), _MIN_SWEEP_SIZE)
+
+    def _live(self, key: Hashable) -> Optional[Lease]:
+        lease = self._leases.get(key)
+        if lease is not None and lease.expires <= self._clock():
+            del self._leases[key]
+            return None
+        return lease
+
+    def release(self, lease: Lease) -> None:
+        """Release `lease`; a no-op if it has expired and `key` was locked again since."""
+        if self._leases.get(lease.key) is lease:
+            del self._leases[lease.key]
+        lease.expires = 0.0
+
+    def holds(self, lease: Lease) -> bool:
+        """Whether `lease` is still the live lock on its key."""
+        return self._live(lease.key) is lease
+
+    def locked(self, key: Hashable) -> bool:
+        return self._live(key) is not None
+
+    def retry_after_headers(self, key: Hashable) -> Dict[str, str]:
+        """The `Retry-After` header for a request blocked on `key`, in a new dict."""
+        lease = self._live(key)
+        remaining = lease.expires - self._clock() if lease is not None else 0.0
+        return dict(self._headers(remaining))
+
+    def _headers(self, remaining: float) -> Dict[str, str]:
+        seconds = max(math.ceil(remaining), 1)
+        headers = self._retry_after_headers.get(seconds)
+        if headers is None:
+            headers = self._retry_after_headers[seconds] = {"Retry-After": str(seconds)}
+        return headers
+
+    def __len__(self) -> int:
+        """The number of entries, including expired ones not dropped yet."""
+        return len(self._leases)
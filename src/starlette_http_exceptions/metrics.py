@@ -0,0 +1,264 @@
+"""
+Per-route counters of the HTTP and WebSocket exceptions an app emits.
+
+Counts live in one preallocated array of unsigned 64-bit integers, one row per route
+and one column per status/close code, so recording an exception is a dict lookup
+for the route and an integer increment: no lock and no metrics library call. Nothing
+is recorded unless a handler is wrapped with `instrument()`, and only the exceptions
+that reach such a handler are counted: one caught by the app itself, or answered by
+another handler or middleware, is not.
+
+The array can be backed by a memory-mapped file. Each worker process then writes to
+its own file and a separate exporter sums all of them:
+
+```python
+# In each worker.
+counters = ErrorCounters.for_worker("/dev/shm/app-errors")
+app = Starlette(
+    routes=routes,
+    exception_handlers={
+        HTTPException: instrument(CachedHTTPExceptionHandler(), counters),
+        WebSocketException: instrument(websocket_exception_handler, counters),
+    },
+)
+
+# In the exporter.
+text = render_prometheus(aggregate(glob.glob("/dev/shm/app-errors/*.counters")))
+```
+
+Files of workers that have exited are removed with `mark_process_dead()` (from the
+process manager, e.g. gunicorn's `child_exit` hook) or `remove_dead_workers()`, so
+restarts do not leave files behind. Their counts then leave the totals, which
+Prometheus treats as a counter reset.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.websockets import WebSocket
+
+from .handlers import ExceptionHandler, is_async_handler
+
+_HTTP_CODES = range(400, 600)
+_WS_CODES = range(1000, 1016)
+
+CODES: Tuple[int, ...] = tuple(_HTTP_CODES) + tuple(_WS_CODES)
+CODE_SLOTS = len(CODES)
+
+_SLOTS = array("h", [-1]) * (_WS_CODES.stop)
+for _slot, _code in enumerate(CODES):
+    _SLOTS[_code] = _slot
+
+_MAGIC = b"SHEC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_ROUTE_NAME_SIZE = 128
+_SUFFIX = ".counters"
+
+Counts = Dict[Tuple[str, int], int]
+
+
+def _layout(max_routes: int) -> Tuple[int, int]:
+    names_offset = _HEADER.size + 4  # pad the header to 16 bytes
+    counts_offset = names_offset + max_routes * _ROUTE_NAME_SIZE
+    return names_offset, counts_offset
+
+
+class ErrorCounters:
+    """
+    Counts exceptions by status/close code and route.
+
+    Row 0 collects exceptions without a route and those from routes beyond
+    `max_routes`. With `path`, the counters live in a memory-mapped file that other
+    processes can read with `read_counters()`.
+    """
+
+    def __init__(self, max_routes: int = 256, path: Optional[str] = None) -> None:
+        if max_routes < 1:
+            raise ValueError("max_routes must be at least 1")
+        self.max_routes = max_routes
+        self.path = path
+        names_offset, counts_offset = _layout(max_routes)
+        size = counts_offset + max_routes * CODE_SLOTS * 8
+        self._buffer: Union[bytearray, mmap.mmap]
+        if path is None:
+            self._buffer = bytearray(size)
+        else:
+            with open(path, "w+b") as f:
+                f.truncate(size)
+                self._buffer = mmap.mmap(f.fileno(), size)
+        _HEADER.pack_into(self._buffer, 0, _MAGIC, _VERSION, max_routes)
+        self._names = memoryview(self._buffer)[names_offset:counts_offset]
+        self._counts = memoryview(self._buffer)[counts_offset:].cast("Q")
+        self._rows: Dict[str, int] = {"": 0}
+
+    @classmethod
+    def for_worker(cls, directory: str, max_routes: int = 256) -> "ErrorCounters":
+        """Counters backed by `<directory>/<pid>.counters`."""
+        os.makedirs(directory, exist_ok=True)
+        return cls(max_routes=max_routes, path=_worker_path(directory, os.getpid()))
+
+    def record(self, code: int, route: str = "") -> None:
+        try:
+            slot = _SLOTS[code]
+        except IndexError:
+            return
+        if slot < 0:
+            return
+        row = self._rows.get(route)
+        if row is None:
+            row = self._add_route(route)
+        self._counts[row * CODE_SLOTS + slot] += 1
+
+    def _add_route(self, route: str) -> int:
+        row = len(self._rows)
+        if row >= self.max_routes:
+            return 0
+        name = route.encode("utf-8")[:_ROUTE_NAME_SIZE]
+        start = row * _ROUTE_NAME_SIZE
+        self._names[start : start + len(name)] = name
+        self._rows[route] = row
+        return row
+
+    def snapshot(self) -> Counts:
+        return _read(self._names, self._counts, len(self._rows))
+
+    def close(self) -> None:
+        self._names.release()
+        self._counts.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+def _read(names: memoryview, counts: memoryview, routes: int) -> Counts:
+    result: Counts = {}
+    for row in range(routes):
+        start = row * _ROUTE_NAME_SIZE
+        route = bytes(names[start : start + _ROUTE_NAME_SIZE]).rstrip(b"\0")
+        if row and not route:
+            continue
+        name = route.decode("utf-8", "replace")
+        base = row * CODE_SLOTS
+        for slot, code in enumerate(CODES):
+            value = counts[base + slot]
+            if value:
+                key = (name, code)
+                result[key] = result.get(key, 0) + value
+    return result
+
+
+def read_counters(path: str) -> Counts:
+    """Read the counters a worker writes to `path`."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            magic, version, max_routes = _HEADER.unpack_from(buffer, 0)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path!r} is not an error counters file")
+            names_offset, counts_offset = _layout(max_routes)
+            view = memoryview(buffer)
+            names = view[names_offset:counts_offset]
+            counts = view[counts_offset:].cast("Q")
+            try:
+                return _read(names, counts, max_routes)
+            finally:
+                counts.release()
+                names.release()
+                view.release()
+
+
+def _worker_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{pid}{_SUFFIX}")
+
+
+def mark_process_dead(pid: int, directory: str) -> None:
+    """
+    Remove the counters file the worker `pid` wrote to in `directory`, once it has
+    exited, like `prometheus_client.multiprocess.mark_process_dead()`.
+    """
+    try:
+        os.remove(_worker_path(directory, pid))
+    except FileNotFoundError:
+        pass
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_dead_workers(directory: str) -> List[int]:
+    """
+    Call `mark_process_dead()` for every counters file in `directory` whose process is
+    gone, and return their pids. Checks liveness with `os.kill(pid, 0)` (POSIX).
+    """
+    removed = []
+    for name in os.listdir(directory):
+        stem, suffix = os.path.splitext(name)
+        if suffix != _SUFFIX or not stem.isdigit():
+            continue
+        pid = int(stem)
+        if pid != os.getpid() and not _is_alive(pid):
+            mark_process_dead(pid, directory)
+            removed.append(pid)
+    return removed
+
+
+def aggregate(paths: Iterable[str]) -> Counts:
+    """Sum the counters of several workers."""
+    total: Counts = {}
+    for path in paths:
+        for key, value in read_counters(path).items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(
+    counts: Counts, name: str = "starlette_http_exceptions_total"
+) -> str:
+    """Render counts in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {name} HTTP and WebSocket exceptions by status/close code and route.",
+        f"# TYPE {name} counter",
+    ]
+    for (route, code), value in sorted(counts.items()):
+        kind = "websocket" if code in _WS_CODES else "http"
+        lines.append(
+            f'{name}{{kind="{kind}",code="{code}",route="{_escape(route)}"}} {value}'
+        )
+    return "\n".join(lines) + "\n"
+
+
+def instrument(handler: ExceptionHandler, counters: ErrorCounters) -> ExceptionHandler:
+    """
+    Wrap an exception handler so every exception it handles is counted by the route
+    of the request and its `status_code` (HTTP) or `code` (WebSocket). Exceptions that
+    never reach the handler are not counted.
+    """
+
+    is_async = is_async_handler(handler)
+
+    async def counting_handler(conn: Union[Request, WebSocket], exc: Exception) -> Any:
+        code = getattr(exc, "status_code", None)
+        if code is None:
+            code = getattr(exc, "code", 0)
+        route = conn.scope.get("route")
+        counters.record(code, getattr(route, "path", ""))
+        if is_async:
+            return await handler(conn, exc)
+        return await run_in_threadpool(handler, conn, exc)
+
+    return counting_handler
@@ -0,0 +1,39 @@
+from .admission import WebSocketAdmissionMiddleware
+from .errors import HTTPExceptionMiddleware
+from .idempotency import (
+    IdempotencyMiddleware,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+)
+from .load_shedding import LoadSheddingMiddleware
+from .message_size import WebSocketMessageSizeMiddleware
+from .negative_cache import NegativeCache, NegativeCacheMiddleware
+from .rate_limit import RateLimitMiddleware
+from .request_size import RequestSizeLimitMiddleware
+from .timeout import TimeoutMiddleware
+from .ws_rate_limit import TokenBuckets, WebSocketRateLimitMiddleware
+from .websocket_registry import (
+    WebSocketRegistry,
+    WebSocketRegistryMiddleware,
+    reconnect_reason,
+)
+
+__all__ = [
+    "HTTPExceptionMiddleware",
+    "IdempotencyMiddleware",
+    "IdempotencyStore",
+    "LoadSheddingMiddleware",
+    "MemoryIdempotencyStore",
+    "NegativeCache",
+    "NegativeCacheMiddleware",
+    "RateLimitMiddleware",
+    "RequestSizeLimitMiddleware",
+    "TimeoutMiddleware",
+    "TokenBuckets",
+    "WebSocketAdmissionMiddleware",
+    "WebSocketMessageSizeMiddleware",
+    "WebSocketRateLimitMiddleware",
+    "WebSocketRegistry",
+    "WebSocketRegistryMiddleware",
+    "reconnect_reason",
+]
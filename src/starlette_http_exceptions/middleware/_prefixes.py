@@ -0,0 +1,39 @@
+from typing import Generic, List, Mapping, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class PrefixTable(Generic[V]):
+    """
+    Values keyed by path prefix, as given to the `route_limits`-style arguments of the
+    middleware.
+
+    A prefix matches the path itself and the paths below it, on a segment boundary:
+    `/api` (or `/api/`) matches `/api` and `/api/items`, not `/apiary` or `/api-docs`.
+    The longest matching prefix wins.
+    """
+
+    def __init__(self, values: Optional[Mapping[str, V]] = None) -> None:
+        self._entries: List[Tuple[str, str, V]] = sorted(
+            (
+                (prefix, prefix.rstrip("/"), value)
+                for prefix, value in (values or {}).items()
+            ),
+            key=lambda entry: len(entry[0]),
+            reverse=True,
+        )
+
+    def match(self, path: str) -> Optional[Tuple[str, V]]:
+        """The `(prefix, value)` of the longest prefix matching `path`, or `None`."""
+        for prefix, stem, value in self._entries:
+            if path.startswith(stem) and (
+                len(path) == len(stem) or path[len(stem)] == "/"
+            ):
+                return prefix, value
+        return None
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
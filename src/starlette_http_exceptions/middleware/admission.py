@@ -0,0 +1,99 @@
+from typing import Callable, Dict, Hashable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..http_exceptions import ServiceUnavailableException
+from ..responses import render_json_error
+from ..ws_exceptions import WSTryAgainLater
+
+ClientKey = Callable[[Scope], Optional[Hashable]]
+
+
+def client_host(scope: Scope) -> Optional[Hashable]:
+    """The default client key: the client's IP address, as seen by the server."""
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class WebSocketAdmissionMiddleware:
+    """
+    Refuses new WebSocket connections with `WSTryAgainLater` (1013) once the worker holds
+    `max_connections` of them, or once the client identified by `client_key` holds
+    `max_per_client`.
+
+    Refused connections are answered before the app runs, so none of its
+    per-connection state is created. A close before the handshake completes reaches
+    clients as an HTTP 403, which looks like an authorization failure, so instead:
+
+    * if the server offers the `websocket.http.response` extension, the handshake is
+      answered with a 503 `ServiceUnavailableException` and `Retry-After:
+      <retry_after>`;
+    * otherwise the connection is accepted and closed right away with 1013.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_connections: Optional[int] = None,
+        max_per_client: Optional[int] = None,
+        client_key: ClientKey = client_host,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.max_connections = max_connections
+        self.max_per_client = max_per_client
+        self.client_key = client_key
+        self.connections = 0
+        self.client_connections: Dict[Hashable, int] = {}
+        self._close_code = WSTryAgainLater().code
+        exc = ServiceUnavailableException(headers={"Retry-After": str(retry_after)})
+        self._rejection = render_json_error(exc.status_code, exc.detail, exc.headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        key = self.client_key(scope) if self.max_per_client is not None else None
+        if (
+            self.max_connections is not None
+            and self.connections >= self.max_connections
+        ) or (
+            key is not None
+            and self.client_connections.get(key, 0) >= self.max_per_client  # type: ignore[operator]
+        ):
+            message = await receive()
+            if message["type"] == "websocket.connect":
+                await self._refuse(scope, send)
+            return
+
+        self.connections += 1
+        if key is not None:
+            self.client_connections[key] = self.client_connections.get(key, 0) + 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.connections -= 1
+            if key is not None:
+                remaining = self.client_connections[key] - 1
+                if remaining:
+                    self.client_connections[key] = remaining
+                else:
+                    del self.client_connections[key]
+
+    async def _refuse(self, scope: Scope, send: Send) -> None:
+        if "websocket.http.response" in scope.get("extensions", {}):
+            rejection = self._rejection
+            await send(
+                {
+                    "type": "websocket.http.response.start",
+                    "status": rejection.status_code,
+                    "headers": rejection.raw_headers,
+                }
+            )
+            await send(
+                {"type": "websocket.http.response.body", "body": rejection.body}
+            )
+            return
+        await send({"type": "websocket.accept"})
+        await send({"type": "websocket.close", "code": self._close_code})
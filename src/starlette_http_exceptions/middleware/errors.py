@@ -0,0 +1,49 @@
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..handlers import ErrorResponseCache
+from ..responses import send_response
+from ..tracebacks import release_traceback
+
+
+class HTTPExceptionMiddleware:
+    """
+    A pure ASGI middleware that turns `HTTPException` into a JSON error response by
+    writing the ASGI messages directly, with no `Request`, `Response` or handler
+    lookup in between.
+
+    Starlette's routing catches `HTTPException` raised by endpoints before it reaches
+    user middleware, so this middleware is for exceptions that would otherwise reach
+    `ServerErrorMiddleware`: those raised by other middleware (an authentication
+    middleware raising `UnauthorizedException`, for example) or by plain ASGI apps.
+
+    Anything that is not an `HTTPException`, exceptions raised after the response has
+    started and non-HTTP scopes are re-raised unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, maxsize: int = 1024) -> None:
+        self.app = app
+        self.cache = ErrorResponseCache(maxsize)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def sender(message: Message) -> None:
+            nonlocal response_started
+
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, sender)
+        except HTTPException as exc:
+            if response_started:
+                raise
+            response = self.cache.get(exc)
+            release_traceback(exc)
+            await send_response(send, response)
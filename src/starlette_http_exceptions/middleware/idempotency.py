@@ -0,0 +1,244 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Collection, Hashable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .. import status
+from ..responses import (
+    ErrorResponse,
+    RawHeaders,
+    default_error_response,
+    render_json_error,
+    send_response,
+)
+from .admission import ClientKey, client_host
+
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+
+# Never replayed: a stored cookie would hand one client's session to another.
+_UNSTORED_HEADERS = frozenset((b"set-cookie",))
+
+# Stored instead of a response too large to keep: the request did run, so running it
+# again would break the guarantee.
+_NOT_REPLAYABLE = render_json_error(
+    status.HTTP_409_CONFLICT,
+    "The request with this Idempotency-Key completed, "
+    "but its response was too large to replay.",
+)
+
+
+def caller_identity(scope: Scope) -> Optional[Hashable]:
+    """
+    The default caller key: the `Authorization` and `Cookie` headers of the request,
+    or the client's IP address when it has neither.
+    """
+    authorization = cookie = None
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value
+        elif name == b"cookie":
+            cookie = value
+    if authorization is None and cookie is None:
+        return client_host(scope)
+    return (authorization, cookie)
+
+
+class IdempotencyStore:
+    """
+    Base class for the stores of `IdempotencyMiddleware`.
+
+    The methods are synchronous so that the common path (a new key) costs no extra
+    `await`; a store backed by a network service should keep a local view and sync
+    it in the background.
+    """
+
+    def claim(self, key: Hashable) -> Tuple[bool, Optional[ErrorResponse]]:
+        """
+        Atomically claim `key` for a new request. Return `(True, None)` if it was
+        claimed, `(False, response)` if the request must be answered with `response`
+        (usually the stored response of a completed request with that key), and
+        `(False, None)` if one is still in flight.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+    def complete(self, key: Hashable, response: ErrorResponse) -> None:
+        """Store the response of the request that claimed `key`."""
+        raise NotImplementedError()  # pragma: no cover
+
+    def release(self, key: Hashable) -> None:
+        """Forget `key` without a response, so the request can be retried."""
+        raise NotImplementedError()  # pragma: no cover
+
+
+class _Entry:
+    __slots__ = ("expires", "response")
+
+    def __init__(self, expires: float, response: Optional[ErrorResponse]) -> None:
+        self.expires = expires
+        self.response = response
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    Keeps up to `maxsize` keys in the process for `ttl` seconds after they were
+    claimed, evicting the oldest ones first.
+
+    Only completed keys are evicted before they expire: dropping an in-flight key
+    would let a concurrent repeat run too. When every key is in flight, new keys are
+    answered with `ServiceUnavailableException` (503) until one completes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 24 * 60 * 60,
+        maxsize: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0 or maxsize < 1:
+            raise ValueError("ttl must be positive and maxsize at least 1")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._full = default_error_response(status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def claim(self, key: Hashable) -> Tuple[bool, Optional[ErrorResponse]]:
+        now = self._clock()
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            if entry.expires > now:
+                return False, entry.response
+            del entries[key]
+        if not self._make_room(now):
+            return False, self._full
+        entries[key] = _Entry(now + self.ttl, None)
+        return True, None
+
+    def _make_room(self, now: float) -> bool:
+        entries = self._entries
+        # Entries are ordered by expiry, so expired ones are at the front.
+        while entries:
+            oldest = next(iter(entries.values()))
+            if oldest.expires > now:
+                break
+            entries.popitem(last=False)
+        if len(entries) < self.maxsize:
+            return True
+        # In-flight keys are bounded by the number of concurrent requests, so few
+        # are skipped before a completed one.
+        for oldest_key, entry in entries.items():
+            if entry.response is not None:
+                del entries[oldest_key]
+                return True
+        return False
+
+    def complete(self, key: Hashable, response: ErrorResponse) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.response = response
+
+    def release(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class IdempotencyMiddleware:
+    """
+    Executes requests carrying the same `Idempotency-Key` header only once.
+
+    The first request with a key runs the app and its response is stored; repeats
+    get the stored response back, with an `Idempotent-Replayed: true` header, and a
+    repeat that arrives while the first request is still running is answered at once
+    with `ConflictException` (409).
+
+    Keys are scoped to the method, the path and the caller, as identified by
+    `caller_key` (by default the `Authorization` and `Cookie` headers, or the client's
+    IP address), so a client reusing another's key never gets that client's response.
+    `Set-Cookie` headers are never stored or replayed.
+
+    Only `methods` are considered, and responses are stored when their status is below
+    500; the key is released after a 5xx so the client can retry. When the body does
+    not fit in `max_body_size` bytes, repeats get a `ConflictException` (409) saying
+    the response cannot be replayed instead, so the request never runs twice.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[IdempotencyStore] = None,
+        methods: Collection[str] = ("POST", "PATCH"),
+        header: str = "idempotency-key",
+        max_body_size: int = 1024 * 1024,
+        caller_key: ClientKey = caller_identity,
+    ) -> None:
+        self.app = app
+        self.store = store if store is not None else MemoryIdempotencyStore()
+        self.methods = frozenset(methods)
+        self.header = header.lower().encode("latin-1")
+        self.max_body_size = max_body_size
+        self.caller_key = caller_key
+        self._conflict = default_error_response(status.HTTP_409_CONFLICT)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == self.header:
+                break
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        store = self.store
+        key = (value, scope["method"], scope["path"], self.caller_key(scope))
+        claimed, stored = store.claim(key)
+        if not claimed:
+            await send_response(send, stored if stored is not None else self._conflict)
+            return
+
+        status_code = 0
+        raw_headers: RawHeaders = ()
+        chunks: List[bytes] = []
+        size = 0
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status_code, raw_headers, size
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Copied now: outer middleware may add to the list in place.
+                raw_headers = tuple(
+                    (name, value)
+                    for name, value in message.get("headers", ())
+                    if name not in _UNSTORED_HEADERS
+                )
+            elif message["type"] == "http.response.body" and size >= 0:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > self.max_body_size:
+                    chunks.clear()
+                    size = -1
+                else:
+                    chunks.append(body)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capturing_send)
+        except BaseException:
+            store.release(key)
+            raise
+        if not status_code or status_code >= 500:
+            store.release(key)
+        elif size < 0:
+            store.complete(key, _NOT_REPLAYABLE)
+        else:
+            response = ErrorResponse(
+                status_code, b"".join(chunks), raw_headers + (REPLAYED_HEADER,)
+            )
+            store.complete(key, response)
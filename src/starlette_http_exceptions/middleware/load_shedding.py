@@ -0,0 +1,100 @@
+import math
+import time
+from typing import Dict, Mapping, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..http_exceptions import ServiceUnavailableException
+from ..responses import ErrorResponse, render_json_error, send_response
+from ._prefixes import PrefixTable
+
+
+class _Limit:
+    __slots__ = ("prefix", "limit", "in_flight")
+
+    def __init__(self, prefix: str, limit: int) -> None:
+        self.prefix = prefix
+        self.limit = limit
+        self.in_flight = 0
+
+
+class LoadSheddingMiddleware:
+    """
+    Rejects HTTP requests with 503 Service Unavailable once too many are in flight,
+    instead of queueing them.
+
+    `max_concurrency` bounds the requests in flight across the whole app, and
+    `route_limits` maps path prefixes to their own bound (the longest matching prefix
+    applies; `/api` covers `/api/items` but not `/apiary`). Rejected requests are answered before their body is read and before
+    any other middleware or endpoint runs, with a pre-rendered `ServiceUnavailableException`
+    response.
+
+    Its `Retry-After` header is the recent average request duration, rounded up and
+    clamped to `[min_retry_after, max_retry_after]` seconds.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrency: Optional[int] = None,
+        route_limits: Optional[Mapping[str, int]] = None,
+        min_retry_after: int = 1,
+        max_retry_after: int = 60,
+    ) -> None:
+        if min_retry_after < 0 or max_retry_after < min_retry_after:
+            raise ValueError("expected 0 <= min_retry_after <= max_retry_after")
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.min_retry_after = min_retry_after
+        self.max_retry_after = max_retry_after
+        self.in_flight = 0
+        self._limits: PrefixTable[_Limit] = PrefixTable(
+            {
+                prefix: _Limit(prefix, limit)
+                for prefix, limit in (route_limits or {}).items()
+            }
+        )
+        self._average_duration = 0.0
+        self._responses: Dict[int, ErrorResponse] = {}
+
+    def retry_after(self) -> int:
+        seconds = math.ceil(self._average_duration)
+        return min(max(seconds, self.min_retry_after), self.max_retry_after)
+
+    def _rejection(self) -> ErrorResponse:
+        retry_after = self.retry_after()
+        response = self._responses.get(retry_after)
+        if response is None:
+            exc = ServiceUnavailableException(headers={"Retry-After": str(retry_after)})
+            response = render_json_error(exc.status_code, exc.detail, exc.headers)
+            self._responses[retry_after] = response
+        return response
+
+    def _route_limit(self, path: str) -> Optional[_Limit]:
+        match = self._limits.match(path)
+        return match[1] if match is not None else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_limit = self._route_limit(scope["path"]) if self._limits else None
+        if (
+            self.max_concurrency is not None and self.in_flight >= self.max_concurrency
+        ) or (route_limit is not None and route_limit.in_flight >= route_limit.limit):
+            await send_response(send, self._rejection())
+            return
+
+        self.in_flight += 1
+        if route_limit is not None:
+            route_limit.in_flight += 1
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            if route_limit is not None:
+                route_limit.in_flight -= 1
+            duration = time.monotonic() - start
+            self._average_duration += (duration - self._average_duration) * 0.1
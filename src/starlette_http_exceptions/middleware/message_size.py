@@ -0,0 +1,110 @@
+import time
+from typing import Callable, Mapping, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..ws_exceptions import WSMessageTooBig
+from ._prefixes import PrefixTable
+
+
+def message_size(message: Message) -> int:
+    """The payload size of a `websocket.receive` message, in bytes."""
+    data = message.get("bytes")
+    if data is not None:
+        return len(data)
+    text = message.get("text")
+    if text is None:
+        return 0
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8"))
+
+
+class WebSocketMessageSizeMiddleware:
+    """
+    Closes WebSocket connections with `WSMessageTooBig` (1009) when a client sends too
+    much, before the app sees the offending message.
+
+    * `max_message_size` bounds every message, in bytes. `route_limits` maps path
+      prefixes to their own bound (the longest matching prefix applies; `/ws` covers
+      `/ws/chat` but not `/wsx`).
+    * `max_window_bytes` bounds the bytes received on a connection in every `window`
+      seconds.
+
+    The app receives a `websocket.disconnect` with code 1009 instead of the message,
+    and whatever it sends afterwards is dropped.
+
+    ASGI servers hand over whole messages, so the server has already buffered the
+    message when this middleware sees it. Bound that with the server's own limit
+    (`--ws-max-size` for Uvicorn, `websocket_max_message_size` for Hypercorn) set to
+    the largest limit configured here.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_message_size: Optional[int] = None,
+        max_window_bytes: Optional[int] = None,
+        window: float = 1.0,
+        route_limits: Optional[Mapping[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.app = app
+        self.max_message_size = max_message_size
+        self.max_window_bytes = max_window_bytes
+        self.window = window
+        self._route_limits: PrefixTable[int] = PrefixTable(route_limits)
+        self._clock = clock
+
+    def message_limit(self, path: str) -> Optional[int]:
+        match = self._route_limits.match(path)
+        return match[1] if match is not None else self.max_message_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        message_limit = self.message_limit(scope["path"])
+        window_limit = self.max_window_bytes
+        if message_limit is None and window_limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        clock = self._clock
+        window = self.window
+        window_start = clock()
+        window_bytes = 0
+        closed = False
+
+        async def limited_receive() -> Message:
+            nonlocal window_start, window_bytes, closed
+
+            message = await receive()
+            if closed or message["type"] != "websocket.receive":
+                return message
+            size = message_size(message)
+            too_big = message_limit is not None and size > message_limit
+            if not too_big and window_limit is not None:
+                now = clock()
+                if now - window_start >= window:
+                    window_start = now
+                    window_bytes = 0
+                window_bytes += size
+                too_big = window_bytes > window_limit
+            if not too_big:
+                return message
+            exc = WSMessageTooBig()
+            closed = True
+            await send(
+                {"type": "websocket.close", "code": exc.code, "reason": exc.reason}
+            )
+            return {"type": "websocket.disconnect", "code": exc.code}
+
+        async def guarded_send(message: Message) -> None:
+            if not closed:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
@@ -0,0 +1,215 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .. import status
+from ..responses import ErrorResponse, RawHeaders, send_response
+
+CacheKey = Tuple[bytes, ...]
+
+_CACHED_STATUSES = (status.HTTP_404_NOT_FOUND, status.HTTP_410_GONE)
+
+
+class _Entry:
+    __slots__ = ("path", "response", "expires", "size")
+
+    def __init__(
+        self, path: str, response: ErrorResponse, expires: float, size: int
+    ) -> None:
+        self.path = path
+        self.response = response
+        self.expires = expires
+        self.size = size
+
+
+class NegativeCache:
+    """
+    A bounded store of 404 Not Found and 410 Gone responses.
+
+    Entries expire after `ttl` seconds, or `gone_ttl` seconds for 410 responses, and
+    the least recently used ones are evicted once there are more than `maxsize` of them
+    or their bodies and headers take more than `max_bytes`.
+
+    Call `invalidate(path)` when a resource is created at `path`, so the next request
+    reaches the app again. Responses to requests that started before the invalidation
+    are not stored: pass the `generation(path)` read when the request started to
+    `set()`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        gone_ttl: float = 3600.0,
+        maxsize: int = 10_000,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1 or max_bytes < 1 or ttl <= 0 or gone_ttl <= 0:
+            raise ValueError("maxsize, max_bytes, ttl and gone_ttl must be positive")
+        self.ttl = ttl
+        self.gone_ttl = gone_ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._paths: Dict[str, Set[CacheKey]] = {}
+        # Bumped by `invalidate()`; paths that were never invalidated are at 0. At most
+        # `maxsize` paths are remembered: forgetting one, like `clear()`, starts a new
+        # epoch, which only makes requests in flight skip storing their response.
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._epoch = 0
+
+    def get(self, key: CacheKey) -> Optional[ErrorResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self._clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def generation(self, path: str) -> Tuple[int, int]:
+        """An opaque token that changes whenever `path` is invalidated."""
+        return self._epoch, self._generations.get(path, 0)
+
+    def set(
+        self,
+        key: CacheKey,
+        path: str,
+        response: ErrorResponse,
+        generation: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """
+        Store `response`, unless `generation` was read before `path` was last
+        invalidated.
+        """
+        if generation is not None and generation != self.generation(path):
+            return
+        size = len(response.body) + sum(
+            len(name) + len(value) for name, value in response.raw_headers
+        )
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        ttl = (
+            self.gone_ttl if response.status_code == status.HTTP_410_GONE else self.ttl
+        )
+        self._entries[key] = _Entry(path, response, self._clock() + ttl, size)
+        self._paths.setdefault(path, set()).add(key)
+        self.size += size
+        while len(self._entries) > self.maxsize or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, path: str) -> int:
+        """Drop every entry for `path`, whatever the method and headers. Return how many."""
+        generations = self._generations
+        generations[path] = generations.get(path, 0) + 1
+        generations.move_to_end(path)
+        if len(generations) > self.maxsize:
+            generations.popitem(last=False)
+            self._epoch += 1
+        keys = self._paths.get(path, ())
+        count = len(keys)
+        for key in list(keys):
+            self._remove(key)
+        return count
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._paths.clear()
+        self._generations.clear()
+        self._epoch += 1
+        self.size = 0
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        keys = self._paths[entry.path]
+        keys.discard(key)
+        if not keys:
+            del self._paths[entry.path]
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NegativeCacheMiddleware:
+    """
+    Serves recent 404 Not Found and 410 Gone responses from a `NegativeCache` without
+    calling the app again.
+
+    Responses are keyed by method, path, query string and the request headers named
+    in `vary_headers`. Only `methods` are cached, and responses that set cookies or
+    are streamed in several chunks are not. If a 404 depends on who is asking, list
+    the headers that identify them (`authorization`, `cookie`...) in `vary_headers`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: Optional[NegativeCache] = None,
+        vary_headers: Collection[str] = (),
+        methods: Collection[str] = ("GET", "HEAD"),
+    ) -> None:
+        self.app = app
+        self.cache = cache if cache is not None else NegativeCache()
+        self.vary_headers = tuple(
+            name.lower().encode("latin-1") for name in vary_headers
+        )
+        self.methods = frozenset(methods)
+
+    def cache_key(self, scope: Scope) -> CacheKey:
+        key: List[bytes] = [
+            scope["method"].encode("latin-1"),
+            scope["path"].encode("utf-8"),
+            scope.get("query_string", b""),
+        ]
+        if self.vary_headers:
+            headers = dict(scope["headers"])
+            key.extend(headers.get(name, b"") for name in self.vary_headers)
+        return tuple(key)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache_key(scope)
+        cached = self.cache.get(key)
+        if cached is not None:
+            await send_response(send, cached)
+            return
+        generation = self.cache.generation(scope["path"])
+
+        status_code = 0
+        raw_headers: RawHeaders = ()
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status_code, raw_headers
+
+            if message["type"] == "http.response.start":
+                if message["status"] in _CACHED_STATUSES:
+                    # Copied now: outer middleware may add to the list in place.
+                    raw_headers = tuple(
+                        (name, value) for name, value in message.get("headers", ())
+                    )
+                    if all(name != b"set-cookie" for name, _ in raw_headers):
+                        status_code = message["status"]
+            elif status_code and message["type"] == "http.response.body":
+                if not message.get("more_body", False):
+                    response = ErrorResponse(
+                        status_code, message.get("body", b""), raw_headers
+                    )
+                    self.cache.set(key, scope["path"], response, generation)
+                status_code = 0
+            await send(message)
+
+        await self.app(scope, receive, capturing_send)
@@ -0,0 +1,51 @@
+from typing import Mapping, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..ratelimit import RateLimiter
+from ..responses import send_response
+from ._prefixes import PrefixTable
+from .admission import ClientKey, client_host
+
+
+class RateLimitMiddleware:
+    """
+    Answers HTTP requests over the limit of `limiter` with 429 Too Many Requests, before
+    the app runs.
+
+    Requests are counted per client, as identified by `client_key` (the client's IP
+    address by default). `route_limiters` maps path prefixes to their own limiter (the
+    longest matching prefix applies; `/api` covers `/api/items` but not `/apiary`),
+    counted separately from the default one; a `None` limiter exempts the prefix.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[RateLimiter] = None,
+        route_limiters: Optional[Mapping[str, Optional[RateLimiter]]] = None,
+        client_key: ClientKey = client_host,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.client_key = client_key
+        self._route_limiters: PrefixTable[Optional[RateLimiter]] = PrefixTable(
+            route_limiters
+        )
+
+    def limiter_for(self, path: str) -> Tuple[str, Optional[RateLimiter]]:
+        match = self._route_limiters.match(path)
+        return match if match is not None else ("", self.limiter)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        prefix, limiter = self.limiter_for(scope["path"])
+        if limiter is not None:
+            state = await limiter.hit((prefix, self.client_key(scope)))
+            if not state.allowed:
+                await send_response(send, limiter.response(state))
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,129 @@
+from typing import Mapping, Optional
+
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..http_exceptions import (
+    RequestEntityTooLargeException,
+    RequestHeaderFieldsTooLargeException,
+    RequestUriTooLongException,
+)
+from ..responses import ErrorResponse, render_json_error, send_response
+from ._prefixes import PrefixTable
+
+
+def _render(exc: HTTPException) -> ErrorResponse:
+    return render_json_error(exc.status_code, exc.detail, exc.headers)
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Rejects oversized HTTP requests before they are buffered.
+
+    Checked from the `scope`, before the app runs:
+
+    * `max_url_length`: bytes of the path plus the query string, else 414
+      `RequestUriTooLongException`.
+    * `max_header_bytes`: bytes of all header names and values, else 431
+      `RequestHeaderFieldsTooLargeException`.
+    * `max_body_size`: a `Content-Length` above it is answered with 413
+      `RequestEntityTooLargeException` without reading the body.
+
+    The body is also counted as it is received, so chunked uploads or a lying
+    `Content-Length` raise `RequestEntityTooLargeException` from `receive()` as soon as
+    the limit is crossed, before the offending chunk reaches the app. `route_limits`
+    maps path prefixes to their own body size limit (the longest matching prefix
+    applies; `/api` covers `/api/items` but not `/apiary`). 413 responses, and the exception raised from `receive()`, carry
+    `Connection: close`, as the rest of the body is left unread on the connection.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_size: Optional[int] = None,
+        max_url_length: Optional[int] = None,
+        max_header_bytes: Optional[int] = None,
+        route_limits: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+        self.max_url_length = max_url_length
+        self.max_header_bytes = max_header_bytes
+        self._route_limits: PrefixTable[int] = PrefixTable(route_limits)
+        self._entity_too_large = _render(
+            RequestEntityTooLargeException(headers={"Connection": "close"})
+        )
+        self._uri_too_long = _render(RequestUriTooLongException())
+        self._headers_too_large = _render(RequestHeaderFieldsTooLargeException())
+
+    def body_limit(self, path: str) -> Optional[int]:
+        match = self._route_limits.match(path)
+        return match[1] if match is not None else self.max_body_size
+
+    def _check_scope(self, scope: Scope) -> Optional[ErrorResponse]:
+        if self.max_url_length is not None:
+            path = scope.get("raw_path") or scope["path"].encode("utf-8")
+            if len(path) + len(scope.get("query_string", b"")) > self.max_url_length:
+                return self._uri_too_long
+        if self.max_header_bytes is not None:
+            size = 0
+            for name, value in scope["headers"]:
+                size += len(name) + len(value)
+            if size > self.max_header_bytes:
+                return self._headers_too_large
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rejection = self._check_scope(scope)
+        if rejection is not None:
+            await send_response(send, rejection)
+            return
+
+        limit = self.body_limit(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > limit
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    await send_response(send, self._entity_too_large)
+                    return
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise RequestEntityTooLargeException(
+                        headers={"Connection": "close"}
+                    )
+            return message
+
+        async def sender(message: Message) -> None:
+            nonlocal response_started
+
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, sender)
+        except RequestEntityTooLargeException:
+            if response_started:
+                raise
+            await send_response(send, self._entity_too_large)
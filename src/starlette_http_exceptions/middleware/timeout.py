@@ -0,0 +1,131 @@
+import time
+from typing import Mapping, Optional
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..deadlines import reset_deadline, set_deadline
+from ..http_exceptions import GatewayTimeoutException, RequestTimeoutException
+from ..responses import render_json_error, send_response
+from ._prefixes import PrefixTable
+
+
+class TimeoutMiddleware:
+    """
+    Gives every HTTP request a deadline and cancels the app once it has passed.
+
+    `timeout` is the default budget in seconds, and `route_timeouts` maps path prefixes
+    to their own budget (the longest matching prefix applies; `/api` covers
+    `/api/items` but not `/apiary`; `None` disables the deadline for that prefix). The deadline is available to the app through
+    `starlette_http_exceptions.deadlines.remaining_time()`.
+
+    The app runs alongside a timer. When the deadline passes and no response has been
+    started yet, the request is answered right away with:
+
+    * 408 `RequestTimeoutException` (with `Connection: close`) if the app was still
+      waiting for the request body, i.e. the client is slow to upload it.
+    * 504 `GatewayTimeoutException` otherwise, i.e. the handler is slow.
+
+    Then the app is cancelled, and anything it still sends is dropped. If the response
+    had already started it is cut short instead, and the server closes the connection.
+
+    Cancellation is cooperative. Async code stops at its next `await`, but a sync
+    endpoint or dependency running in the thread pool cannot be interrupted: the
+    client gets its 504 on time, while the thread, and this middleware call, keep
+    running until the function returns.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        timeout: Optional[float] = None,
+        route_timeouts: Optional[Mapping[str, Optional[float]]] = None,
+    ) -> None:
+        self.app = app
+        self.timeout = timeout
+        self._route_timeouts: PrefixTable[Optional[float]] = PrefixTable(
+            route_timeouts
+        )
+        request_timeout = RequestTimeoutException(headers={"Connection": "close"})
+        self._request_timeout = render_json_error(
+            request_timeout.status_code, request_timeout.detail, request_timeout.headers
+        )
+        gateway_timeout = GatewayTimeoutException()
+        self._gateway_timeout = render_json_error(
+            gateway_timeout.status_code, gateway_timeout.detail, gateway_timeout.headers
+        )
+
+    def timeout_for(self, path: str) -> Optional[float]:
+        match = self._route_timeouts.match(path)
+        return match[1] if match is not None else self.timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self.timeout_for(scope["path"])
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        waiting_for_body = False
+        body_complete = False
+        response_started = False
+        timed_out = False
+
+        async def tracking_receive() -> Message:
+            nonlocal waiting_for_body, body_complete
+
+            if body_complete:
+                return await receive()
+            # Left set if the deadline passes while waiting.
+            waiting_for_body = True
+            message = await receive()
+            waiting_for_body = False
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                body_complete = True
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+
+            if timed_out:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def expire() -> None:
+            nonlocal timed_out
+
+            # Waiting on an event is cheaper than cancelling a sleep when the app
+            # finishes in time, which is the common case.
+            with anyio.move_on_after(timeout):
+                await finished.wait()
+                return
+            if not response_started:
+                timed_out = True
+                await send_response(
+                    send,
+                    self._request_timeout if waiting_for_body else self._gateway_timeout,
+                )
+            task_group.cancel_scope.cancel()
+
+        finished = anyio.Event()
+        error: Optional[Exception] = None
+        token = set_deadline(time.monotonic() + timeout)
+        try:
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(expire)
+                try:
+                    await self.app(scope, tracking_receive, tracking_send)
+                except Exception as exc:
+                    # Raised as is rather than wrapped in an exception group.
+                    error = exc
+                finally:
+                    finished.set()
+        finally:
+            reset_deadline(token)
+        if error is not None:
+            raise error
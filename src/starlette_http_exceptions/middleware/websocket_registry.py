@@ -0,0 +1,190 @@
+import random
+from typing import Callable, Optional, Set
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..ws_exceptions import WebSocketException, WSServiceRestart
+
+# RFC 6455 limits the close reason to 123 bytes of UTF-8.
+_MAX_REASON_BYTES = 123
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class _Connection:
+    __slots__ = ("send", "closed")
+
+    def __init__(self, send: Send) -> None:
+        self.send = send
+        self.closed = False
+
+
+def reconnect_reason(reason: Optional[str], delay: float) -> str:
+    """
+    A close reason telling the client how long to wait before reconnecting, e.g.
+    `"Deploying; retry-after-ms=4821"`, truncated to fit in a close frame.
+    """
+    suffix = f"retry-after-ms={int(delay * 1000)}"
+    if not reason:
+        return suffix
+    room = _MAX_REASON_BYTES - len(suffix) - 2
+    prefix = reason.encode("utf-8")[:room].decode("utf-8", "ignore")
+    return f"{prefix}; {suffix}"
+
+
+class WebSocketRegistry:
+    """
+    The accepted WebSocket connections of a worker, tracked by
+    `WebSocketRegistryMiddleware`, and a way to close all of them at once.
+    """
+
+    def __init__(self) -> None:
+        self.drain_code: Optional[int] = None
+        self._connections: Set[_Connection] = set()
+
+    @property
+    def draining(self) -> bool:
+        return self.drain_code is not None
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def register(self, connection: _Connection) -> bool:
+        """
+        Track an accepted `connection`. Return `False`, without tracking it, if the
+        registry is draining: the connection must then be refused with `drain_code`.
+        """
+        if self.drain_code is not None:
+            return False
+        self._connections.add(connection)
+        return True
+
+    def unregister(self, connection: _Connection) -> None:
+        """Stop tracking `connection`, once it is closed."""
+        self._connections.discard(connection)
+
+    async def drain(
+        self,
+        exc: Optional[WebSocketException] = None,
+        max_concurrency: int = 100,
+        min_delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: Optional[float] = None,
+        close_timeout: float = 5.0,
+        progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """
+        Close every tracked connection with the code of `exc` (`WSServiceRestart` by
+        default, or e.g. `WSTryAgainLater`) and refuse new ones. Return how many were
+        closed.
+
+        Up to `max_concurrency` connections are closed at a time, each close frame
+        waiting at most `close_timeout` seconds, and the whole drain gives up after
+        `timeout` seconds. The reason of every close frame is built with
+        `reconnect_reason()` from a delay drawn uniformly in `[min_delay, max_delay]`,
+        so clients that honour it do not all reconnect at once. `progress` is called
+        with `(closed, total)` after each close.
+        """
+        if max_concurrency < 1 or min_delay < 0 or max_delay < min_delay:
+            raise ValueError(
+                "expected max_concurrency >= 1 and 0 <= min_delay <= max_delay"
+            )
+        if exc is None:
+            exc = WSServiceRestart()
+        # From now on `register()` refuses connections still in their handshake, so
+        # the set can only shrink.
+        self.drain_code = exc.code
+        connections = self._connections
+        total = len(connections)
+        closed = 0
+
+        async def close_connections() -> None:
+            nonlocal closed
+
+            while connections:
+                connection = connections.pop()
+                reason = reconnect_reason(
+                    exc.reason, random.uniform(min_delay, max_delay)
+                )
+                await self._close(connection, exc.code, reason, close_timeout)
+                closed += 1
+                if progress is not None:
+                    progress(closed, total)
+
+        with anyio.move_on_after(timeout):
+            async with anyio.create_task_group() as task_group:
+                for _ in range(min(max_concurrency, total)):
+                    task_group.start_soon(close_connections)
+        return closed
+
+    async def _close(
+        self, connection: _Connection, code: int, reason: str, close_timeout: float
+    ) -> None:
+        if connection.closed:
+            return
+        # Marked first, so the app's own messages are dropped from now on.
+        connection.closed = True
+        self.unregister(connection)
+        with anyio.move_on_after(close_timeout):
+            try:
+                await connection.send(
+                    {"type": "websocket.close", "code": code, "reason": reason}
+                )
+            except Exception:
+                # The client is already gone, which is what we wanted.
+                pass
+
+
+class WebSocketRegistryMiddleware:
+    """
+    Tracks accepted WebSocket connections in `registry`, so `registry.drain()` can close
+    them at shutdown.
+
+    Once a connection has been closed by a drain, the app's messages to it are dropped,
+    and the app sees the usual `websocket.disconnect` when the client acknowledges the
+    close. Connections attempted while the registry is draining are refused, including
+    those whose handshake was still in progress when the drain started.
+    """
+
+    def __init__(self, app: ASGIApp, registry: WebSocketRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        if registry.drain_code is not None:
+            message = await receive()
+            if message["type"] == "websocket.connect":
+                await send({"type": "websocket.close", "code": registry.drain_code})
+            return
+
+        connection = _Connection(send)
+
+        async def tracking_send(message: Message) -> None:
+            if connection.closed:
+                return
+            if message["type"] == "websocket.accept":
+                if not registry.register(connection):
+                    connection.closed = True
+                    message = {"type": "websocket.close", "code": registry.drain_code}
+            elif message["type"] == "websocket.close":
+                connection.closed = True
+                registry.unregister(connection)
+            await send(message)
+
+        async def tracking_receive() -> Message:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                connection.closed = True
+                registry.unregister(connection)
+            return message
+
+        try:
+            await self.app(scope, tracking_receive, tracking_send)
+        finally:
+            registry.unregister(connection)
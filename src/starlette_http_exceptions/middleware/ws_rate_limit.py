@@ -0,0 +1,154 @@
+import time
+from array import array
+from typing import Callable
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..ws_exceptions import WSPolicyViolation
+
+ACTION_CLOSE = "close"
+ACTION_DROP = "drop"
+ACTION_DELAY = "delay"
+
+_ACTIONS = (ACTION_CLOSE, ACTION_DROP, ACTION_DELAY)
+
+
+class TokenBuckets:
+    """
+    Token buckets stored in two flat `array("d")` columns, one slot per connection.
+
+    Each bucket costs 16 bytes, plus 8 for its entry in the free list once released;
+    taking a token allocates nothing.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = array("d")
+        self._updated = array("d")
+        self._free = array("q")
+
+    def allocate(self) -> int:
+        """A slot for a new bucket, full."""
+        if self._free:
+            slot = self._free.pop()
+            self._tokens[slot] = self.burst
+            self._updated[slot] = self._clock()
+            return slot
+        self._tokens.append(self.burst)
+        self._updated.append(self._clock())
+        return len(self._tokens) - 1
+
+    def release(self, slot: int) -> None:
+        self._free.append(slot)
+
+    def take(self, slot: int, borrow: bool = False) -> float:
+        """
+        Take a token from the bucket in `slot`. Return 0 if there was one, otherwise the
+        number of seconds until there will be.
+
+        With `borrow`, the token is taken even if the bucket is empty, and the returned
+        delay is how long to wait before using it.
+        """
+        now = self._clock()
+        tokens = self._tokens[slot] + (now - self._updated[slot]) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self._updated[slot] = now
+        if tokens >= 1:
+            self._tokens[slot] = tokens - 1
+            return 0.0
+        self._tokens[slot] = tokens - 1 if borrow else tokens
+        return (1 - tokens) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._tokens) - len(self._free)
+
+
+class _LimitedConnection:
+    # A slotted object with two bound methods is several times smaller than a pair of
+    # closures over the same state, which adds up over 100k connections.
+    __slots__ = ("limiter", "_receive", "_send", "slot", "closed")
+
+    def __init__(
+        self, limiter: "WebSocketRateLimitMiddleware", receive: Receive, send: Send
+    ) -> None:
+        self.limiter = limiter
+        self._receive = receive
+        self._send = send
+        self.slot = limiter.buckets.allocate()
+        self.closed = False
+
+    async def receive(self) -> Message:
+        limiter = self.limiter
+        while True:
+            message = await self._receive()
+            if self.closed or message["type"] != "websocket.receive":
+                return message
+            delay = limiter.action == ACTION_DELAY
+            wait = limiter.buckets.take(self.slot, borrow=delay)
+            if not wait:
+                return message
+            if delay:
+                await anyio.sleep(wait)
+                return message
+            if limiter.action == ACTION_CLOSE:
+                exc = WSPolicyViolation()
+                self.closed = True
+                await self._send(
+                    {"type": "websocket.close", "code": exc.code, "reason": exc.reason}
+                )
+                return {"type": "websocket.disconnect", "code": exc.code}
+
+    async def send(self, message: Message) -> None:
+        if not self.closed:
+            await self._send(message)
+
+
+class WebSocketRateLimitMiddleware:
+    """
+    Limits every WebSocket connection to `rate` messages per second, with bursts of up
+    to `burst` messages.
+
+    What happens to a message over the limit depends on `action`:
+
+    * `close` (the default): the connection is closed with `WSPolicyViolation` (1008)
+      and the app receives a `websocket.disconnect` instead of the message.
+    * `drop`: the message is discarded and the app waits for the next one.
+    * `delay`: the message is handed over once the bucket has refilled, which also
+      stops reading from the client in the meantime.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate: float,
+        burst: float = 1,
+        action: str = ACTION_CLOSE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if action not in _ACTIONS:
+            raise ValueError(f"action must be one of {_ACTIONS!r}, got {action!r}")
+        self.app = app
+        self.action = action
+        self.buckets = TokenBuckets(rate, burst, clock)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        connection = _LimitedConnection(self, receive, send)
+        try:
+            await self.app(scope, connection.receive, connection.send)
+        finally:
+            self.buckets.release(connection.slot)
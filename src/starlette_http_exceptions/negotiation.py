@@ -0,0 +1,288 @@
+"""
+Content negotiated rendering of `HTTPException`.
+
+The renderer chosen for each distinct `Accept` header is remembered in a bounded LRU,
+so the header is only parsed the first time it is seen, and so is every response
+rendered for a cacheable exception (see `exception_key()`), per media type.
+Renderers encode their static parts (content types, problem details prefixes,
+template fragments) ahead of time.
+"""
+
+import html
+import math
+import re
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from ._lru import LRUCache
+from ._phrases import PHRASES
+from .handlers import exception_key
+from .http_exceptions import NotAcceptableException
+from .problem import ProblemDetailsRenderer
+from .responses import ErrorResponse, body_allowed, encode_headers, render_json_error
+from .tracebacks import release_traceback
+
+
+class Renderer:
+    """Base class for the renderers used by `NegotiatingExceptionHandler`."""
+
+    media_type: str = ""
+
+    def render(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        raise NotImplementedError()  # pragma: no cover
+
+    def cache_key(self, request: Request, exc: HTTPException) -> Optional[Hashable]:
+        """
+        What the rendered response depends on, or `None` if it must not be cached:
+        the exception's status code, detail and headers by default.
+        """
+        return exception_key(exc)
+
+
+class JSONRenderer(Renderer):
+    """`{"detail": ...}` JSON, like `CachedHTTPExceptionHandler`."""
+
+    media_type = "application/json"
+
+    def render(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        return render_json_error(exc.status_code, exc.detail, exc.headers)
+
+
+class ProblemJSONRenderer(Renderer):
+    """RFC 9457 problem details, see `starlette_http_exceptions.problem`."""
+
+    media_type = "application/problem+json"
+
+    def __init__(self, type_uri: str = "about:blank") -> None:
+        self.renderer = ProblemDetailsRenderer(type_uri)
+
+    def render(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        return self.renderer.render(exc, request.scope["path"])
+
+    def cache_key(self, request: Request, exc: HTTPException) -> Optional[Hashable]:
+        # The path is the `instance` member of the document.
+        key = exception_key(exc)
+        return None if key is None else (key, request.scope["path"])
+
+
+class PlainTextRenderer(Renderer):
+    """The detail as plain text, like Starlette's default handler."""
+
+    media_type = "text/plain"
+    content_type = b"text/plain; charset=utf-8"
+
+    def render(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        if not body_allowed(exc.status_code):
+            return ErrorResponse(
+                exc.status_code, b"", encode_headers(exc.headers, None, None)
+            )
+        body = str(exc.detail).encode("utf-8")
+        return ErrorResponse(
+            exc.status_code, body, encode_headers(exc.headers, body, self.content_type)
+        )
+
+
+DEFAULT_HTML_TEMPLATE = (
+    "<!DOCTYPE html>\n"
+    "<html><head><title>{status} {title}</title></head>\n"
+    "<body><h1>{status} {title}</h1><p>{detail}</p></body></html>\n"
+)
+
+
+class HTMLRenderer(Renderer):
+    """
+    An HTML page from a template with `{status}`, `{title}` and `{detail}` fields.
+
+    The template is split once into encoded static fragments and field names, so
+    rendering only escapes and encodes the field values.
+    """
+
+    media_type = "text/html"
+    content_type = b"text/html; charset=utf-8"
+
+    _FIELD = re.compile(r"\{(status|title|detail)\}")
+
+    def __init__(self, template: str = DEFAULT_HTML_TEMPLATE) -> None:
+        parts = self._FIELD.split(template)
+        self._fragments = [part.encode("utf-8") for part in parts[0::2]]
+        self._fields = parts[1::2]
+
+    def render(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        if not body_allowed(exc.status_code):
+            return ErrorResponse(
+                exc.status_code, b"", encode_headers(exc.headers, None, None)
+            )
+        values = {
+            "status": str(exc.status_code),
+            "title": html.escape(PHRASES.get(exc.status_code, "")),
+            "detail": html.escape(str(exc.detail)),
+        }
+        chunks = [self._fragments[0]]
+        for field, fragment in zip(self._fields, self._fragments[1:]):
+            chunks.append(values[field].encode("utf-8"))
+            chunks.append(fragment)
+        body = b"".join(chunks)
+        return ErrorResponse(
+            exc.status_code, body, encode_headers(exc.headers, body, self.content_type)
+        )
+
+
+def parse_accept(header: str) -> List[Tuple[str, float]]:
+    """
+    Split an `Accept` header into `(media range, quality)` pairs, in header order.
+    Qualities are clamped to `[0, 1]`, and invalid ones count as 0.
+    """
+    ranges: List[Tuple[str, float]] = []
+    for item in header.split(","):
+        media_range, _, params = item.partition(";")
+        media_range = media_range.strip().lower()
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+                if math.isnan(quality):
+                    quality = 0.0
+                quality = min(max(quality, 0.0), 1.0)
+        ranges.append((media_range, quality))
+    return ranges
+
+
+def _specificity(media_range: str, media_type: str) -> int:
+    """How specifically `media_range` matches `media_type`, or -1 if it does not."""
+    if media_range == media_type:
+        return 2
+    if media_range == "*/*":
+        return 0
+    if media_range.endswith("/*") and media_type.startswith(media_range[:-1]):
+        return 1
+    return -1
+
+
+def media_type_quality(
+    ranges: Sequence[Tuple[str, float]], media_type: str
+) -> Tuple[float, int]:
+    """
+    The quality the client gives `media_type`, from the most specific of `ranges`
+    that matches it, and the position of that range in the header. `(0, -1)` if none
+    matches.
+    """
+    best = -1
+    quality = 0.0
+    position = -1
+    for index, (media_range, range_quality) in enumerate(ranges):
+        specificity = _specificity(media_range, media_type)
+        if specificity > best:
+            best = specificity
+            quality = range_quality
+            position = index
+    return quality, position
+
+
+class NegotiatingExceptionHandler:
+    """
+    An exception handler that renders `HTTPException` as JSON, problem details, plain
+    text or HTML depending on the `Accept` header.
+
+    ```python
+    app = Starlette(
+        routes=routes,
+        exception_handlers={HTTPException: NegotiatingExceptionHandler()},
+    )
+    ```
+
+    Each renderer's media type gets the quality of the most specific media range that
+    matches it, so `application/json, */*;q=0` only accepts JSON. The renderer with
+    the highest quality wins, ties going to the range listed first in the header and
+    then to the first renderer. The first renderer is used when the request has no
+    `Accept` header. When no renderer is acceptable, a `NotAcceptableException` is
+    rendered with the first renderer instead of the original exception.
+
+    Responses carry `Vary: Accept`, merged into any `Vary` header of the exception,
+    and are kept in an LRU of `maxsize` entries per renderer and exception.
+    """
+
+    def __init__(
+        self,
+        renderers: Optional[Sequence[Renderer]] = None,
+        maxsize: int = 4096,
+    ) -> None:
+        if renderers is None:
+            renderers = [
+                JSONRenderer(),
+                ProblemJSONRenderer(),
+                PlainTextRenderer(),
+                HTMLRenderer(),
+            ]
+        if not renderers:
+            raise ValueError("at least one renderer is required")
+        self.renderers = list(renderers)
+        self._choices: LRUCache[Optional[Renderer]] = LRUCache(maxsize)
+        self._responses: LRUCache[ErrorResponse] = LRUCache(maxsize)
+
+    def choose(self, accept: Optional[str]) -> Optional[Renderer]:
+        """The renderer for an `Accept` header value, or `None` if none is acceptable."""
+        if not accept:
+            return self.renderers[0]
+        if accept in self._choices:
+            return self._choices.get(accept)
+        renderer = self._negotiate(accept)
+        self._choices.set(accept, renderer)
+        return renderer
+
+    def _negotiate(self, accept: str) -> Optional[Renderer]:
+        ranges = parse_accept(accept)
+        best: Optional[Renderer] = None
+        best_rank = (0.0, 0)
+        for renderer in self.renderers:
+            quality, position = media_type_quality(ranges, renderer.media_type)
+            # Strictly better only, so ties go to the earlier renderer.
+            if quality > 0 and (best is None or (quality, -position) > best_rank):
+                best = renderer
+                best_rank = (quality, -position)
+        return best
+
+    def render(
+        self, renderer: Renderer, request: Request, exc: HTTPException
+    ) -> ErrorResponse:
+        """The response of `renderer` for `exc`, with `Vary: Accept`, cached when possible."""
+        key = renderer.cache_key(request, exc)
+        if key is None:
+            return vary_accept(renderer.render(request, exc))
+        cache_key = (renderer.media_type, key)
+        response = self._responses.get(cache_key)
+        if response is None:
+            response = vary_accept(renderer.render(request, exc))
+            self._responses.set(cache_key, response)
+        return response
+
+    async def __call__(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        renderer = self.choose(request.headers.get("accept"))
+        release_traceback(exc)
+        if renderer is None:
+            renderer = self.renderers[0]
+            exc = NotAcceptableException()
+        return self.render(renderer, request, exc)
+
+
+def vary_accept(response: ErrorResponse) -> ErrorResponse:
+    """`response` with `Accept` added to its `Vary` header, or the same response if it is there."""
+    raw_headers = response.raw_headers
+    for index, (name, value) in enumerate(raw_headers):
+        if name.lower() != b"vary":
+            continue
+        fields = [field.strip().lower() for field in value.split(b",")]
+        if b"accept" in fields or b"*" in fields:
+            return response
+        raw_headers[index] = (name, value + b", Accept")
+        break
+    else:
+        raw_headers.append((b"vary", b"Accept"))
+    return ErrorResponse(response.status_code, response.body, tuple(raw_headers))
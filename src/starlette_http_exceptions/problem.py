@@ -0,0 +1,101 @@
+"""
+RFC 9457 problem details (`application/problem+json`) for `HTTPException`.
+
+The `type`, `title` and `status` members only depend on the status code, so that part
+of the document is encoded once per code. Only `detail` and `instance` are encoded
+per request, with the fastest JSON backend available (see `_json.py`).
+"""
+
+from typing import Any, Dict, Optional
+
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from . import _json
+from ._phrases import PHRASES
+from .responses import ErrorResponse, body_allowed, encode_headers
+from .tracebacks import release_traceback
+
+PROBLEM_CONTENT_TYPE = b"application/problem+json"
+
+
+class ProblemDetailsRenderer:
+    """Renders `HTTPException` as a problem details document."""
+
+    def __init__(
+        self, type_uri: str = "about:blank", include_instance: bool = True
+    ) -> None:
+        self.type_uri = type_uri
+        self.include_instance = include_instance
+        self._prefixes: Dict[int, bytes] = {}
+
+    def title(self, status_code: int) -> str:
+        return PHRASES.get(status_code, "")
+
+    def prefix(self, status_code: int) -> bytes:
+        """The encoded `{"type":...,"title":...,"status":...` part of the document."""
+        try:
+            return self._prefixes[status_code]
+        except KeyError:
+            pass
+        encoded = _json.dumps(
+            {
+                "type": self.type_uri,
+                "title": self.title(status_code),
+                "status": status_code,
+            }
+        )
+        prefix = self._prefixes[status_code] = encoded[:-1]
+        return prefix
+
+    def body(self, status_code: int, detail: Any, instance: Optional[str]) -> bytes:
+        parts = [self.prefix(status_code)]
+        if detail is not None and detail != self.title(status_code):
+            parts.append(b',"detail":')
+            parts.append(_json.dumps(detail))
+        if instance is not None:
+            parts.append(b',"instance":')
+            parts.append(_json.dumps(instance))
+        parts.append(b"}")
+        return b"".join(parts)
+
+    def render(
+        self, exc: HTTPException, instance: Optional[str] = None
+    ) -> ErrorResponse:
+        if not body_allowed(exc.status_code):
+            return ErrorResponse(
+                exc.status_code, b"", encode_headers(exc.headers, None, None)
+            )
+        body = self.body(exc.status_code, exc.detail, instance)
+        return ErrorResponse(
+            exc.status_code,
+            body,
+            encode_headers(exc.headers, body, PROBLEM_CONTENT_TYPE),
+        )
+
+
+class ProblemDetailsHandler:
+    """
+    An exception handler that renders `HTTPException` as RFC 9457 problem details.
+
+    ```python
+    app = Starlette(
+        routes=routes,
+        exception_handlers={HTTPException: ProblemDetailsHandler()},
+    )
+    ```
+
+    `title` is the reason phrase of the status code, `detail` is only included when it
+    differs from it and `instance` is the request path.
+    """
+
+    def __init__(
+        self, type_uri: str = "about:blank", include_instance: bool = True
+    ) -> None:
+        self.renderer = ProblemDetailsRenderer(type_uri, include_instance)
+
+    async def __call__(self, request: Request, exc: HTTPException) -> ErrorResponse:
+        instance = request.scope["path"] if self.renderer.include_instance else None
+        response = self.renderer.render(exc, instance)
+        release_traceback(exc)
+        return response
@@ -0,0 +1,192 @@
+"""
+Rate limiting with the generic cell rate algorithm (GCRA).
+
+GCRA keeps a single timestamp per key, the theoretical arrival time (TAT) of the
+next request, and allows `limit` requests per `period` seconds with bursts of up to
+`limit` requests. Backends store the TATs and apply each hit atomically:
+`MemoryBackend` keeps them in the process, and a shared store (Redis, Memcached...)
+can be plugged in by subclassing `RateLimitBackend`.
+
+`RateLimiter.check()` raises `TooManyRequestsException` with `Retry-After` and
+`RateLimit-*` headers, which are rendered once per distinct set of values:
+
+```python
+api_limiter = RateLimiter(Rate(100, period=60))
+
+
+async def search(request):
+    await api_limiter.check(request.client.host)
+    ...
+```
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from ._lru import LRUCache
+from .http_exceptions import TooManyRequestsException
+from .responses import ErrorResponse, render_json_error
+
+
+class Rate:
+    """`limit` requests per `period` seconds."""
+
+    __slots__ = ("limit", "period", "interval")
+
+    def __init__(self, limit: int, period: float = 1.0) -> None:
+        if limit < 1 or period <= 0:
+            raise ValueError("limit must be at least 1 and period positive")
+        self.limit = limit
+        self.period = period
+        self.interval = period / limit
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.limit!r}, period={self.period!r})"
+
+
+class RateLimitState(NamedTuple):
+    allowed: bool
+    # Requests left in the current burst.
+    remaining: int
+    # Seconds until the next request will be allowed, 0 when this one was.
+    retry_after: float
+    # Seconds until the burst is fully available again.
+    reset_after: float
+
+
+# Skips the argument handling of the generated `RateLimitState.__new__`.
+_state = tuple.__new__
+
+
+class RateLimitBackend:
+    """Base class for the stores of `RateLimiter`."""
+
+    async def hit(self, key: Hashable, rate: Rate) -> RateLimitState:
+        """Count one request for `key` against `rate`, atomically."""
+        raise NotImplementedError()  # pragma: no cover
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Keeps the TATs of at most `maxsize` keys in the process.
+
+    Keys are ordered by their last allowed request, and every new key expires up to two
+    keys from the old end whose burst is fully available again, so idle keys go away
+    without a sweeper task. Beyond `maxsize` the least recently limited keys are
+    dropped, which resets their limit.
+    """
+
+    def __init__(
+        self, maxsize: int = 1_000_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._clock = clock
+        self._tats: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    async def hit(self, key: Hashable, rate: Rate) -> RateLimitState:
+        return self.hit_nowait(key, rate)
+
+    def hit_nowait(self, key: Hashable, rate: Rate) -> RateLimitState:
+        now = self._clock()
+        tats = self._tats
+        tat = tats.get(key)
+        if tat is None:
+            tat = now
+            self._expire(now)
+        elif tat < now:
+            tat = now
+        new_tat = tat + rate.interval
+        wait = new_tat - now
+        if wait > rate.period:
+            return _state(RateLimitState, (False, 0, wait - rate.period, tat - now))
+        tats[key] = new_tat
+        tats.move_to_end(key)
+        # The epsilon absorbs the rounding of `period / limit`.
+        remaining = int((rate.period - wait) / rate.interval + 1e-9)
+        return _state(RateLimitState, (True, remaining, 0.0, wait))
+
+    def _expire(self, now: float) -> None:
+        # Only new keys grow the store, so only they pay for expiring old ones.
+        tats = self._tats
+        for _ in range(2):
+            if not tats:
+                return
+            oldest, oldest_tat = next(iter(tats.items()))
+            if oldest_tat > now and len(tats) < self.maxsize:
+                return
+            del tats[oldest]
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class RateLimiter:
+    """
+    Applies `rate` per key, with state kept in `backend` (a `MemoryBackend` by default).
+
+    The headers of rejected requests depend only on a few whole numbers of seconds,
+    so they are built, and their responses rendered, once per distinct value and
+    kept in an LRU of `maxsize` entries.
+    """
+
+    def __init__(
+        self,
+        rate: Rate,
+        backend: Optional[RateLimitBackend] = None,
+        maxsize: int = 1024,
+    ) -> None:
+        self.rate = rate
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._headers: LRUCache[Dict[str, str]] = LRUCache(maxsize)
+        self._responses: LRUCache[ErrorResponse] = LRUCache(maxsize)
+
+    async def hit(self, key: Hashable) -> RateLimitState:
+        return await self.backend.hit(key, self.rate)
+
+    async def check(self, key: Hashable) -> RateLimitState:
+        """Count one request for `key`, raising `TooManyRequestsException` over the limit."""
+        state = await self.backend.hit(key, self.rate)
+        if not state.allowed:
+            raise TooManyRequestsException(headers=self.headers(state))
+        return state
+
+    def _headers_key(self, state: RateLimitState) -> Tuple[int, int]:
+        return (
+            max(math.ceil(state.retry_after), 1),
+            max(math.ceil(state.reset_after), 1),
+        )
+
+    def headers(self, state: RateLimitState) -> Dict[str, str]:
+        """
+        `Retry-After` and `RateLimit-*` headers for a rejected request: a copy of the
+        cached ones, so handlers further down may add to them.
+        """
+        return dict(self._cached_headers(state))
+
+    def _cached_headers(self, state: RateLimitState) -> Dict[str, str]:
+        key = self._headers_key(state)
+        headers = self._headers.get(key)
+        if headers is None:
+            retry_after, reset = key
+            headers = {
+                "Retry-After": str(retry_after),
+                "RateLimit-Limit": str(self.rate.limit),
+                "RateLimit-Remaining": "0",
+                "RateLimit-Reset": str(reset),
+            }
+            self._headers.set(key, headers)
+        return headers
+
+    def response(self, state: RateLimitState) -> ErrorResponse:
+        """The 429 response for a rejected request, rendered once per header values."""
+        key = self._headers_key(state)
+        response = self._responses.get(key)
+        if response is None:
+            exc = TooManyRequestsException(headers=self._cached_headers(state))
+            response = render_json_error(exc.status_code, exc.detail, exc.headers)
+            self._responses.set(key, response)
+        return response
@@ -0,0 +1,189 @@
+"""
+Status code to exception class lookup.
+
+The index is a flat list with one slot per status code from 400 to 599, filled once
+at import from the `HTTP_4xx`/`HTTP_5xx` constants in `status.py`. Codes that have a
+constant but no class in `http_exceptions.py` (402, 425, 500, ...) get a
+class generated the first time they are looked up. Generation happens under a lock,
+so every thread gets the same class for a code and `except` clauses keep matching.
+"""
+
+import threading
+from typing import Any, Dict, List, NoReturn, Optional, Type
+
+from starlette.exceptions import HTTPException
+
+from . import http_exceptions, status
+from ._phrases import PHRASES, phrase_from_constant
+from .http_exceptions import _BaseHTTPException
+
+_FIRST_CODE = 400
+_LAST_CODE = 599
+
+_KNOWN_EXCEPTIONS = (
+    (status.HTTP_400_BAD_REQUEST, http_exceptions.BadRequestException),
+    (status.HTTP_401_UNAUTHORIZED, http_exceptions.UnauthorizedException),
+    (status.HTTP_403_FORBIDDEN, http_exceptions.ForbiddenException),
+    (status.HTTP_404_NOT_FOUND, http_exceptions.NotFoundException),
+    (status.HTTP_405_METHOD_NOT_ALLOWED, http_exceptions.MethodNotAllowedException),
+    (status.HTTP_406_NOT_ACCEPTABLE, http_exceptions.NotAcceptableException),
+    (
+        status.HTTP_407_PROXY_AUTHENTICATION_REQUIRED,
+        http_exceptions.ProxyAuthenticationRequiredException,
+    ),
+    (status.HTTP_408_REQUEST_TIMEOUT, http_exceptions.RequestTimeoutException),
+    (status.HTTP_409_CONFLICT, http_exceptions.ConflictException),
+    (status.HTTP_410_GONE, http_exceptions.GoneException),
+    (status.HTTP_411_LENGTH_REQUIRED, http_exceptions.LengthRequiredException),
+    (status.HTTP_412_PRECONDITION_FAILED, http_exceptions.PreconditionFailedException),
+    (
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        http_exceptions.RequestEntityTooLargeException,
+    ),
+    (status.HTTP_414_REQUEST_URI_TOO_LONG, http_exceptions.RequestUriTooLongException),
+    (
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        http_exceptions.UnsupportedMediaTypeException,
+    ),
+    (
+        status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        http_exceptions.RequestedRangeNotSatisfiableException,
+    ),
+    (status.HTTP_417_EXPECTATION_FAILED, http_exceptions.ExpectationFailedException),
+    (status.HTTP_418_IM_A_TEAPOT, http_exceptions.ImATeapotException),
+    (status.HTTP_421_MISDIRECTED_REQUEST, http_exceptions.MisdirectedRequestException),
+    (
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        http_exceptions.UnprocessableEntityException,
+    ),
+    (status.HTTP_423_LOCKED, http_exceptions.LockedException),
+    (status.HTTP_424_FAILED_DEPENDENCY, http_exceptions.FailedDependencyException),
+    (status.HTTP_426_UPGRADE_REQUIRED, http_exceptions.UpgradeRequiredException),
+    (
+        status.HTTP_428_PRECONDITION_REQUIRED,
+        http_exceptions.PreconditionRequiredException,
+    ),
+    (status.HTTP_429_TOO_MANY_REQUESTS, http_exceptions.TooManyRequestsException),
+    (
+        status.HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE,
+        http_exceptions.RequestHeaderFieldsTooLargeException,
+    ),
+    (
+        status.HTTP_451_UNAVAILABLE_FOR_LEGAL_REASONS,
+        http_exceptions.UnavailableForLegalReasonsException,
+    ),
+    (status.HTTP_502_BAD_GATEWAY, http_exceptions.BadGatewayException),
+    (status.HTTP_503_SERVICE_UNAVAILABLE, http_exceptions.ServiceUnavailableException),
+    (status.HTTP_504_GATEWAY_TIMEOUT, http_exceptions.GatewayTimeoutException),
+)
+
+_EXCEPTIONS: List[Optional[Type[HTTPException]]] = [None] * (
+    _LAST_CODE - _FIRST_CODE + 1
+)
+_CONSTANT_NAMES: List[Optional[str]] = [None] * (_LAST_CODE - _FIRST_CODE + 1)
+
+for _name, _code in vars(status).items():
+    if _name.startswith("HTTP_") and _FIRST_CODE <= _code <= _LAST_CODE:
+        _CONSTANT_NAMES[_code - _FIRST_CODE] = _name
+
+for _code, _exception in _KNOWN_EXCEPTIONS:
+    _EXCEPTIONS[_code - _FIRST_CODE] = _exception
+
+_STATUS_CODES: Dict[type, int] = {
+    exception: code for code, exception in _KNOWN_EXCEPTIONS
+}
+
+_GENERATE_LOCK = threading.Lock()
+
+
+def _class_name(constant_name: str) -> str:
+    return phrase_from_constant(constant_name).replace(" ", "") + "Exception"
+
+
+def _generate_exception(code: int, constant_name: str) -> Type[HTTPException]:
+    class_name = _class_name(constant_name)
+    phrase = PHRASES[code]
+
+    def __init__(
+        self: _BaseHTTPException,
+        detail: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        _BaseHTTPException.__init__(
+            self, status_code=code, detail=detail, headers=headers
+        )
+
+    return type(
+        class_name,
+        (_BaseHTTPException,),
+        {
+            "__slots__": (),
+            "__init__": __init__,
+            "__doc__": f"{phrase} ({code}): Generated from `status.{constant_name}`.",
+            "__module__": __name__,
+        },
+    )
+
+
+def exception_for_status(code: int) -> Type[HTTPException]:
+    """
+    Return the exception class for the HTTP error status `code`.
+
+    Raises `ValueError` for codes that are not an error status defined in `status.py`,
+    including values that are not integers.
+    """
+    if isinstance(code, int) and not isinstance(code, bool):
+        index = code - _FIRST_CODE
+        if 0 <= index <= _LAST_CODE - _FIRST_CODE:
+            exception = _EXCEPTIONS[index]
+            if exception is not None:
+                return exception
+            constant_name = _CONSTANT_NAMES[index]
+            if constant_name is not None:
+                return _publish(index, constant_name)
+    raise ValueError(f"{code!r} is not an HTTP error status code defined in status.py")
+
+
+def _publish(index: int, constant_name: str) -> Type[HTTPException]:
+    with _GENERATE_LOCK:
+        # Another thread may have generated the class while this one waited.
+        exception = _EXCEPTIONS[index]
+        if exception is None:
+            code = index + _FIRST_CODE
+            exception = _generate_exception(code, constant_name)
+            _STATUS_CODES[exception] = code
+            _EXCEPTIONS[index] = exception
+        return exception
+
+
+def status_for_exception(exception: Type[HTTPException]) -> int:
+    """
+    Return the status code of the exception class `exception`, or of the nearest of
+    its bases in the index, without instantiating it.
+
+    Raises `ValueError` for classes that do not derive from an indexed exception.
+    """
+    for cls in exception.__mro__:
+        code = _STATUS_CODES.get(cls)
+        if code is not None:
+            return code
+    raise ValueError(f"{exception!r} has no status code in the exception index")
+
+
+def raise_for_status(
+    code: int, detail: Any = None, headers: Optional[Dict[str, str]] = None
+) -> NoReturn:
+    """Raise the exception class for the HTTP error status `code`."""
+    raise exception_for_status(code)(detail=detail, headers=headers)
+
+
+def __getattr__(name: str) -> Any:
+    # Generated classes are resolved by name too, so their instances can be pickled.
+    # Dunder lookups, such as the `__path__` probe of `from .registry import ...`,
+    # never name a class.
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    for index, constant_name in enumerate(_CONSTANT_NAMES):
+        if constant_name is not None and _class_name(constant_name) == name:
+            return exception_for_status(index + _FIRST_CODE)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
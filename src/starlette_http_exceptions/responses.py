@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import Send
+
+from ._json import stdlib_dumps
+from ._phrases import JSON_DETAILS, PHRASES
+
+RawHeaders = Tuple[Tuple[bytes, bytes], ...]
+
+JSON_CONTENT_TYPE = b"application/json"
+
+
+class ErrorResponse(Response):
+    """
+    A response whose body and raw headers were encoded ahead of time.
+
+    Responses cached by the handlers are shared: they hold no per-request state and are
+    sent to many clients concurrently. Every access to their `raw_headers` returns a
+    fresh list, because middleware such as `CORSMiddleware` mutates the header list of
+    the `http.response.start` message in place, and their `headers` are read-only:
+    changing them, or setting a cookie, raises `TypeError`.
+
+    `copy()` returns an unshared response, which shares the encoded body and headers
+    until its headers are changed, and can then be changed like any `Response`.
+    """
+
+    def __init__(self, status_code: int, body: bytes, raw_headers: RawHeaders) -> None:
+        self.status_code = status_code
+        self.body = body
+        self.background = None
+        self._raw_headers = raw_headers
+        self._shared = True
+        self._own_headers: Optional[List[Tuple[bytes, bytes]]] = None
+
+    def copy(self) -> "ErrorResponse":
+        """An unshared copy of this response, to change and return from one endpoint."""
+        response = ErrorResponse(self.status_code, self.body, self._raw_headers)
+        response._shared = False
+        return response
+
+    @property
+    def raw_headers(self) -> List[Tuple[bytes, bytes]]:  # type: ignore[override]
+        if self._shared:
+            return list(self._raw_headers)
+        if self._own_headers is None:
+            self._own_headers = list(self._raw_headers)
+        return self._own_headers
+
+    @property
+    def headers(self) -> Headers:  # type: ignore[override]
+        if self._shared:
+            return Headers(raw=list(self._raw_headers))
+        return MutableHeaders(raw=self.raw_headers)
+
+    def set_cookie(self, *args: Any, **kwargs: Any) -> None:
+        if self._shared:
+            raise TypeError(
+                f"shared {self.__class__.__name__} instances are read-only, "
+                "change a copy() instead"
+            )
+        super().set_cookie(*args, **kwargs)
+
+    def with_raw_headers(self, raw_headers: RawHeaders) -> "ErrorResponse":
+        """A shared copy of this response with `raw_headers` appended."""
+        current = self._raw_headers
+        if self._own_headers is not None:
+            current = tuple(self._own_headers)
+        return ErrorResponse(self.status_code, self.body, current + raw_headers)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(status_code={self.status_code!r}, body={self.body!r})"
+
+
+def body_allowed(status_code: int) -> bool:
+    """Whether a response with `status_code` is allowed to carry a body."""
+    return not (status_code < 200 or status_code in (204, 304))
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode `content` exactly like `starlette.responses.JSONResponse` does."""
+    return stdlib_dumps(content)
+
+
+def encode_headers(
+    headers: Optional[Mapping[str, str]],
+    body: Optional[bytes],
+    media_type: Optional[bytes],
+) -> RawHeaders:
+    """
+    Encode `headers` to the raw ASGI form, adding `content-length` and
+    `content-type` the same way `starlette.responses.Response` does.
+    """
+    raw: List[Tuple[bytes, bytes]] = []
+    if headers:
+        raw = [
+            (key.lower().encode("latin-1"), value.encode("latin-1"))
+            for key, value in headers.items()
+        ]
+    keys = {key for key, _ in raw}
+    if body is not None and b"content-length" not in keys:
+        raw.append((b"content-length", str(len(body)).encode("latin-1")))
+    if media_type is not None and b"content-type" not in keys:
+        raw.append((b"content-type", media_type))
+    return tuple(raw)
+
+
+def render_json_error(
+    status_code: int, detail: Any, headers: Optional[Mapping[str, str]] = None
+) -> ErrorResponse:
+    """Render an error as the `{"detail": ...}` JSON document FastAPI clients expect."""
+    if not body_allowed(status_code):
+        return ErrorResponse(status_code, b"", encode_headers(headers, None, None))
+    if detail.__class__ is str and detail == PHRASES.get(status_code):
+        body = JSON_DETAILS[status_code]
+    else:
+        body = encode_json({"detail": detail})
+    return ErrorResponse(
+        status_code, body, encode_headers(headers, body, JSON_CONTENT_TYPE)
+    )
+
+
+_DEFAULT_RESPONSES: Dict[int, ErrorResponse] = {}
+
+
+def default_error_response(status_code: int) -> ErrorResponse:
+    """
+    The shared `{"detail": <reason phrase>}` response for `status_code`, rendered the
+    first time it is asked for.
+    """
+    response = _DEFAULT_RESPONSES.get(status_code)
+    if response is None:
+        response = render_json_error(status_code, PHRASES.get(status_code))
+        _DEFAULT_RESPONSES[status_code] = response
+    return response
+
+
+def headers_key(headers: Optional[Mapping[str, str]]) -> Optional[Tuple[Any, ...]]:
+    """A hashable, order preserving key for a headers mapping."""
+    if not headers:
+        return None
+    return tuple(headers.items())
+
+
+async def send_response(send: Send, response: ErrorResponse) -> None:
+    """Send `response` on a raw ASGI `send` callable without going through `Response.__call__`."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": response.raw_headers,
+        }
+    )
+    await send({"type": "http.response.body", "body": response.body})
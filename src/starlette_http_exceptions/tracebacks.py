@@ -0,0 +1,65 @@
+"""
+Control which handled exceptions keep their traceback.
+
+A raised exception keeps every frame it passed through, and every local in those
+frames, alive through `__traceback__` (and through `__context__`/`__cause__` for
+chained exceptions) for as long as the exception itself is referenced: by a log
+record, an error-tracking buffer, a task result... For client errors the traceback is
+rarely useful, so the handlers in this package call `release_traceback()` once the
+exception has been turned into a response.
+
+The policy is global and can be overridden per class with the `keep_traceback` class
+attribute:
+
+```python
+set_traceback_policy(TRACEBACK_SERVER_ERRORS)  # keep tracebacks for 5xx only
+
+
+class PaymentFailedException(BadRequestException):
+    keep_traceback = True  # always keep, whatever the policy
+```
+"""
+
+from typing import Optional
+
+TRACEBACK_ALWAYS = "always"
+TRACEBACK_SERVER_ERRORS = "5xx"
+TRACEBACK_NEVER = "never"
+
+_POLICIES = (TRACEBACK_ALWAYS, TRACEBACK_SERVER_ERRORS, TRACEBACK_NEVER)
+
+_policy = TRACEBACK_ALWAYS
+
+
+def set_traceback_policy(policy: str) -> None:
+    """Set the global policy, one of `always` (the default), `5xx` or `never`."""
+    global _policy
+
+    if policy not in _POLICIES:
+        raise ValueError(f"policy must be one of {_POLICIES!r}, got {policy!r}")
+    _policy = policy
+
+
+def get_traceback_policy() -> str:
+    return _policy
+
+
+def keeps_traceback(exc: BaseException) -> bool:
+    """Whether `exc` should keep its traceback under the class override or the global policy."""
+    keep: Optional[bool] = getattr(exc.__class__, "keep_traceback", None)
+    if keep is not None:
+        return keep
+    if _policy == TRACEBACK_ALWAYS:
+        return True
+    if _policy == TRACEBACK_NEVER:
+        return False
+    return getattr(exc, "status_code", 500) >= 500
+
+
+def release_traceback(exc: BaseException) -> None:
+    """Drop the traceback and chained exceptions of `exc`, unless it should keep them."""
+    if keeps_traceback(exc):
+        return
+    exc.__traceback__ = None
+    exc.__context__ = None
+    exc.__cause__ = None
@@ -1,8 +1,15 @@
-from typing import Annotated, Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Annotated, Any, Union
 from starlette.exceptions import WebSocketException as StarletteWebSocketException
-from typing_extensions import Doc
 from . import status
 
+# `Annotated` and `Doc` are resolvable at runtime, for `typing.get_type_hints()`.
+if TYPE_CHECKING:
+    from typing_extensions import Doc
+else:
+    from ._typing import Doc
+
 
 class WebSocketException(StarletteWebSocketException):
     """
@@ -10,8 +17,13 @@ class WebSocketException(StarletteWebSocketException):
 
     This is for client errors, invalid authentication, invalid data, etc. Not for server
     errors in your code.
+
+    The `code` and `reason` fields live in slots, so instances never allocate an
+    instance `__dict__`.
     """
 
+    __slots__ = ("code", "reason")
+
     def __init__(
         self,
         code: Annotated[
@@ -40,10 +52,26 @@ class WebSocketException(StarletteWebSocketException):
     ) -> None:
         super().__init__(code=code, reason=reason)
 
+    def __reduce__(self) -> Any:
+        # Reading `self.__dict__` would allocate the dict the slots avoid, but
+        # `BaseException.__reduce__` only includes it when it exists (notes, attributes
+        # of unslotted subclasses).
+        reduced = BaseException.__reduce__(self)
+        state = dict(reduced[2]) if len(reduced) > 2 else {}
+        state.update(
+            (name, getattr(self, name))
+            for cls in self.__class__.__mro__
+            for name in cls.__dict__.get("__slots__", ())
+            if not name.startswith("__") and hasattr(self, name)
+        )
+        return (self.__class__, self.args, state)
+
 
 class WSProtocolError(WebSocketException):
     """Protocol Error (1002): The connection was closed due to a protocol error."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1002_PROTOCOL_ERROR, reason=reason)
 
@@ -51,6 +79,8 @@ class WSProtocolError(WebSocketException):
 class WSUnsupportedData(WebSocketException):
     """Unsupported Data (1003): The connection was closed due to unsupported data."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1003_UNSUPPORTED_DATA, reason=reason)
 
@@ -58,6 +88,8 @@ class WSUnsupportedData(WebSocketException):
 class WSNoStatusReceived(WebSocketException):
     """No Status Received (1005): No status code was received."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1005_NO_STATUS_RCVD, reason=reason)
 
@@ -65,6 +97,8 @@ class WSNoStatusReceived(WebSocketException):
 class WSAbnormalClosure(WebSocketException):
     """Abnormal Closure (1006): The connection was closed abnormally."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1006_ABNORMAL_CLOSURE, reason=reason)
 
@@ -72,6 +106,8 @@ class WSAbnormalClosure(WebSocketException):
 class WSInvalidFramePayloadData(WebSocketException):
     """Invalid Frame Payload Data (1007): Invalid frame payload data."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1007_INVALID_FRAME_PAYLOAD_DATA, reason=reason)
 
@@ -79,6 +115,8 @@ class WSInvalidFramePayloadData(WebSocketException):
 class WSPolicyViolation(WebSocketException):
     """Policy Violation (1008): The connection was closed due to a policy violation."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1008_POLICY_VIOLATION, reason=reason)
 
@@ -86,6 +124,8 @@ class WSPolicyViolation(WebSocketException):
 class WSMessageTooBig(WebSocketException):
     """Message Too Big (1009): The connection was closed due to a message being too big."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1009_MESSAGE_TOO_BIG, reason=reason)
 
@@ -93,6 +133,8 @@ class WSMessageTooBig(WebSocketException):
 class WSMandatoryExt(WebSocketException):
     """Mandatory Extension (1010): The connection was closed because a mandatory extension was expected."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1010_MANDATORY_EXT, reason=reason)
 
@@ -100,6 +142,8 @@ class WSMandatoryExt(WebSocketException):
 class WSInternalError(WebSocketException):
     """Internal Error (1011): The connection was closed due to an internal server error."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1011_INTERNAL_ERROR, reason=reason)
 
@@ -107,6 +151,8 @@ class WSInternalError(WebSocketException):
 class WSServiceRestart(WebSocketException):
     """Service Restart (1012): The connection was closed due to a service restart."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1012_SERVICE_RESTART, reason=reason)
 
@@ -114,6 +160,8 @@ class WSServiceRestart(WebSocketException):
 class WSTryAgainLater(WebSocketException):
     """Try Again Later (1013): The connection was closed with the suggestion to try again later."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1013_TRY_AGAIN_LATER, reason=reason)
 
@@ -121,6 +169,8 @@ class WSTryAgainLater(WebSocketException):
 class WSBadGateway(WebSocketException):
     """Bad Gateway (1014): The connection was closed due to a bad gateway error."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1014_BAD_GATEWAY, reason=reason)
 
@@ -128,5 +178,7 @@ class WSBadGateway(WebSocketException):
 class WSTLSHandshake(WebSocketException):
     """TLS Handshake (1015): The connection was closed due to a TLS handshake error."""
 
+    __slots__ = ()
+
     def __init__(self, reason=None):
         super().__init__(code=status.WS_1015_TLS_HANDSHAKE, reason=reason)
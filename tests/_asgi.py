@@ -0,0 +1,141 @@
+"""Drive ASGI apps directly, without a client, to observe the raw messages they send."""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import anyio
+from starlette.types import ASGIApp, Message
+
+Headers = Sequence[Tuple[bytes, bytes]]
+
+
+def http_scope(
+    path: str = "/",
+    method: str = "GET",
+    headers: Headers = (),
+    client: Tuple[str, int] = ("127.0.0.1", 50000),
+    query_string: bytes = b"",
+) -> Dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": list(headers),
+        "client": client,
+        "server": ("testserver", 80),
+    }
+
+
+def websocket_scope(
+    path: str = "/ws", client: Tuple[str, int] = ("127.0.0.1", 50000)
+) -> Dict[str, Any]:
+    return {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "scheme": "ws",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": client,
+        "server": ("testserver", 80),
+        "subprotocols": [],
+    }
+
+
+class Sent:
+    """The messages an app sent, with the `time.monotonic()` of each one."""
+
+    def __init__(self) -> None:
+        self.messages: List[Message] = []
+        self.times: List[float] = []
+
+    async def __call__(self, message: Message) -> None:
+        self.messages.append(message)
+        self.times.append(time.monotonic())
+
+    @property
+    def status(self) -> Optional[int]:
+        for message in self.messages:
+            if message["type"] == "http.response.start":
+                return message["status"]
+        return None
+
+    @property
+    def headers(self) -> Dict[bytes, bytes]:
+        for message in self.messages:
+            if message["type"] == "http.response.start":
+                return dict(message["headers"])
+        return {}
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(
+            message.get("body", b"")
+            for message in self.messages
+            if message["type"] == "http.response.body"
+        )
+
+    @property
+    def close_code(self) -> Optional[int]:
+        for message in self.messages:
+            if message["type"] == "websocket.close":
+                return message.get("code", 1000)
+        return None
+
+
+async def call(
+    app: ASGIApp, scope: Dict[str, Any], body: Sequence[bytes] = (b"",)
+) -> Sent:
+    """Call `app` with `body` sent in chunks, then a disconnect once it has all been read."""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(body) - 1}
+        for index, chunk in enumerate(body)
+    ]
+
+    async def receive() -> Message:
+        if messages:
+            return messages.pop(0)
+        await anyio.sleep_forever()
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    sent = Sent()
+    await app(scope, receive, sent)
+    return sent
+
+
+async def stalled_receive() -> Message:
+    """A `receive` for a client that never sends its body."""
+    await anyio.sleep_forever()
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+class WebSocketClient:
+    """
+    The client side of a raw ASGI WebSocket connection: `push()` queues messages for
+    the app's `receive`, and everything the app sends is recorded in `sent`.
+    """
+
+    def __init__(self) -> None:
+        self._send_stream, self._receive_stream = anyio.create_memory_object_stream(100)
+        self.sent = Sent()
+
+    def push(self, message: Message) -> None:
+        self._send_stream.send_nowait(message)
+
+    async def receive(self) -> Message:
+        return await self._receive_stream.receive()
+
+    async def send(self, message: Message) -> None:
+        await self.sent(message)
+
+    async def run(self, app: ASGIApp, scope: Optional[Dict[str, Any]] = None) -> None:
+        await app(scope or websocket_scope(), self.receive, self.send)
@@ -0,0 +1,116 @@
+import anyio
+import pytest
+
+from _asgi import WebSocketClient, websocket_scope
+from starlette_http_exceptions.middleware import WebSocketAdmissionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+class HoldingApp:
+    """Accepts every connection and holds it until the client disconnects."""
+
+    def __init__(self) -> None:
+        self.accepted = 0
+
+    async def __call__(self, scope, receive, send):
+        await receive()
+        self.accepted += 1
+        await send({"type": "websocket.accept"})
+        while (await receive())["type"] != "websocket.disconnect":
+            pass
+
+
+def connect(task_group, app, host="10.0.0.1", extensions=None):
+    client = WebSocketClient()
+    client.push({"type": "websocket.connect"})
+    scope = websocket_scope(client=(host, 1))
+    if extensions is not None:
+        scope["extensions"] = extensions
+    task_group.start_soon(client.run, app, scope)
+    return client
+
+
+async def test_refuses_beyond_max_connections():
+    inner = HoldingApp()
+    app = WebSocketAdmissionMiddleware(inner, max_connections=2)
+
+    async with anyio.create_task_group() as task_group:
+        held = [connect(task_group, app, host) for host in ("a", "b")]
+        await anyio.wait_all_tasks_blocked()
+        refused = connect(task_group, app, "c")
+        await anyio.wait_all_tasks_blocked()
+
+        assert app.connections == 2
+        for client in held:
+            client.push({"type": "websocket.disconnect", "code": 1000})
+
+    assert refused.sent.messages == [
+        {"type": "websocket.accept"},
+        {"type": "websocket.close", "code": 1013},
+    ]
+    assert inner.accepted == 2
+    assert app.connections == 0
+
+
+async def test_refuses_beyond_max_per_client():
+    inner = HoldingApp()
+    app = WebSocketAdmissionMiddleware(inner, max_per_client=1)
+
+    async with anyio.create_task_group() as task_group:
+        first = connect(task_group, app, "a")
+        await anyio.wait_all_tasks_blocked()
+        refused = connect(task_group, app, "a")
+        other = connect(task_group, app, "b")
+        await anyio.wait_all_tasks_blocked()
+
+        assert app.client_connections == {"a": 1, "b": 1}
+        first.push({"type": "websocket.disconnect", "code": 1000})
+        other.push({"type": "websocket.disconnect", "code": 1000})
+
+    assert refused.sent.close_code == 1013
+    assert first.sent.messages[0] == {"type": "websocket.accept"}
+    assert app.client_connections == {}
+
+    async with anyio.create_task_group() as task_group:
+        again = connect(task_group, app, "a")
+        await anyio.wait_all_tasks_blocked()
+        again.push({"type": "websocket.disconnect", "code": 1000})
+
+    assert again.sent.close_code is None
+    assert inner.accepted == 3
+
+
+async def test_counts_are_released_when_the_app_fails():
+    async def failing(scope, receive, send):
+        raise RuntimeError("boom")
+
+    app = WebSocketAdmissionMiddleware(failing, max_connections=1, max_per_client=1)
+    client = WebSocketClient()
+
+    with pytest.raises(RuntimeError):
+        await client.run(app)
+
+    assert (app.connections, app.client_connections) == (0, {})
+
+
+async def test_refuses_with_503_when_the_server_supports_http_responses():
+    inner = HoldingApp()
+    app = WebSocketAdmissionMiddleware(inner, max_connections=1, retry_after=5)
+
+    async with anyio.create_task_group() as task_group:
+        held = connect(task_group, app)
+        await anyio.wait_all_tasks_blocked()
+        refused = connect(task_group, app, extensions={"websocket.http.response": {}})
+        await anyio.wait_all_tasks_blocked()
+        held.push({"type": "websocket.disconnect", "code": 1000})
+
+    start, body = refused.sent.messages
+    assert start["type"] == "websocket.http.response.start"
+    assert start["status"] == 503
+    assert dict(start["headers"])[b"retry-after"] == b"5"
+    assert body == {
+        "type": "websocket.http.response.body",
+        "body": b'{"detail":"Service Unavailable"}',
+    }
+    assert inner.accepted == 1
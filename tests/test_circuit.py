@@ -0,0 +1,110 @@
+import anyio
+import pytest
+
+from starlette_http_exceptions import (
+    BadGatewayException,
+    GatewayTimeoutException,
+    NotFoundException,
+    ServiceUnavailableException,
+)
+from starlette_http_exceptions.circuit import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(BadGatewayException):
+        async with breaker:
+            raise ConnectionError("refused")
+
+
+async def test_opens_after_threshold_and_recovers():
+    clock = Clock()
+    breaker = CircuitBreaker("db", failure_threshold=2, recovery_timeout=10, clock=clock)
+
+    await fail(breaker)
+    await fail(breaker)
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(ServiceUnavailableException) as info:
+        async with breaker:
+            pass
+    assert info.value.headers == {"Retry-After": "10"}
+
+    clock.now = 10
+    assert breaker.state == STATE_HALF_OPEN
+    async with breaker:
+        pass
+    assert breaker.state == STATE_CLOSED
+
+
+async def test_http_exceptions_pass_through():
+    breaker = CircuitBreaker("db", failure_threshold=1)
+
+    with pytest.raises(NotFoundException):
+        async with breaker:
+            raise NotFoundException()
+
+    assert breaker.state == STATE_CLOSED
+
+
+async def test_timeout_is_a_gateway_timeout():
+    breaker = CircuitBreaker("db", timeout=0.01)
+
+    @breaker
+    async def slow() -> None:
+        await anyio.sleep(1)
+
+    with pytest.raises(GatewayTimeoutException):
+        await slow()
+    assert breaker.failures == 1
+
+
+async def test_hung_probe_reopens_the_circuit():
+    clock = Clock()
+    breaker = CircuitBreaker(
+        "db", failure_threshold=1, recovery_timeout=10, probe_timeout=2, clock=clock
+    )
+    await fail(breaker)
+    clock.now = 10
+
+    # A probe that never finishes holds the only half-open slot.
+    await breaker.__aenter__()
+    with pytest.raises(ServiceUnavailableException):
+        await breaker.__aenter__()
+    assert breaker.state == STATE_HALF_OPEN
+
+    clock.now = 12
+    with pytest.raises(ServiceUnavailableException):
+        await breaker.__aenter__()
+    assert breaker.state == STATE_OPEN
+
+    clock.now = 22
+    async with breaker:
+        pass
+    assert breaker.state == STATE_CLOSED
+
+
+async def test_rejection_headers_are_not_shared():
+    breaker = CircuitBreaker("db", failure_threshold=1, clock=Clock())
+    await fail(breaker)
+
+    with pytest.raises(ServiceUnavailableException) as first:
+        breaker.before_call()
+    first.value.headers["X-Extra"] = "1"
+    with pytest.raises(ServiceUnavailableException) as second:
+        breaker.before_call()
+
+    assert second.value.headers == {"Retry-After": "30"}
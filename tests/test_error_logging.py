@@ -0,0 +1,69 @@
+import logging
+import threading
+from typing import List
+
+import pytest
+
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.error_logging import (
+    SampledExceptionLogger,
+    start_background_logging,
+)
+
+
+class ThreadRecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.threads.append(threading.current_thread().name)
+
+
+@pytest.fixture
+def root_handler():
+    handler = ThreadRecordingHandler()
+    root = logging.getLogger()
+    root.addHandler(handler)
+    yield handler
+    root.removeHandler(handler)
+
+
+def test_ancestor_handlers_run_off_the_calling_thread(root_handler):
+    logger = logging.getLogger("tests.background.ancestors")
+    logger.setLevel(logging.WARNING)
+
+    listener = start_background_logging(logger)
+    try:
+        assert logger.propagate is False
+        SampledExceptionLogger(logger).log(NotFoundException())
+    finally:
+        listener.stop()
+
+    assert len(root_handler.threads) == 1
+    assert root_handler.threads[0] != threading.current_thread().name
+    assert logger.propagate is True
+    assert logger.handlers == []
+
+
+def test_own_handlers_are_restored(root_handler):
+    logger = logging.getLogger("tests.background.own")
+    logger.setLevel(logging.WARNING)
+    own = ThreadRecordingHandler()
+    logger.addHandler(own)
+
+    listener = start_background_logging(logger)
+    logger.warning("moved")
+    listener.stop()
+    logger.warning("restored")
+
+    assert own.threads[0] != threading.current_thread().name
+    assert own.threads[1] == threading.current_thread().name
+    assert logger.handlers == [own]
+    logger.removeHandler(own)
+
+
+def test_sampling():
+    exception_logger = SampledExceptionLogger(burst=2, sample_every=3, clock=lambda: 0.0)
+
+    assert [exception_logger.sample(404) for _ in range(6)] == [0, 0, None, None, 2, None]
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from _asgi import WebSocketClient, call, http_scope
+from starlette_http_exceptions import UnauthorizedException
+from starlette_http_exceptions.middleware import HTTPExceptionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+class RequireToken(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if "authorization" not in request.headers:
+            raise UnauthorizedException(
+                "Token missing", headers={"WWW-Authenticate": "Bearer"}
+            )
+        return await call_next(request)
+
+
+def test_exceptions_from_inner_middleware_are_rendered():
+    async def home(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(
+        routes=[Route("/", home)],
+        middleware=[Middleware(HTTPExceptionMiddleware), Middleware(RequireToken)],
+    )
+    client = TestClient(app)
+
+    response = client.get("/")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Token missing"}
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert client.get("/", headers={"Authorization": "Bearer t"}).text == "ok"
+
+
+async def test_plain_asgi_app():
+    async def app(scope, receive, send):
+        raise UnauthorizedException()
+
+    sent = await call(HTTPExceptionMiddleware(app), http_scope())
+
+    assert sent.status == 401
+    assert json.loads(sent.body) == {"detail": "Unauthorized"}
+
+
+async def test_exceptions_after_the_response_started_are_reraised():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        raise UnauthorizedException()
+
+    with pytest.raises(UnauthorizedException):
+        await call(HTTPExceptionMiddleware(app), http_scope())
+
+
+async def test_other_exceptions_pass_through():
+    async def app(scope, receive, send):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await call(HTTPExceptionMiddleware(app), http_scope())
+
+
+async def test_non_http_scopes_pass_through():
+    async def app(scope, receive, send):
+        raise UnauthorizedException()
+
+    with pytest.raises(UnauthorizedException):
+        await WebSocketClient().run(HTTPExceptionMiddleware(app))
@@ -0,0 +1,67 @@
+import copy
+import gc
+import pickle
+
+import pytest
+
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.ws_exceptions import WSPolicyViolation
+
+
+class ItemNotFound(NotFoundException):
+    __slots__ = ("item_id",)
+
+    def __init__(self, item_id: int) -> None:
+        super().__init__(detail=f"item {item_id} not found")
+        self.item_id = item_id
+
+
+def has_instance_dict(exc: BaseException) -> bool:
+    return any(isinstance(referent, dict) for referent in gc.get_referents(exc))
+
+
+def test_pickle_round_trip():
+    exc = ItemNotFound(3)
+    exc.headers = {"X-Item": "3"}
+
+    restored = pickle.loads(pickle.dumps(exc))
+
+    assert type(restored) is ItemNotFound
+    assert (restored.status_code, restored.detail) == (404, "item 3 not found")
+    assert (restored.headers, restored.item_id) == ({"X-Item": "3"}, 3)
+
+
+def test_pickling_does_not_allocate_a_dict():
+    exc = NotFoundException()
+    ws_exc = WSPolicyViolation(reason="banned")
+
+    pickle.dumps(exc)
+    restored = pickle.loads(pickle.dumps(ws_exc))
+
+    assert not has_instance_dict(exc)
+    assert not has_instance_dict(ws_exc)
+    assert (restored.code, restored.reason) == (1008, "banned")
+
+
+class UnslottedNotFound(NotFoundException):
+    pass
+
+
+def round_trip(exc):
+    return pickle.loads(pickle.dumps(exc))
+
+
+@pytest.mark.parametrize("copy_", [copy.copy, round_trip])
+def test_notes_and_instance_attributes_survive(copy_):
+    exc = UnslottedNotFound(detail="missing")
+    exc.user_id = 5
+    exc.__notes__ = ["hello"]  # add_note() on Python 3.11+
+    ws_exc = WSPolicyViolation(reason="banned")
+    ws_exc.__notes__ = ["ws"]
+
+    restored = copy_(exc)
+    restored_ws = copy_(ws_exc)
+
+    assert (restored.user_id, restored.__notes__) == (5, ["hello"])
+    assert (restored.status_code, restored.detail) == (404, "missing")
+    assert (restored_ws.__notes__, restored_ws.reason) == (["ws"], "banned")
@@ -0,0 +1,88 @@
+import anyio
+import pytest
+from starlette.exceptions import HTTPException
+
+from starlette_http_exceptions import BadRequestException, NotFoundException
+from starlette_http_exceptions.handlers import (
+    CachedHTTPExceptionHandler,
+    ErrorResponseCache,
+    exception_key,
+)
+
+
+def test_repeated_exceptions_share_one_response():
+    cache = ErrorResponseCache()
+
+    first = cache.get(NotFoundException(detail="item 1"))
+    second = cache.get(NotFoundException(detail="item 1"))
+    other = cache.get(NotFoundException(detail="item 2"))
+    with_headers = cache.get(NotFoundException(detail="item 1", headers={"X-A": "1"}))
+
+    assert first is second
+    assert other is not first and with_headers is not first
+    assert with_headers.headers["x-a"] == "1"
+    assert len(cache) == 3
+
+
+def test_least_recently_used_responses_are_evicted():
+    cache = ErrorResponseCache(maxsize=2)
+    a = cache.get(HTTPException(400, "a"))
+    cache.get(HTTPException(400, "b"))
+    assert cache.get(HTTPException(400, "a")) is a
+    cache.get(HTTPException(400, "c"))
+
+    assert cache.get(HTTPException(400, "a")) is a
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize(
+    "detail, body",
+    [
+        ((True,), b'{"detail":[true]}'),
+        (("a", 1), b'{"detail":["a",1]}'),
+        (("a", 1.0), b'{"detail":["a",1.0]}'),
+        (frozenset([1]), None),
+        (1.0, b'{"detail":1.0}'),
+        (-0.0, b'{"detail":-0.0}'),
+        ({"id": 1}, b'{"detail":{"id":1}}'),
+    ],
+)
+def test_other_details_are_never_cached(detail, body):
+    cache = ErrorResponseCache()
+    cache.get(BadRequestException(detail=(1,)))
+    cache.get(BadRequestException(detail=("a", 1)))
+    cache.get(BadRequestException(detail=1))
+    cache.get(BadRequestException(detail=0.0))
+
+    assert exception_key(BadRequestException(detail=detail)) is None
+    if body is not None:
+        assert cache.get(BadRequestException(detail=detail)).body == body
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("detail", ["text", 1, True, None])
+def test_cacheable_details(detail):
+    key = exception_key(BadRequestException(detail=detail))
+
+    assert key is not None
+    assert key != exception_key(BadRequestException(detail=not detail))
+
+
+def test_unhashable_headers_are_not_cached():
+    exc = NotFoundException(headers={"X-A": "1"})
+    exc.headers = {"X-A": ["unhashable"]}
+
+    assert exception_key(exc) is None
+
+
+def test_handler_reuses_responses():
+    handler = CachedHTTPExceptionHandler()
+    try:
+        raise NotFoundException()
+    except NotFoundException as exc:
+        caught = exc
+
+    response = anyio.run(handler, None, caught)
+
+    assert response.status_code == 404
+    assert anyio.run(handler, None, NotFoundException()) is response
@@ -0,0 +1,146 @@
+import anyio
+import pytest
+
+from _asgi import call, http_scope
+from starlette_http_exceptions.middleware import (
+    IdempotencyMiddleware,
+    MemoryIdempotencyStore,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def counting_app(status: int = 201):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope)
+        await receive()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"text/plain"),
+                    (b"set-cookie", b"sid=secret"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"created %d" % len(calls)})
+
+    return app, calls
+
+
+def post(key: bytes = b"k1", *headers):
+    return http_scope(
+        "/orders", method="POST", headers=[(b"idempotency-key", key), *headers]
+    )
+
+
+async def test_replays_stored_response():
+    app, calls = counting_app()
+    middleware = IdempotencyMiddleware(app)
+
+    first = await call(middleware, post())
+    second = await call(middleware, post())
+
+    assert len(calls) == 1
+    assert second.status == 201
+    assert second.body == first.body == b"created 1"
+    assert second.headers[b"idempotent-replayed"] == b"true"
+
+
+async def test_set_cookie_is_not_replayed():
+    app, _ = counting_app()
+    middleware = IdempotencyMiddleware(app)
+
+    first = await call(middleware, post())
+    second = await call(middleware, post())
+
+    assert first.headers[b"set-cookie"] == b"sid=secret"
+    assert b"set-cookie" not in second.headers
+
+
+async def test_keys_are_scoped_to_the_caller():
+    app, calls = counting_app()
+    middleware = IdempotencyMiddleware(app)
+
+    await call(middleware, post(b"k1", (b"authorization", b"Bearer alice")))
+    other = await call(middleware, post(b"k1", (b"authorization", b"Bearer mallory")))
+
+    assert len(calls) == 2
+    assert other.body == b"created 2"
+    assert b"idempotent-replayed" not in other.headers
+
+
+async def test_custom_caller_key():
+    app, calls = counting_app()
+    middleware = IdempotencyMiddleware(app, caller_key=lambda scope: "everyone")
+
+    await call(middleware, post(b"k1", (b"authorization", b"Bearer alice")))
+    await call(middleware, post(b"k1", (b"authorization", b"Bearer bob")))
+
+    assert len(calls) == 1
+
+
+async def test_server_errors_are_not_stored():
+    app, calls = counting_app(status=500)
+    middleware = IdempotencyMiddleware(app)
+
+    await call(middleware, post())
+    await call(middleware, post())
+
+    assert len(calls) == 2
+
+
+async def test_large_responses_keep_the_key():
+    app, calls = counting_app()
+    middleware = IdempotencyMiddleware(app, max_body_size=4)
+
+    first = await call(middleware, post())
+    second = await call(middleware, post())
+
+    assert len(calls) == 1
+    assert first.body == b"created 1"
+    assert second.status == 409
+    assert b"too large to replay" in second.body
+
+async def test_in_flight_repeat_conflicts():
+    release = anyio.Event()
+
+    async def slow(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = IdempotencyMiddleware(slow)
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(call, middleware, post())
+        await anyio.wait_all_tasks_blocked()
+        repeat = await call(middleware, post())
+        release.set()
+
+    assert repeat.status == 409
+
+
+def test_store_keeps_in_flight_keys_when_full():
+    store = MemoryIdempotencyStore(maxsize=2)
+
+    assert store.claim("a") == (True, None)
+    assert store.claim("b") == (True, None)
+    claimed, response = store.claim("c")
+
+    assert not claimed
+    assert response is not None and response.status_code == 503
+    assert store.claim("a") == (False, None)
+
+
+def test_store_evicts_completed_keys_first():
+    store = MemoryIdempotencyStore(maxsize=2)
+    store.claim("a")
+    store.claim("b")
+    store.complete("b", object())  # type: ignore[arg-type]
+
+    assert store.claim("c") == (True, None)
+    assert store.claim("a") == (False, None)
+    assert len(store) == 2
@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import typing
+from typing import Dict, List, Tuple
+
+import pytest
+
+import starlette_http_exceptions
+from starlette_http_exceptions import NotFoundException, WebSocketException
+
+# Modules that must not be imported by the package import or the exception classes.
+HEAVY_MODULES = [
+    "anyio",
+    "starlette.requests",
+    "starlette.responses",
+    "typing_extensions",
+]
+
+# Budgets for `-X importtime`, in microseconds, about 20 times what they take on a
+# laptop so that slow CI machines pass. They catch import-time work creeping into
+# the package; `HEAVY_MODULES` catches eager imports, which cost little on their own.
+PACKAGE_IMPORT_BUDGET = 10_000
+OWN_MODULES_BUDGET = 30_000
+
+
+def modules_after(statement: str) -> List[str]:
+    """The modules a fresh interpreter has imported after running `statement`."""
+    output = subprocess.run(
+        [sys.executable, "-c", f"import sys; {statement}; print(*sys.modules)"],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={"PYTHONPATH": ":".join(sys.path)},
+    ).stdout
+    return output.split()
+
+
+def import_times(statement: str) -> Dict[str, Tuple[int, int]]:
+    """The (self, cumulative) import time of each module `statement` imports, in µs."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={"PYTHONPATH": ":".join(sys.path)},
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def best_of(runs: int, measure) -> int:
+    return min(measure() for _ in range(runs))
+
+
+def heavy_modules_after(statement: str) -> List[str]:
+    modules = modules_after(statement)
+    return [module for module in HEAVY_MODULES if module in modules]
+
+
+def test_package_import_is_lazy():
+    modules = modules_after("import starlette_http_exceptions")
+
+    assert "starlette_http_exceptions.http_exceptions" not in modules
+    assert heavy_modules_after("import starlette_http_exceptions") == []
+
+
+def test_package_import_budget():
+    def measure() -> int:
+        return import_times("import starlette_http_exceptions")[
+            "starlette_http_exceptions"
+        ][1]
+
+    assert best_of(3, measure) < PACKAGE_IMPORT_BUDGET
+
+
+def test_exception_import_budget():
+    # Only this package's own modules: `starlette.exceptions` pulls in `http.client`,
+    # which is Starlette's cost, not ours.
+    def measure() -> int:
+        times = import_times("from starlette_http_exceptions import NotFoundException")
+        return sum(
+            self_us
+            for name, (self_us, _) in times.items()
+            if name.split(".")[0] == "starlette_http_exceptions"
+        )
+
+    assert best_of(3, measure) < OWN_MODULES_BUDGET
+
+
+@pytest.mark.parametrize(
+    "name", ["NotFoundException", "WebSocketException", "exception_for_status"]
+)
+def test_exports_import_no_heavy_modules(name):
+    assert heavy_modules_after(f"from starlette_http_exceptions import {name}") == []
+
+
+def test_dir_lists_exports_only():
+    assert dir(starlette_http_exceptions) == sorted(starlette_http_exceptions.__all__)
+
+
+def test_annotations_resolve_at_runtime():
+    hints = typing.get_type_hints(NotFoundException.__init__, include_extras=True)
+    assert typing.get_origin(hints["detail"]) is typing.Annotated
+    assert hints["detail"].__metadata__[0].documentation.startswith("Any data")
+    assert "reason" in typing.get_type_hints(WebSocketException.__init__)
@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from starlette_http_exceptions import _json
+
+CONTENT = [
+    {"detail": "Not Found"},
+    {"detail": ["é", 1, True, None, {"nested": [2**63 - 1, -(2**63)]}]},
+    ("tuple", 2**64 - 1),
+    {"ratio": 0.5},
+    {"big": 1e16},
+    {"huge": 2**64},
+    {1: "int key", None: "none key", True: "bool key", 1.5: "float key"},
+]
+REFUSED = [{"value": math.nan}, {"value": math.inf}, [-math.inf]]
+
+
+def fast_encoder(content):
+    """Stands in for orjson: encodes NaN as null and rejects non-str keys."""
+    if isinstance(content, float) and not math.isfinite(content):
+        return b"null"
+    if isinstance(content, dict):
+        if any(key.__class__ is not str for key in content):
+            raise TypeError("Dict key must be str")
+    return _json.stdlib_dumps(content)
+
+
+def backends():
+    yield pytest.param(_json.consistent(fast_encoder), id="fake")
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        yield pytest.param(_json.consistent(orjson.dumps), id="orjson")
+    try:
+        import msgspec
+    except ImportError:
+        pass
+    else:
+        encode = msgspec.json.Encoder().encode
+        yield pytest.param(_json.consistent(encode), id="msgspec")
+
+
+@pytest.mark.parametrize("dumps", list(backends()))
+@pytest.mark.parametrize("content", CONTENT)
+def test_output_matches_stdlib(dumps, content):
+    assert dumps(content) == _json.stdlib_dumps(content)
+
+
+@pytest.mark.parametrize("dumps", list(backends()))
+@pytest.mark.parametrize("content", REFUSED)
+def test_non_finite_floats_are_refused(dumps, content):
+    with pytest.raises(ValueError):
+        dumps(content)
+
+
+def test_plain_content_uses_the_fast_encoder():
+    calls = []
+
+    def encode(content):
+        calls.append(content)
+        return b"fast"
+
+    dumps = _json.consistent(encode)
+
+    assert dumps({"detail": "Not Found"}) == b"fast"
+    assert dumps({"detail": 0.5}) == b'{"detail":0.5}'
+    assert calls == [{"detail": "Not Found"}]
@@ -0,0 +1,106 @@
+import anyio
+import pytest
+
+from _asgi import call, http_scope
+from starlette_http_exceptions.middleware import LoadSheddingMiddleware
+from starlette_http_exceptions.middleware._prefixes import PrefixTable
+
+pytestmark = pytest.mark.anyio
+
+
+class HeldApp:
+    """Holds every request in flight until `release` is set."""
+
+    def __init__(self) -> None:
+        self.release = anyio.Event()
+        self.paths = []
+
+    async def __call__(self, scope, receive, send):
+        self.paths.append(scope["path"])
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def request(app, path, results):
+    results.append(await call(app, http_scope(path)))
+
+
+async def test_rejects_beyond_max_concurrency():
+    inner = HeldApp()
+    app = LoadSheddingMiddleware(inner, max_concurrency=2, min_retry_after=3)
+    held = []
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(2):
+            tg.start_soon(request, app, "/", held)
+        await anyio.wait_all_tasks_blocked()
+        rejected = await call(app, http_scope())
+        inner.release.set()
+
+    assert rejected.status == 503
+    assert rejected.headers[b"retry-after"] == b"3"
+    assert rejected.headers[b"content-type"] == b"application/json"
+    assert rejected.body == b'{"detail":"Service Unavailable"}'
+    assert [sent.status for sent in held] == [200, 200]
+    assert inner.paths == ["/", "/"]
+    assert app.in_flight == 0
+    assert (await call(app, http_scope())).status == 200
+
+
+async def test_route_limits_use_the_longest_prefix():
+    inner = HeldApp()
+    app = LoadSheddingMiddleware(inner, route_limits={"/api": 5, "/api/export": 1})
+    held = []
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(request, app, "/api/export/1", held)
+        await anyio.wait_all_tasks_blocked()
+        export = await call(app, http_scope("/api/export/2"))
+        tg.start_soon(request, app, "/api/items", held)
+        await anyio.wait_all_tasks_blocked()
+        inner.release.set()
+
+    assert export.status == 503
+    assert [sent.status for sent in held] == [200, 200]
+    assert inner.paths == ["/api/export/1", "/api/items"]
+
+
+async def test_retry_after_follows_request_duration():
+    async def slow(scope, receive, send):
+        await anyio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    app = LoadSheddingMiddleware(slow, min_retry_after=0, max_retry_after=2)
+    assert app.retry_after() == 0
+
+    await call(app, http_scope())
+
+    assert app.retry_after() == 1
+    app._average_duration = 30.0
+    assert app.retry_after() == 2
+
+
+def test_invalid_retry_after_bounds():
+    with pytest.raises(ValueError):
+        LoadSheddingMiddleware(HeldApp(), min_retry_after=5, max_retry_after=1)
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/api", "/api"),
+        ("/api/items", "/api"),
+        ("/api/export", "/api/export"),
+        ("/api/export/1", "/api/export"),
+        ("/apiary", "/"),
+        ("/api-docs", "/"),
+        ("/", "/"),
+    ],
+)
+def test_prefixes_match_whole_segments(path, expected):
+    table = PrefixTable({"/": "/", "/api": "/api", "/api/export/": "/api/export"})
+
+    assert table.match(path)[1] == expected
+    assert PrefixTable({"/api": 1}).match("/apiary") is None
@@ -0,0 +1,84 @@
+import pytest
+
+from starlette_http_exceptions import LockedException
+from starlette_http_exceptions.locks import LockManager
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_contended_key_is_locked():
+    clock = Clock()
+    locks = LockManager(lease_ttl=30, clock=clock)
+
+    async with locks.try_acquire("doc"):
+        clock.now = 10.5
+        with pytest.raises(LockedException) as info:
+            locks.try_acquire("doc")
+        assert info.value.headers == {"Retry-After": "20"}
+
+    assert not locks.locked("doc")
+    assert locks.try_acquire("doc")
+
+
+def test_expired_lease_can_be_taken_over():
+    clock = Clock()
+    locks = LockManager(lease_ttl=5, clock=clock)
+    stale = locks.try_acquire("doc")
+
+    clock.now = 6
+    fresh = locks.try_acquire("doc")
+    stale.release()
+
+    assert locks.holds(fresh)
+    with pytest.raises(LockedException):
+        stale.renew()
+
+
+def test_rejection_headers_are_not_shared():
+    locks = LockManager(clock=Clock())
+    lease = locks.try_acquire("doc")
+
+    with pytest.raises(LockedException) as first:
+        locks.try_acquire("doc")
+    first.value.headers["X-Extra"] = "1"
+    with pytest.raises(LockedException) as second:
+        locks.try_acquire("doc")
+
+    assert second.value.headers == {"Retry-After": "30"}
+    assert locks.retry_after_headers("doc") == {"Retry-After": "30"}
+    lease.release()
+
+
+def test_unreferenced_leases_still_lock():
+    clock = Clock()
+    locks = LockManager(lease_ttl=30, clock=clock)
+    locks.try_acquire("doc")
+
+    clock.now = 29
+    assert locks.locked("doc")
+    with pytest.raises(LockedException):
+        locks.try_acquire("doc")
+    clock.now = 30
+    assert not locks.locked("doc")
+    assert len(locks) == 0
+
+
+def test_expired_entries_are_swept():
+    clock = Clock()
+    locks = LockManager(lease_ttl=1, clock=clock)
+
+    for index in range(10_000):
+        locks.try_acquire(index)
+        clock.now += 0.01
+
+    # At most about 100 live leases, plus what accumulated since the last sweep.
+    assert len(locks) < 2 * 1024
+    assert locks.locked(9_999)
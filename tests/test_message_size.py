@@ -0,0 +1,116 @@
+import pytest
+
+from _asgi import WebSocketClient, websocket_scope
+from starlette_http_exceptions.middleware import WebSocketMessageSizeMiddleware
+from starlette_http_exceptions.middleware.message_size import message_size
+from starlette_http_exceptions.ws_exceptions import WSMessageTooBig
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class EchoApp:
+    """Accepts, echoes every message and records what it received."""
+
+    def __init__(self) -> None:
+        self.received = []
+
+    async def __call__(self, scope, receive, send):
+        await receive()
+        await send({"type": "websocket.accept"})
+        while True:
+            message = await receive()
+            self.received.append(message)
+            if message["type"] == "websocket.disconnect":
+                await send({"type": "websocket.send", "text": "after close"})
+                return
+            await send({"type": "websocket.send", "text": message.get("text")})
+
+
+async def run(app, texts, scope=None):
+    client = WebSocketClient()
+    client.push({"type": "websocket.connect"})
+    for text in texts:
+        client.push({"type": "websocket.receive", "text": text})
+    client.push({"type": "websocket.disconnect", "code": 1000})
+    await client.run(app, scope)
+    return client.sent
+
+
+def test_message_size():
+    assert message_size({"type": "websocket.receive", "bytes": b"abc"}) == 3
+    assert message_size({"type": "websocket.receive", "text": "abc"}) == 3
+    assert message_size({"type": "websocket.receive", "text": "é"}) == 2
+    assert message_size({"type": "websocket.receive"}) == 0
+
+
+async def test_oversized_message_closes_with_1009():
+    inner = EchoApp()
+    app = WebSocketMessageSizeMiddleware(inner, max_message_size=4)
+
+    sent = await run(app, ["ok", "too long", "never seen"])
+
+    assert sent.close_code == 1009
+    assert sent.messages[-1] == {
+        "type": "websocket.close",
+        "code": 1009,
+        "reason": WSMessageTooBig().reason,
+    }
+    assert [message.get("text") for message in sent.messages[1:-1]] == ["ok"]
+    assert inner.received == [
+        {"type": "websocket.receive", "text": "ok"},
+        {"type": "websocket.disconnect", "code": 1009},
+    ]
+
+
+async def test_route_limits_use_the_longest_prefix():
+    app = WebSocketMessageSizeMiddleware(
+        EchoApp(), max_message_size=2, route_limits={"/ws": 10, "/ws/tiny": 1}
+    )
+
+    assert (await run(app, ["12345"], websocket_scope("/ws/chat"))).close_code is None
+    assert (await run(app, ["12"], websocket_scope("/ws/tiny"))).close_code == 1009
+    assert (await run(app, ["123"], websocket_scope("/other"))).close_code == 1009
+
+
+async def test_window_bytes():
+    clock = Clock()
+    inner = EchoApp()
+    app = WebSocketMessageSizeMiddleware(
+        inner, max_window_bytes=5, window=1.0, clock=clock
+    )
+    client = WebSocketClient()
+    client.push({"type": "websocket.connect"})
+    client.push({"type": "websocket.receive", "text": "abc"})
+    original_receive = client.receive
+
+    async def receive():
+        message = await original_receive()
+        clock.now += 0.4
+        return message
+
+    client.receive = receive
+    for text in ["ab", "abc", "abcd"]:
+        client.push({"type": "websocket.receive", "text": text})
+    await client.run(app)
+
+    # Each receive takes 0.4s: 3 bytes at 0.8s, a new window with 2 at 1.2s, 5 at
+    # 1.6s, then 9 at 2.0s.
+    assert [message.get("text") for message in inner.received[:-1]] == [
+        "abc",
+        "ab",
+        "abc",
+    ]
+    assert client.sent.close_code == 1009
+
+
+def test_invalid_window():
+    with pytest.raises(ValueError):
+        WebSocketMessageSizeMiddleware(EchoApp(), window=0)
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.handlers import CachedHTTPExceptionHandler
+from starlette_http_exceptions.metrics import (
+    ErrorCounters,
+    aggregate,
+    instrument,
+    mark_process_dead,
+    read_counters,
+    remove_dead_workers,
+    render_prometheus,
+)
+
+
+def exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_record_and_snapshot():
+    counters = ErrorCounters(max_routes=2)
+    counters.record(404, "/items/{id}")
+    counters.record(404, "/items/{id}")
+    counters.record(1008)
+    counters.record(404, "/overflow")
+    counters.record(200, "/ignored")
+
+    assert counters.snapshot() == {("/items/{id}", 404): 2, ("", 1008): 1, ("", 404): 1}
+    assert 'code="404",route="/items/{id}"} 2' in render_prometheus(counters.snapshot())
+
+
+def test_only_handled_exceptions_are_counted():
+    counters = ErrorCounters()
+
+    async def handled(request):
+        raise NotFoundException()
+
+    async def caught(request):
+        try:
+            raise NotFoundException()
+        except NotFoundException:
+            raise HTTPException(409)
+
+    app = Starlette(
+        routes=[Route("/handled", handled), Route("/caught", caught)],
+        exception_handlers={
+            HTTPException: instrument(CachedHTTPExceptionHandler(), counters)
+        },
+    )
+    client = TestClient(app)
+    client.get("/handled")
+    client.get("/caught")
+
+    assert counters.snapshot() == {("/handled", 404): 1, ("/caught", 409): 1}
+
+
+def test_workers_aggregate(tmp_path):
+    directory = str(tmp_path)
+    counters = ErrorCounters.for_worker(directory)
+    counters.record(503, "/")
+    dead = ErrorCounters(path=os.path.join(directory, f"{exited_pid()}.counters"))
+    dead.record(503, "/")
+    dead.close()
+
+    paths = [str(path) for path in tmp_path.glob("*.counters")]
+    assert aggregate(paths) == {("/", 503): 2}
+    assert read_counters(counters.path) == {("/", 503): 1}
+    counters.close()
+
+
+def test_dead_workers_are_removed(tmp_path):
+    directory = str(tmp_path)
+    live = ErrorCounters.for_worker(directory)
+    pid = exited_pid()
+    ErrorCounters(path=os.path.join(directory, f"{pid}.counters")).close()
+    (tmp_path / "unrelated.txt").write_text("")
+
+    assert remove_dead_workers(directory) == [pid]
+    assert sorted(os.listdir(directory)) == [f"{os.getpid()}.counters", "unrelated.txt"]
+
+    mark_process_dead(os.getpid(), directory)
+    mark_process_dead(os.getpid(), directory)
+    assert os.listdir(directory) == ["unrelated.txt"]
+    live.close()
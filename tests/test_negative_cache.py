@@ -0,0 +1,185 @@
+import pytest
+
+from _asgi import call, http_scope
+from starlette_http_exceptions.middleware import (
+    NegativeCache,
+    NegativeCacheMiddleware,
+)
+from starlette_http_exceptions.responses import ErrorResponse
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingApp:
+    """Answers `status` with `headers`, in `chunks` body messages, counting calls."""
+
+    def __init__(self, status=404, headers=(), chunks=(b"missing",)) -> None:
+        self.status = status
+        self.headers = list(headers)
+        self.chunks = chunks
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": list(self.headers),
+            }
+        )
+        for index, chunk in enumerate(self.chunks):
+            more_body = index < len(self.chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+
+def response(status_code=404, body=b"x"):
+    return ErrorResponse(status_code, body, ((b"content-type", b"text/plain"),))
+
+
+async def test_not_found_is_served_from_the_cache():
+    inner = CountingApp(headers=[(b"x-request", b"1"), (b"cache-control", b"max-age=5")])
+    app = NegativeCacheMiddleware(inner)
+
+    first = await call(app, http_scope("/missing"))
+    second = await call(app, http_scope("/missing"))
+
+    assert inner.calls == 1
+    assert first.status == second.status == 404
+    assert second.body == b"missing"
+    assert second.headers == first.headers
+    assert second.headers[b"cache-control"] == b"max-age=5"
+    await call(app, http_scope("/missing", query_string=b"page=2"))
+    await call(app, http_scope("/missing", method="POST"))
+    assert inner.calls == 3
+
+
+@pytest.mark.parametrize(
+    "inner",
+    [
+        CountingApp(status=200),
+        CountingApp(status=500),
+        CountingApp(headers=[(b"set-cookie", b"session=1")]),
+        CountingApp(chunks=(b"miss", b"ing")),
+    ],
+    ids=["ok", "server-error", "set-cookie", "streamed"],
+)
+async def test_uncacheable_responses_reach_the_app(inner):
+    app = NegativeCacheMiddleware(inner)
+
+    await call(app, http_scope("/"))
+    sent = await call(app, http_scope("/"))
+
+    assert inner.calls == 2
+    assert sent.body == b"missing"
+
+
+async def test_vary_headers_are_part_of_the_key():
+    inner = CountingApp()
+    app = NegativeCacheMiddleware(inner, vary_headers=["Authorization"])
+
+    await call(app, http_scope("/", headers=[(b"authorization", b"alice")]))
+    await call(app, http_scope("/", headers=[(b"authorization", b"bob")]))
+    await call(app, http_scope("/", headers=[(b"authorization", b"alice")]))
+
+    assert inner.calls == 2
+
+
+async def test_invalidate_reaches_the_app_again():
+    inner = CountingApp()
+    app = NegativeCacheMiddleware(inner)
+    await call(app, http_scope("/items/1"))
+    await call(app, http_scope("/items/1", method="HEAD"))
+
+    assert app.cache.invalidate("/items/1") == 2
+    await call(app, http_scope("/items/1"))
+
+    assert inner.calls == 3
+
+
+def test_entries_expire():
+    clock = Clock()
+    cache = NegativeCache(ttl=10, gone_ttl=100, clock=clock)
+    cache.set((b"a",), "/a", response(404))
+    cache.set((b"b",), "/b", response(410))
+
+    clock.now = 10
+    assert cache.get((b"a",)) is None
+    assert cache.get((b"b",)) is not None
+    clock.now = 100
+    assert cache.get((b"b",)) is None
+    assert (len(cache), cache.size) == (0, 0)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = NegativeCache(maxsize=2)
+    cache.set((b"a",), "/a", response())
+    cache.set((b"b",), "/b", response())
+    cache.get((b"a",))
+    cache.set((b"c",), "/c", response())
+
+    assert (b"a",) in cache and (b"c",) in cache
+    assert (b"b",) not in cache
+
+
+def test_byte_budget():
+    size = 1 + len(b"content-type") + len(b"text/plain")
+    cache = NegativeCache(max_bytes=2 * size)
+    cache.set((b"a",), "/a", response())
+    cache.set((b"b",), "/b", response())
+    cache.set((b"c",), "/c", response())
+    cache.set((b"big",), "/big", response(body=b"x" * 3 * size))
+
+    assert [key in cache for key in [(b"a",), (b"b",), (b"c",), (b"big",)]] == [
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert cache.size == 2 * size
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        NegativeCache(maxsize=0)
+
+
+async def test_responses_started_before_invalidate_are_not_stored():
+    cache = NegativeCache()
+    invalidated = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        # The resource is created while the 404 is being sent.
+        invalidated.append(cache.invalidate("/items/1"))
+        await send({"type": "http.response.body", "body": b"missing"})
+
+    middleware = NegativeCacheMiddleware(app, cache)
+    await call(middleware, http_scope("/items/1"))
+
+    assert invalidated == [0]
+    assert len(cache) == 0
+
+
+def test_generations_are_bounded():
+    cache = NegativeCache(maxsize=2)
+    token = cache.generation("/a")
+    for path in ["/b", "/c", "/d"]:
+        cache.invalidate(path)
+
+    cache.set((b"a",), "/a", response(), token)
+
+    assert (b"a",) not in cache
+    assert len(cache._generations) == 2
+    cache.set((b"a",), "/a", response(), cache.generation("/a"))
+    assert (b"a",) in cache
@@ -0,0 +1,110 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.negotiation import (
+    NegotiatingExceptionHandler,
+    parse_accept,
+)
+
+
+@pytest.fixture
+def handler():
+    return NegotiatingExceptionHandler()
+
+
+def media_type(handler, accept):
+    renderer = handler.choose(accept)
+    return None if renderer is None else renderer.media_type
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, "application/json"),
+        ("text/html", "text/html"),
+        ("text/html;q=0.5, text/plain", "text/plain"),
+        ("text/*, application/json", "text/plain"),
+        ("*/*", "application/json"),
+        ("application/problem+json, application/json", "application/problem+json"),
+        # A more specific range overrides a refusal by wildcard, and the reverse.
+        ("text/html, */*;q=0", "text/html"),
+        ("application/*;q=0, text/plain;q=0.1", "text/plain"),
+        ("*/*, application/json;q=0", "application/problem+json"),
+        ("*/*;q=0", None),
+        ("application/*;q=0", None),
+        ("image/png", None),
+    ],
+)
+def test_choose(handler, accept, expected):
+    assert media_type(handler, accept) == expected
+
+
+def test_quality_is_clamped():
+    assert parse_accept("a/b;q=nan, c/d;q=inf, e/f;q=-1, g/h;q=x") == [
+        ("a/b", 0.0),
+        ("c/d", 1.0),
+        ("e/f", 0.0),
+        ("g/h", 0.0),
+    ]
+
+
+def test_nan_quality_is_refused(handler):
+    assert media_type(handler, "application/json;q=nan, text/plain;q=0.1") == (
+        "text/plain"
+    )
+
+
+def make_client(exc: HTTPException) -> TestClient:
+    async def endpoint(request):
+        raise exc
+
+    app = Starlette(
+        routes=[Route("/", endpoint)],
+        exception_handlers={HTTPException: NegotiatingExceptionHandler()},
+    )
+    return TestClient(app)
+
+
+def test_vary_is_merged():
+    client = make_client(NotFoundException(headers={"Vary": "Origin"}))
+
+    response = client.get("/", headers={"accept": "text/plain"})
+
+    assert response.status_code == 404
+    assert response.headers.get_list("vary") == ["Origin, Accept"]
+    assert response.text == "Not Found"
+
+
+def test_vary_is_not_duplicated():
+    client = make_client(NotFoundException(headers={"Vary": "accept"}))
+
+    response = client.get("/")
+
+    assert response.headers.get_list("vary") == ["accept"]
+
+
+def test_not_acceptable():
+    client = make_client(NotFoundException())
+
+    response = client.get("/", headers={"accept": "image/png"})
+
+    assert response.status_code == 406
+    assert response.headers["vary"] == "Accept"
+
+
+@pytest.mark.anyio
+async def test_responses_are_cached(handler):
+    request = Request({"type": "http", "path": "/", "headers": []})
+
+    first = await handler(request, NotFoundException())
+    second = await handler(request, NotFoundException())
+    unhashable = await handler(request, NotFoundException(detail={"id": 1}))
+
+    assert first is second
+    assert first.headers["vary"] == "Accept"
+    assert unhashable.body == b'{"detail":{"id":1}}'
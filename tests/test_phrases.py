@@ -0,0 +1,36 @@
+import http
+
+import pytest
+from starlette.exceptions import HTTPException
+
+from starlette_http_exceptions import status
+from starlette_http_exceptions._json import stdlib_dumps
+from starlette_http_exceptions._phrases import (
+    JSON_DETAILS,
+    PHRASES,
+    phrase_from_constant,
+)
+
+CONSTANTS = sorted(
+    (name, code) for name, code in vars(status).items() if name.startswith("HTTP_")
+)
+STDLIB_CODES = {member.value for member in http.HTTPStatus}
+
+
+@pytest.mark.parametrize("name, code", CONSTANTS)
+def test_every_constant_has_a_phrase(name, code):
+    if code in STDLIB_CODES:
+        assert PHRASES[code] == http.HTTPStatus(code).phrase
+        assert PHRASES[code] == HTTPException(code).detail
+    else:
+        assert PHRASES[code] == phrase_from_constant(name)
+
+
+def test_json_details():
+    assert JSON_DETAILS.keys() == PHRASES.keys()
+    for code, phrase in PHRASES.items():
+        assert JSON_DETAILS[code] == stdlib_dumps({"detail": phrase})
+
+
+def test_phrase_from_constant():
+    assert phrase_from_constant("HTTP_425_TOO_EARLY") == "Too Early"
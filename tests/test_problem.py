@@ -0,0 +1,87 @@
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from starlette_http_exceptions import NotFoundException
+from starlette_http_exceptions.problem import (
+    ProblemDetailsHandler,
+    ProblemDetailsRenderer,
+)
+
+
+def app_raising(exc, handler=None):
+    async def endpoint(request):
+        raise exc
+
+    return Starlette(
+        routes=[Route("/items/1", endpoint)],
+        exception_handlers={HTTPException: handler or ProblemDetailsHandler()},
+    )
+
+
+def test_document():
+    client = TestClient(app_raising(NotFoundException("Item 1 is gone")))
+
+    response = client.get("/items/1")
+
+    assert response.status_code == 404
+    assert response.headers["content-type"] == "application/problem+json"
+    assert response.json() == {
+        "type": "about:blank",
+        "title": "Not Found",
+        "status": 404,
+        "detail": "Item 1 is gone",
+        "instance": "/items/1",
+    }
+
+
+def test_detail_equal_to_the_title_is_omitted():
+    client = TestClient(app_raising(NotFoundException()))
+
+    assert "detail" not in client.get("/items/1").json()
+
+
+def test_without_instance():
+    handler = ProblemDetailsHandler(
+        type_uri="https://example.com/problems", include_instance=False
+    )
+    client = TestClient(app_raising(HTTPException(409, {"id": 1}), handler))
+
+    assert client.get("/items/1").json() == {
+        "type": "https://example.com/problems",
+        "title": "Conflict",
+        "status": 409,
+        "detail": {"id": 1},
+    }
+
+
+@pytest.mark.parametrize("status_code", [204, 304])
+def test_no_body(status_code):
+    response = ProblemDetailsRenderer().render(
+        HTTPException(status_code, headers={"ETag": '"1"'}), "/items/1"
+    )
+
+    assert response.status_code == status_code
+    assert response.body == b""
+    assert response.headers["etag"] == '"1"'
+    assert "content-type" not in response.headers
+
+
+def test_renderer_keeps_headers():
+    response = ProblemDetailsRenderer().render(
+        HTTPException(429, "Slow down", headers={"Retry-After": "1"})
+    )
+
+    assert response.headers["retry-after"] == "1"
+    assert response.headers["content-type"] == "application/problem+json"
+    assert int(response.headers["content-length"]) == len(response.body)
+    assert json.loads(response.body) == {
+        "type": "about:blank",
+        "title": "Too Many Requests",
+        "status": 429,
+        "detail": "Slow down",
+    }
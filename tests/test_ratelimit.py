@@ -0,0 +1,72 @@
+import pytest
+
+from _asgi import call, http_scope
+from starlette_http_exceptions import TooManyRequestsException
+from starlette_http_exceptions.middleware import RateLimitMiddleware
+from starlette_http_exceptions.ratelimit import MemoryBackend, Rate, RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def test_burst_then_reject():
+    clock = Clock()
+    limiter = RateLimiter(Rate(2, period=10), MemoryBackend(clock=clock))
+
+    assert (await limiter.check("a")).remaining == 1
+    assert (await limiter.check("a")).remaining == 0
+    with pytest.raises(TooManyRequestsException) as info:
+        await limiter.check("a")
+
+    assert info.value.headers == {
+        "Retry-After": "5",
+        "RateLimit-Limit": "2",
+        "RateLimit-Remaining": "0",
+        "RateLimit-Reset": "10",
+    }
+    clock.now = 5
+    assert (await limiter.check("a")).allowed
+    assert (await limiter.check("b")).allowed
+
+
+async def test_rejection_headers_are_not_shared():
+    limiter = RateLimiter(Rate(1, period=10), MemoryBackend(clock=Clock()))
+    await limiter.check("a")
+
+    with pytest.raises(TooManyRequestsException) as first:
+        await limiter.check("a")
+    first.value.headers["Access-Control-Allow-Origin"] = "*"
+    with pytest.raises(TooManyRequestsException) as second:
+        await limiter.check("a")
+
+    assert "Access-Control-Allow-Origin" not in second.value.headers
+    state = await limiter.hit("a")
+    assert b"access-control-allow-origin" not in dict(limiter.response(state).raw_headers)
+
+
+async def test_middleware_rejects_with_headers():
+    limiter = RateLimiter(Rate(1, period=60), MemoryBackend(clock=Clock()))
+    app = RateLimitMiddleware(ok, limiter, route_limiters={"/health": None})
+
+    assert (await call(app, http_scope("/items"))).status == 200
+    rejected = await call(app, http_scope("/items"))
+    other_client = await call(app, http_scope("/items", client=("10.0.0.2", 1)))
+    exempt = await call(app, http_scope("/health"))
+
+    assert rejected.status == 429
+    assert rejected.headers[b"retry-after"] == b"60"
+    assert rejected.headers[b"ratelimit-limit"] == b"1"
+    assert other_client.status == 200
+    assert exempt.status == 200
@@ -0,0 +1,53 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+from starlette_http_exceptions import NotFoundException, registry
+from starlette_http_exceptions.registry import (
+    exception_for_status,
+    status_for_exception,
+)
+
+
+def test_known_and_generated_classes():
+    assert exception_for_status(404) is NotFoundException
+    assert exception_for_status(HTTPStatus.NOT_FOUND) is NotFoundException
+
+    payment_required = exception_for_status(402)
+
+    assert payment_required.__name__ == "PaymentRequiredException"
+    assert payment_required().status_code == 402
+    assert status_for_exception(payment_required) == 402
+    assert registry.PaymentRequiredException is payment_required
+
+
+@pytest.mark.parametrize("code", [200, 600, 499, "404", 404.0, None, True])
+def test_invalid_codes_raise_value_error(code):
+    with pytest.raises(ValueError):
+        exception_for_status(code)
+
+
+def test_concurrent_generation_publishes_one_class(monkeypatch):
+    exceptions = list(registry._EXCEPTIONS)
+    exceptions[402 - 400] = None
+    monkeypatch.setattr(registry, "_EXCEPTIONS", exceptions)
+    monkeypatch.setattr(registry, "_STATUS_CODES", dict(registry._STATUS_CODES))
+    generate = registry._generate_exception
+    started = threading.Barrier(8)
+
+    def slow_generate(code, constant_name):
+        time.sleep(0.01)
+        return generate(code, constant_name)
+
+    def lookup(_):
+        started.wait()
+        return exception_for_status(402)
+
+    monkeypatch.setattr(registry, "_generate_exception", slow_generate)
+    with ThreadPoolExecutor(8) as pool:
+        classes = set(pool.map(lookup, range(8)))
+
+    assert len(classes) == 1
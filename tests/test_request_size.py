@@ -0,0 +1,114 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from _asgi import call, http_scope
+from starlette_http_exceptions import RequestEntityTooLargeException
+from starlette_http_exceptions.middleware import RequestSizeLimitMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+class BodyApp:
+    """Reads the whole body and answers with its length."""
+
+    def __init__(self) -> None:
+        self.chunks = []
+
+    async def __call__(self, scope, receive, send):
+        more_body = True
+        while more_body:
+            message = await receive()
+            self.chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = str(sum(map(len, self.chunks))).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+
+def post(path="/upload", headers=()):
+    return http_scope(path, method="POST", headers=headers)
+
+
+async def test_content_length_is_rejected_unread():
+    inner = BodyApp()
+    app = RequestSizeLimitMiddleware(inner, max_body_size=10)
+
+    sent = await call(app, post(headers=[(b"content-length", b"11")]), [b"x" * 11])
+
+    assert sent.status == 413
+    assert sent.headers[b"connection"] == b"close"
+    assert sent.body == b'{"detail":"Request Entity Too Large"}'
+    assert inner.chunks == []
+
+
+async def test_streamed_body_is_cut_at_the_limit():
+    inner = BodyApp()
+    app = RequestSizeLimitMiddleware(inner, max_body_size=10)
+
+    sent = await call(app, post(), [b"x" * 6, b"x" * 6, b"x" * 6])
+
+    assert sent.status == 413
+    assert sent.headers[b"connection"] == b"close"
+    assert inner.chunks == [b"x" * 6]
+
+
+async def test_bodies_within_the_limit_pass():
+    app = RequestSizeLimitMiddleware(BodyApp(), max_body_size=10)
+
+    sent = await call(app, post(headers=[(b"content-length", b"10")]), [b"x" * 10])
+
+    assert (sent.status, sent.body) == (200, b"10")
+
+
+async def test_route_limits_use_the_longest_prefix():
+    app = RequestSizeLimitMiddleware(
+        BodyApp(), max_body_size=4, route_limits={"/upload": 100, "/upload/avatar": 2}
+    )
+
+    assert (await call(app, post("/upload/file"), [b"x" * 50])).status == 200
+    assert (await call(app, post("/upload/avatar"), [b"x" * 3])).status == 413
+    assert (await call(app, post("/other"), [b"x" * 5])).status == 413
+
+
+async def test_url_and_header_limits():
+    app = RequestSizeLimitMiddleware(BodyApp(), max_url_length=10, max_header_bytes=8)
+
+    long_query = http_scope("/a", query_string=b"q=" + b"x" * 10)
+    big_headers = http_scope("/a", headers=[(b"x-a", b"123456")])
+
+    assert (await call(app, long_query)).status == 414
+    assert (await call(app, big_headers)).status == 431
+    assert (await call(app, http_scope("/a", headers=[(b"x-a", b"1")]))).status == 200
+
+
+async def test_errors_after_the_response_started_propagate():
+    async def echo_late(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await receive()
+        await receive()
+
+    app = RequestSizeLimitMiddleware(echo_late, max_body_size=1)
+
+    with pytest.raises(RequestEntityTooLargeException):
+        await call(app, post(), [b"x", b"x"])
+
+
+def test_streamed_body_in_a_starlette_app():
+    async def upload(request):
+        return PlainTextResponse(str(len(await request.body())))
+
+    app = Starlette(
+        routes=[Route("/upload", upload, methods=["POST"])],
+        middleware=[Middleware(RequestSizeLimitMiddleware, max_body_size=10)],
+    )
+    client = TestClient(app)
+
+    response = client.post("/upload", content=iter([b"x" * 6, b"x" * 6]))
+
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+    assert client.post("/upload", content=iter([b"x" * 6])).text == "6"
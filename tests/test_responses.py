@@ -0,0 +1,93 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+from starlette_http_exceptions import GoneException, NotFoundException
+from starlette_http_exceptions.responses import default_error_response
+
+
+class ItemNotFound(NotFoundException):
+    __slots__ = ()
+
+    def __init__(self, item_id: int) -> None:
+        super().__init__(detail=f"item {item_id} not found")
+
+
+def test_returned_responses_can_be_changed():
+    response = NotFoundException.default_response()
+
+    response.headers["x-request-id"] = "1"
+    response.set_cookie("seen", "yes")
+    response.background = object()
+
+    assert response.headers["x-request-id"] == "1"
+    assert (b"x-request-id", b"1") in response.raw_headers
+    assert any(name == b"set-cookie" for name, _ in response.raw_headers)
+    other = NotFoundException.default_response()
+    assert "x-request-id" not in other.headers
+    assert other.background is None
+
+
+def test_shared_responses_are_read_only():
+    shared = default_error_response(404)
+
+    with pytest.raises(TypeError):
+        shared.headers["x-extra"] = "1"
+    with pytest.raises(TypeError):
+        shared.set_cookie("seen", "yes")
+    shared.raw_headers.append((b"x-extra", b"1"))
+    assert shared.headers["content-type"] == "application/json"
+    assert (b"x-extra", b"1") not in shared.raw_headers
+
+
+def test_copies_share_the_encoded_response():
+    shared = default_error_response(404)
+    response = NotFoundException.default_response()
+
+    assert response is not shared
+    assert response.body is shared.body
+    assert response.raw_headers == shared.raw_headers
+
+
+def test_default_response_does_not_instantiate():
+    response = ItemNotFound.default_response()
+
+    assert response.status_code == 404
+    assert response.body == b'{"detail":"Not Found"}'
+
+
+def test_as_response():
+    assert NotFoundException().as_response().body == b'{"detail":"Not Found"}'
+    response = ItemNotFound(3).as_response()
+    assert response.status_code == 404
+    assert response.body == b'{"detail":"item 3 not found"}'
+    assert response is not ItemNotFound(3).as_response()
+
+
+def test_returned_response_headers_through_middleware():
+    seen = []
+
+    async def endpoint(request):
+        response = GoneException(detail="gone for good").as_response()
+        seen.append(dict(response.headers))
+        return response
+
+    async def recording(scope: Scope, receive: Receive, send: Send) -> None:
+        async def recording_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"].append((b"x-added", b"1"))
+            await send(message)
+
+        await app.router(scope, receive, recording_send)
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    client = TestClient(recording)
+
+    first = client.get("/")
+    second = client.get("/")
+
+    assert first.status_code == second.status_code == 410
+    assert second.headers.get_list("x-added") == ["1"]
+    assert seen[0]["content-type"] == "application/json"
@@ -0,0 +1,100 @@
+import time
+
+import anyio
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from _asgi import call, http_scope, stalled_receive, Sent
+from starlette_http_exceptions.deadlines import remaining_time
+from starlette_http_exceptions.middleware import TimeoutMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+def sync_sleep(request: Request) -> PlainTextResponse:
+    time.sleep(0.5)
+    return PlainTextResponse("late")
+
+
+async def async_sleep(request: Request) -> PlainTextResponse:
+    await anyio.sleep(10)
+    return PlainTextResponse("late")
+
+
+async def upload(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(str(len(await request.body())))
+
+
+async def budget(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(f"{remaining_time():.1f}")
+
+
+app = Starlette(
+    routes=[
+        Route("/sync", sync_sleep),
+        Route("/async", async_sleep),
+        Route("/upload", upload, methods=["POST"]),
+        Route("/budget", budget),
+    ]
+)
+
+
+async def test_within_deadline():
+    sent = await call(TimeoutMiddleware(app, timeout=5), http_scope("/budget"))
+
+    assert sent.status == 200
+    assert sent.body == b"5.0"
+
+
+async def test_slow_async_handler():
+    started = time.monotonic()
+    sent = await call(TimeoutMiddleware(app, timeout=0.1), http_scope("/async"))
+
+    assert sent.status == 504
+    assert sent.body == b'{"detail":"Gateway Timeout"}'
+    assert time.monotonic() - started < 1
+
+
+async def test_slow_sync_handler():
+    started = time.monotonic()
+    sent = await call(TimeoutMiddleware(app, timeout=0.1), http_scope("/sync"))
+
+    # The 504 goes out at the deadline, and the late response is dropped.
+    assert sent.status == 504
+    assert sent.times[0] - started < 0.4
+    assert [message["type"] for message in sent.messages] == [
+        "http.response.start",
+        "http.response.body",
+    ]
+
+
+async def test_stalled_upload():
+    sent = Sent()
+    await TimeoutMiddleware(app, timeout=0.1)(
+        http_scope("/upload", method="POST"), stalled_receive, sent
+    )
+
+    assert sent.status == 408
+    assert sent.headers[b"connection"] == b"close"
+
+
+async def test_route_timeouts():
+    middleware = TimeoutMiddleware(
+        app, timeout=0.1, route_timeouts={"/budget": 30, "/async": None}
+    )
+
+    assert middleware.timeout_for("/budget") == 30
+    assert middleware.timeout_for("/async") is None
+    assert middleware.timeout_for("/sync") == 0.1
+    assert (await call(middleware, http_scope("/budget"))).body == b"30.0"
+
+
+async def test_errors_are_not_wrapped():
+    async def broken(scope, receive, send):
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError):
+        await call(TimeoutMiddleware(broken, timeout=5), http_scope())
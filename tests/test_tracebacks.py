@@ -0,0 +1,89 @@
+import gc
+import weakref
+
+import anyio
+import pytest
+
+from starlette_http_exceptions import BadRequestException, NotFoundException
+from starlette_http_exceptions.handlers import CachedHTTPExceptionHandler
+from starlette_http_exceptions.tracebacks import (
+    TRACEBACK_ALWAYS,
+    TRACEBACK_NEVER,
+    TRACEBACK_SERVER_ERRORS,
+    release_traceback,
+    set_traceback_policy,
+)
+
+
+class Payload:
+    def __init__(self) -> None:
+        self.data = bytearray(10 * 1024 * 1024)
+
+
+class KeptException(BadRequestException):
+    __slots__ = ()
+    keep_traceback = True
+
+
+@pytest.fixture(autouse=True)
+def reset_policy():
+    yield
+    set_traceback_policy(TRACEBACK_ALWAYS)
+
+
+def raise_with_local(exception_class, referents):
+    payload = Payload()
+    referents.append(weakref.ref(payload))
+    try:
+        raise ValueError("chained")
+    except ValueError:
+        raise exception_class()
+
+
+def handled(exception_class):
+    """Raise `exception_class` from a frame holding a large local and handle it."""
+    referents = []
+    try:
+        raise_with_local(exception_class, referents)
+    except Exception as exc:
+        anyio.run(CachedHTTPExceptionHandler(), None, exc)
+        return exc, referents[0]
+
+
+def test_released_frames_are_collected_while_the_exception_lives():
+    set_traceback_policy(TRACEBACK_NEVER)
+
+    exc, payload = handled(NotFoundException)
+    gc.collect()
+
+    assert exc.__traceback__ is None and exc.__context__ is None
+    assert payload() is None
+
+
+def test_kept_frames_are_collected_with_the_exception():
+    set_traceback_policy(TRACEBACK_NEVER)
+
+    exc, payload = handled(KeptException)
+    gc.collect()
+
+    assert exc.__traceback__ is not None
+    assert payload() is not None
+    del exc
+    gc.collect()
+    assert payload() is None
+
+
+def test_server_errors_policy():
+    set_traceback_policy(TRACEBACK_SERVER_ERRORS)
+    try:
+        raise NotFoundException()
+    except NotFoundException as exc:
+        client_error = exc
+    release_traceback(client_error)
+
+    assert client_error.__traceback__ is None
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        set_traceback_policy("sometimes")
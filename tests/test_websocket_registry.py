@@ -0,0 +1,102 @@
+import anyio
+import pytest
+
+from _asgi import WebSocketClient
+from starlette_http_exceptions.middleware import (
+    WebSocketRegistry,
+    WebSocketRegistryMiddleware,
+)
+from starlette_http_exceptions.ws_exceptions import WSTryAgainLater
+
+pytestmark = pytest.mark.anyio
+
+
+def echo_app(handshake_started=None, accept_gate=None):
+    async def app(scope, receive, send):
+        message = await receive()
+        assert message["type"] == "websocket.connect"
+        if handshake_started is not None:
+            handshake_started.set()
+        if accept_gate is not None:
+            await accept_gate.wait()
+        await send({"type": "websocket.accept"})
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            await send({"type": "websocket.send", "text": message.get("text")})
+
+    return app
+
+
+async def test_drain_closes_accepted_connections():
+    registry = WebSocketRegistry()
+    app = WebSocketRegistryMiddleware(echo_app(), registry)
+    clients = [WebSocketClient() for _ in range(3)]
+    progress = []
+
+    async with anyio.create_task_group() as task_group:
+        for client in clients:
+            client.push({"type": "websocket.connect"})
+            task_group.start_soon(client.run, app)
+        await anyio.wait_all_tasks_blocked()
+        assert len(registry) == 3
+
+        closed = await registry.drain(
+            min_delay=1, max_delay=2, progress=lambda *args: progress.append(args)
+        )
+        for client in clients:
+            client.push({"type": "websocket.disconnect", "code": 1012})
+
+    assert closed == 3
+    assert progress[-1] == (3, 3)
+    assert len(registry) == 0
+    for client in clients:
+        close = client.sent.messages[-1]
+        assert close["code"] == 1012
+        assert close["reason"].startswith("retry-after-ms=")
+        assert 1000 <= int(close["reason"].split("=")[1]) <= 2000
+
+
+async def test_connections_in_handshake_are_refused():
+    registry = WebSocketRegistry()
+    handshake_started = anyio.Event()
+    accept_gate = anyio.Event()
+    app = WebSocketRegistryMiddleware(
+        echo_app(handshake_started, accept_gate), registry
+    )
+    client = WebSocketClient()
+
+    async with anyio.create_task_group() as task_group:
+        client.push({"type": "websocket.connect"})
+        task_group.start_soon(client.run, app)
+        await handshake_started.wait()
+
+        assert await registry.drain(WSTryAgainLater()) == 0
+        accept_gate.set()
+        await anyio.wait_all_tasks_blocked()
+        client.push({"type": "websocket.disconnect", "code": 1013})
+
+    assert client.sent.messages == [{"type": "websocket.close", "code": 1013}]
+    assert len(registry) == 0
+
+
+async def test_new_connections_are_refused_while_draining():
+    registry = WebSocketRegistry()
+    await registry.drain()
+    client = WebSocketClient()
+    client.push({"type": "websocket.connect"})
+
+    await client.run(WebSocketRegistryMiddleware(echo_app(), registry))
+
+    assert registry.draining
+    assert client.sent.close_code == 1012
+    assert len(client.sent.messages) == 1
+
+
+def test_register_refuses_while_draining():
+    registry = WebSocketRegistry()
+    registry.drain_code = 1001
+
+    assert registry.register(object()) is False  # type: ignore[arg-type]
+    assert len(registry) == 0
@@ -0,0 +1,108 @@
+import pytest
+
+from _asgi import WebSocketClient
+from starlette_http_exceptions.middleware import WebSocketRateLimitMiddleware
+from starlette_http_exceptions.middleware.ws_rate_limit import TokenBuckets
+from starlette_http_exceptions.ws_exceptions import WSPolicyViolation
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class EchoApp:
+    """Accepts, echoes every message and records what it received."""
+
+    def __init__(self) -> None:
+        self.received = []
+
+    async def __call__(self, scope, receive, send):
+        await receive()
+        await send({"type": "websocket.accept"})
+        while True:
+            message = await receive()
+            self.received.append(message.get("text", message["type"]))
+            if message["type"] == "websocket.disconnect":
+                await send({"type": "websocket.send", "text": "after close"})
+                return
+            await send({"type": "websocket.send", "text": message["text"]})
+
+
+async def run(app, texts):
+    client = WebSocketClient()
+    client.push({"type": "websocket.connect"})
+    for text in texts:
+        client.push({"type": "websocket.receive", "text": text})
+    client.push({"type": "websocket.disconnect", "code": 1000})
+    await client.run(app)
+    return client.sent
+
+
+def test_token_buckets():
+    clock = Clock()
+    buckets = TokenBuckets(rate=2, burst=2, clock=clock)
+    slot = buckets.allocate()
+
+    assert [buckets.take(slot) for _ in range(3)] == [0.0, 0.0, 0.5]
+    clock.now = 0.5
+    assert buckets.take(slot) == 0.0
+    assert buckets.take(slot, borrow=True) == 0.5
+    assert buckets.take(slot) == 1.0
+
+    buckets.release(slot)
+    assert len(buckets) == 0
+    assert buckets.allocate() == slot
+    assert buckets.take(slot) == 0.0
+
+
+async def test_close_with_1008():
+    clock = Clock()
+    inner = EchoApp()
+    app = WebSocketRateLimitMiddleware(inner, rate=1, burst=2, clock=clock)
+
+    sent = await run(app, ["a", "b", "c", "d"])
+
+    assert inner.received == ["a", "b", "websocket.disconnect"]
+    assert sent.messages[-1] == {
+        "type": "websocket.close",
+        "code": 1008,
+        "reason": WSPolicyViolation().reason,
+    }
+    assert [message.get("text") for message in sent.messages[1:-1]] == ["a", "b"]
+    assert len(app.buckets) == 0
+
+
+async def test_drop():
+    inner = EchoApp()
+    app = WebSocketRateLimitMiddleware(
+        inner, rate=1, burst=2, action="drop", clock=Clock()
+    )
+
+    sent = await run(app, ["a", "b", "c", "d"])
+
+    assert inner.received == ["a", "b", "websocket.disconnect"]
+    assert sent.close_code is None
+
+
+async def test_delay():
+    inner = EchoApp()
+    app = WebSocketRateLimitMiddleware(inner, rate=100, burst=1, action="delay")
+
+    sent = await run(app, ["a", "b", "c"])
+
+    assert inner.received == ["a", "b", "c", "websocket.disconnect"]
+    assert sent.times[3] - sent.times[1] >= 0.015
+    assert sent.close_code is None
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        WebSocketRateLimitMiddleware(EchoApp(), rate=1, action="block")
+    with pytest.raises(ValueError):
+        TokenBuckets(rate=0, burst=1)